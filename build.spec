@@ -12,7 +12,6 @@ a = Analysis(
     ],
     hiddenimports=[
         'pandas',
-        'dask',
         'jieba',
         'snownlp',
         'matplotlib',
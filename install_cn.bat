@@ -12,31 +12,28 @@ echo ============================================================
 echo.
 echo.
 
-echo [1/9] 正在安装 pandas...
+echo [1/8] 正在安装 pandas...
 pip install pandas==2.1.4 -q
 
-echo [2/9] 正在安装 dask...
-pip install dask==2023.12.1 -q
-
-echo [3/9] 正在安装 openpyxl...
+echo [2/8] 正在安装 openpyxl...
 pip install openpyxl==3.1.2 -q
 
-echo [4/9] 正在安装 jieba...
+echo [3/8] 正在安装 jieba...
 pip install jieba==0.42.1 -q
 
-echo [5/9] 正在安装 snownlp...
+echo [4/8] 正在安装 snownlp...
 pip install snownlp==0.12.3 -q
 
-echo [6/9] 正在安装 matplotlib...
+echo [5/8] 正在安装 matplotlib...
 pip install matplotlib==3.8.2 -q
 
-echo [7/9] 正在安装 seaborn...
+echo [6/8] 正在安装 seaborn...
 pip install seaborn==0.13.2 -q
 
-echo [8/9] 正在安装 pyinstaller...
+echo [7/8] 正在安装 pyinstaller...
 pip install pyinstaller==5.13.2 -q
 
-echo [9/9] 正在安装 rank_bm25...
+echo [8/8] 正在安装 rank_bm25...
 pip install rank_bm25==0.2.2 -q
 
 echo.
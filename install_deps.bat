@@ -10,31 +10,28 @@ echo ============================================================
 echo.
 echo.
 
-echo [1/9] 正在安装 pandas (数据处理库)...
+echo [1/8] 正在安装 pandas (数据处理库)...
 pip install pandas==2.1.4 --quiet
 
-echo [2/9] 正在安装 dask (大规模数据处理)...
-pip install dask==2023.12.1 --quiet
-
-echo [3/9] 正在安装 openpyxl (Excel支持)...
+echo [2/8] 正在安装 openpyxl (Excel支持)...
 pip install openpyxl==3.1.2 --quiet
 
-echo [4/9] 正在安装 jieba (中文分词)...
+echo [3/8] 正在安装 jieba (中文分词)...
 pip install jieba==0.42.1 --quiet
 
-echo [5/9] 正在安装 snownlp (情感分析)...
+echo [4/8] 正在安装 snownlp (情感分析)...
 pip install snownlp==0.12.3 --quiet
 
-echo [6/9] 正在安装 matplotlib (图表生成)...
+echo [5/8] 正在安装 matplotlib (图表生成)...
 pip install matplotlib==3.8.2 --quiet
 
-echo [7/9] 正在安装 seaborn (数据可视化)...
+echo [6/8] 正在安装 seaborn (数据可视化)...
 pip install seaborn==0.13.2 --quiet
 
-echo [8/9] 正在安装 pyinstaller (EXE打包工具)...
+echo [7/8] 正在安装 pyinstaller (EXE打包工具)...
 pip install pyinstaller==5.13.2 --quiet
 
-echo [9/9] 正在安装 rank_bm25 (关键词提取)...
+echo [8/8] 正在安装 rank_bm25 (关键词提取)...
 pip install rank_bm25==0.2.2 --quiet
 
 echo.
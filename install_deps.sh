@@ -8,7 +8,6 @@ echo "正在安装Python依赖包..."
 echo ""
 
 pip install pandas==2.1.4
-pip install dask==2023.12.1
 pip install openpyxl==3.1.2
 pip install jieba==0.42.1
 pip install snownlp==0.12.3
@@ -1,13 +1,24 @@
 """基础分析器"""
 import pandas as pd
 import numpy as np
+import heapq
 from collections import Counter
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional, Union
 import matplotlib
 matplotlib.use('Agg')  # 使用非GUI后端
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+from .cooccurrence import AssociationMetrics, CooccurrenceMatrix
+from .partial_stats import PartialStats
+from .grouped_engine import GroupedAnalysisEngine, count_by_group
+from .rule_engine import RuleEngine
+from .term_counts import TermCounts
+from .sentiment_engine import SentimentEngine
+from .sketches import HeavyHitterSketch, SketchSettings
+from ..preprocess.dimension_marker import DimensionMatcher
+from ..preprocess.vocabulary import vocabulary
+from ..utils.cache import CacheManager
 from ..utils.logger import logger
 
 # 设置中文字体
@@ -18,15 +29,45 @@ plt.rcParams['axes.unicode_minus'] = False
 class BaseAnalyzer:
     """基础分析器（通用统计/可视化）"""
     
-    def __init__(self, custom_dimensions: List[str], output_dir: str = "output"):
+    # 去重后每行代表的原始语料条数（无该列时每行计1条）
+    weight_col = 'dup_count'
+    
+    # 关键词规则表（由子类定义）
+    category_rules: Dict[str, List[str]] = {}
+    scene_rules: Dict[str, List[str]] = {}
+    
+    def __init__(self, custom_dimensions: List[str], output_dir: str = "output",
+                 cache: Optional[CacheManager] = None,
+                 dimension_matcher: Optional[DimensionMatcher] = None,
+                 rules: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 sentiment_engine: Optional[SentimentEngine] = None,
+                 sketch: Optional[SketchSettings] = None,
+                 association_metrics: Optional[AssociationMetrics] = None):
         """
         初始化基础分析器
         
         Args:
             custom_dimensions: 自定义维度列表
             output_dir: 输出目录
+            cache: 持久化结果缓存（跨运行复用已分析文本的情感标签），None表示不缓存
+            dimension_matcher: 编译后的维度匹配器（含同义词和权重倍数），用于维度加权词频
+            rules: 规则表 {"categories": {...}, "scenes": {...}}，缺省项使用子类内置规则
+            sentiment_engine: 批量情感分析引擎（可在多个分析器间共享进程池），None时按cache创建单进程引擎
+            sketch: 近似统计参数（词频/关联词使用有界内存摘要），None表示精确统计
+            association_metrics: 维度关联强度指标（提升度/PMI/χ²），None表示只统计共现次数
         """
         self.custom_dimensions = custom_dimensions
+        self.cache = cache
+        self.sentiment_engine = sentiment_engine or SentimentEngine(cache=cache)
+        self.sketch = sketch
+        self.association_metrics = association_metrics
+        self.dimension_matcher = dimension_matcher
+        
+        rules = rules or {}
+        self.rule_engine = RuleEngine(
+            rules.get("categories") or self.category_rules,
+            rules.get("scenes") or self.scene_rules
+        )
         self.output_dir = Path(output_dir)
         self.charts_dir = self.output_dir / "charts"
         
@@ -36,37 +77,186 @@ class BaseAnalyzer:
         
         logger.info(f"初始化分析器，自定义维度: {custom_dimensions}")
     
-    def calculate_frequency(self, df: pd.DataFrame, tokens_col: str = 'tokens') -> Dict[str, int]:
+    def row_weights(self, df: pd.DataFrame) -> pd.Series:
+        """
+        获取每行的计数权重（去重后的重复次数）
+        
+        Args:
+            df: 语料DataFrame
+            
+        Returns:
+            权重Series（无去重列时全为1）
+        """
+        if self.weight_col in df.columns:
+            return df[self.weight_col]
+        return pd.Series(1, index=df.index)
+    
+    def count_rows(self, df: pd.DataFrame) -> int:
+        """
+        统计语料条数（按去重权重还原为原始条数）
+        
+        Args:
+            df: 语料DataFrame
+            
+        Returns:
+            原始语料条数
+        """
+        return int(self.row_weights(df).sum())
+    
+    @staticmethod
+    def _weighted_counter(values, weights) -> Counter:
+        """按权重计数（保持首次出现顺序）"""
+        counter = Counter()
+        for value, weight in zip(values, weights):
+            if value is None or value != value:  # 跳过空值
+                continue
+            counter[value] += weight
+        return counter
+    
+    def token_lists(self, df: pd.DataFrame, tokens_col: str = 'tokens') -> List[List[str]]:
         """
-        计算词频
+        获取逐行token列表（按需从token_ids列解码）
         
         Args:
             df: 语料DataFrame
             tokens_col: tokens列名
             
         Returns:
-            词频字典 {token: count}
+            每行的token列表
+        """
+        return vocabulary.token_lists(df, tokens_col)
+    
+    def calculate_frequency(self, df: pd.DataFrame, tokens_col: str = 'tokens') -> Dict[str, int]:
+        """
+        计算词频（在token id数组上按权重bincount）
+        
+        Args:
+            df: 语料DataFrame
+            tokens_col: tokens列名（无token_ids列时使用）
+            
+        Returns:
+            词频字典 {token: count}，按token首次出现顺序排列
         """
-        all_tokens = []
-        for tokens in df[tokens_col]:
-            if isinstance(tokens, list):
-                all_tokens.extend(tokens)
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        return self._count_positions(arrays, self.row_weights(df).to_numpy())
+    
+    def _count_positions(self, arrays, row_weights: np.ndarray,
+                         positions: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """
+        按行权重统计token出现次数
+        
+        Args:
+            arrays: token数组
+            row_weights: 每行权重（去重后的重复次数）
+            positions: 参与统计的位置（与values等长的布尔数组），None表示全部位置
+            
+        Returns:
+            词频字典 {token: count}，按token首次出现顺序排列（与Counter一致，保证Top K并列项顺序不变）
+        """
+        values = arrays.values
+        if positions is not None:
+            values = values[positions]
+        if len(values) == 0:
+            return {}
+        
+        if (row_weights == 1).all():
+            counts = np.bincount(values)
+        else:
+            position_weights = row_weights[arrays.row_index()]
+            if positions is not None:
+                position_weights = position_weights[positions]
+            counts = np.bincount(values, weights=position_weights).astype(np.int64)
+        
+        return self._ordered_counts(values, counts)
+    
+    @staticmethod
+    def _ordered_counts(values: np.ndarray, counts: np.ndarray) -> Dict[str, Any]:
+        """将按id计数的数组转换为按token首次出现顺序排列的字典"""
+        unique_ids, first_index = np.unique(values, return_index=True)
+        ordered_ids = unique_ids[np.argsort(first_index)].tolist()
+        tokens = vocabulary.decode(ordered_ids)
+        return dict(zip(tokens, counts[ordered_ids].tolist()))
+    
+    def calculate_weighted_frequency(self, df: pd.DataFrame, tokens_col: str = 'tokens',
+                                     weight_multiplier: Optional[float] = None) -> Dict[str, float]:
+        """
+        计算维度加权词频（维度词及其同义词的每次出现按权重倍数计）
+        
+        Args:
+            df: 语料DataFrame
+            tokens_col: tokens列名（无token_ids列时使用）
+            weight_multiplier: 维度词权重倍数（默认取维度匹配器的
+                custom_dimension_weight_multiplier，无匹配器时为3.0）
+            
+        Returns:
+            加权词频字典 {token: weighted_count}，按token首次出现顺序排列
+        """
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        values = arrays.values
+        if len(values) == 0:
+            return {}
+        
+        matcher = self.dimension_matcher
+        if matcher is not None:
+            hit_table = matcher.hit_table()
+            if weight_multiplier is None:
+                weight_multiplier = matcher.weight_multiplier
+        else:
+            # 无匹配器时仅按自定义维度本身（不含同义词）加权
+            dimensions = frozenset(self.custom_dimensions)
+            hit_table = vocabulary.derived(("dimension_hit", dimensions), lambda token: token in dimensions)
+        if weight_multiplier is None:
+            weight_multiplier = 3.0
         
-        frequency = Counter(all_tokens)
-        return dict(frequency)
+        position_weights = np.where(hit_table[values], weight_multiplier, 1.0)
+        position_weights *= self.row_weights(df).to_numpy()[arrays.row_index()]
+        counts = np.bincount(values, weights=position_weights)
+        return self._ordered_counts(values, counts)
     
-    def get_top_k_tokens(self, frequency: Dict[str, int], k: int = 10) -> List[Tuple[str, int]]:
+    def get_top_k_tokens(self, frequency: Union[Dict[str, int], TermCounts, HeavyHitterSketch],
+                         k: int = 10) -> List[Tuple[str, int]]:
         """
-        获取Top K高频词
+        获取Top K高频词（部分选择，无需对全部词条排序）
         
         Args:
-            frequency: 词频字典
+            frequency: 词频字典、词频统计（TermCounts）或高频词摘要（HeavyHitterSketch）
             k: 返回数量
             
         Returns:
-            [(token, count), ...] 排序列表
+            [(token, count), ...] 排序列表（并列时按首次出现顺序）
+        """
+        if hasattr(frequency, "top_k"):
+            return frequency.top_k(k)
+        # nlargest与稳定降序排序后截取前k项的结果一致
+        return heapq.nlargest(k, frequency.items(), key=lambda x: x[1])
+    
+    @staticmethod
+    def dimension_table(dim: str, mode: str = "contains") -> np.ndarray:
+        """
+        词表级维度匹配表（每个词条只做一次子串判断，新增词条时增量计算）
+        
+        Args:
+            dim: 自定义维度
+            mode: "contains"=词条包含维度词；"related"=词条包含维度词或被维度词包含
+            
+        Returns:
+            以token id为下标的布尔数组
+        """
+        if mode == "contains":
+            return vocabulary.derived(("dimension_contains", dim), lambda token: dim in token)
+        return vocabulary.derived(("dimension_related", dim), lambda token: dim in token or token in dim)
+    
+    def dimension_token_ids(self, mode: str = "contains") -> Dict[str, np.ndarray]:
+        """
+        各维度匹配的token id（维度 → 词表中匹配的token id数组）
+        
+        Args:
+            mode: 匹配方式，同dimension_table
+            
+        Returns:
+            {维度: token id数组}
         """
-        return sorted(frequency.items(), key=lambda x: x[1], reverse=True)[:k]
+        return {dim: np.flatnonzero(self.dimension_table(dim, mode)) for dim in self.custom_dimensions}
     
     def calculate_dimension_frequency(self, df: pd.DataFrame, tokens_col: str = 'tokens') -> Dict[str, int]:
         """
@@ -74,58 +264,143 @@ class BaseAnalyzer:
         
         Args:
             df: 语料DataFrame
-            tokens_col: tokens列名
+            tokens_col: tokens列名（无token_ids列时使用）
             
         Returns:
             维度相关词频字典
         """
-        # 只统计与维度相关的tokens
-        dimension_tokens = []
-        for tokens in df[tokens_col]:
-            if isinstance(tokens, list):
-                # 过滤出与维度相关的token（简化版：包含维度关键词的）
-                for token in tokens:
-                    if any(dim in token or token in dim for dim in self.custom_dimensions):
-                        dimension_tokens.append(token)
-        
-        frequency = Counter(dimension_tokens)
-        return dict(frequency)
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        if len(arrays.values) == 0 or not self.custom_dimensions:
+            return {}
+        
+        # 只统计与维度相关的tokens（简化版：包含维度关键词或被维度关键词包含的）
+        related = np.zeros(len(vocabulary), dtype=bool)
+        for dim in self.custom_dimensions:
+            table = self.dimension_table(dim, "related")
+            related[:len(table)] |= table
+        
+        return self._count_positions(arrays, self.row_weights(df).to_numpy(), related[arrays.values])
+    
+    def dimension_row_mask(self, df: pd.DataFrame, dim: str, tokens_col: str = 'tokens') -> np.ndarray:
+        """
+        判断每行是否包含该维度（存在包含维度词的token）
+        
+        Args:
+            df: 语料DataFrame
+            dim: 自定义维度
+            tokens_col: tokens列名（无token_ids列时使用）
+            
+        Returns:
+            每行是否相关的布尔数组
+        """
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        return arrays.any_per_row(self.dimension_table(dim)[arrays.values])
+    
+    def count_associations(self, df: pd.DataFrame, tokens_col: str = 'tokens') -> Dict[str, Counter]:
+        """
+        统计各自定义维度的共现词频
+        
+        Args:
+            df: 语料DataFrame
+            tokens_col: tokens列名（无token_ids列时使用）
+            
+        Returns:
+            {维度: 共现词Counter}
+        """
+        associations = {}
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        row_weights = self.row_weights(df).to_numpy()
+        
+        # 仅包含该维度的语料中、除维度词本身以外的词（所有维度由一次共现矩阵展开得到）
+        matrix = CooccurrenceMatrix(arrays, [self.dimension_table(dim) for dim in self.custom_dimensions],
+                                    [vocabulary.token_to_id.get(dim, -1) for dim in self.custom_dimensions])
+        rows, ids, bounds = matrix.cooccurrences()
+        for d, dim in enumerate(self.custom_dimensions):
+            block = slice(bounds[d], bounds[d + 1])
+            dim_ids, counts = count_by_group(
+                np.ones(bounds[d + 1] - bounds[d], dtype=np.int64), ids[block],
+                row_weights[rows[block]], [[1]]
+            )[0]
+            associations[dim] = Counter(dict(zip(vocabulary.decode(dim_ids), counts)))
+        
+        return associations
+    
+    def collect_stats(self, df: pd.DataFrame) -> PartialStats:
+        """
+        计算可合并的中间统计（一次性分析与分批流式分析共用）
+        
+        Args:
+            df: 语料DataFrame（需包含tokens列）
+            
+        Returns:
+            中间统计，可通过PartialStats.merge按批次累加
+        """
+        engine = GroupedAnalysisEngine({"": self})
+        return engine.collect(df, {"": np.ones(len(df), dtype=bool)})[""]
+    
+    def rule_masks(self, df: pd.DataFrame, content_col: str = 'content') -> np.ndarray:
+        """
+        扫描内容生成逐行规则位掩码（每条内容只扫描一次）
+        
+        Args:
+            df: 语料DataFrame
+            content_col: 内容列名
+            
+        Returns:
+            位掩码数组
+        """
+        contents = df[content_col].astype(str).tolist() if content_col in df.columns else [''] * len(df)
+        return self.rule_engine.scan(contents)
+    
+    def _collect_rule_stats(self, stats: PartialStats, contents: np.ndarray, weights: np.ndarray,
+                            sentiments: np.ndarray, dimension_rows: Dict[str, np.ndarray]) -> None:
+        """
+        子类扩展：计算规则分类、场景分布等中间统计
+        
+        Args:
+            stats: 待填充的中间统计
+            contents: 逐行内容（已转为字符串）
+            weights: 逐行计数权重
+            sentiments: 逐行情感标签
+            dimension_rows: {维度: 逐行是否包含该维度}
+        """
+        pass
     
-    def analyze_sentiment(self, df: pd.DataFrame, content_col: str = 'content') -> pd.DataFrame:
+    def analyze_sentiment(self, df: pd.DataFrame, content_col: str = 'content',
+                          tokens_col: str = 'tokens') -> pd.DataFrame:
         """
         情感分析（正面/中性/负面）
         
         Args:
             df: 语料DataFrame
             content_col: 内容列名
+            tokens_col: 分词结果列名（情感引擎复用分词结果评分时使用）
             
         Returns:
             添加sentiment列的DataFrame
         """
-        try:
-            from snownlp import SnowNLP
-            
-            def get_sentiment(text: str) -> str:
-                """获取情感倾向"""
-                try:
-                    s = SnowNLP(text)
-                    score = s.sentiments
-                    if score >= 0.6:
-                        return "正面"
-                    elif score <= 0.4:
-                        return "负面"
-                    else:
-                        return "中性"
-                except:
-                    return "中性"
+        token_arrays = vocabulary.arrays_from_frame(df, tokens_col) if self.sentiment_engine.uses_tokens else None
+        df['sentiment'] = self.sentiment_labels(df[content_col].tolist(), token_arrays)
+        return df
+    
+    def sentiment_labels(self, texts: List[str], token_arrays=None) -> List[str]:
+        """
+        批量计算情感标签
+        
+        Args:
+            texts: 文本列表
+            token_arrays: 与texts逐行对应的token数组（情感引擎复用分词结果评分时使用）
             
-            df['sentiment'] = df[content_col].apply(get_sentiment)
+        Returns:
+            情感标签列表（SnowNLP未安装时全部为中性）
+        """
+        try:
+            labels = self.sentiment_engine.analyze(texts, token_arrays)
             logger.info("情感分析完成")
+            return labels
         except ImportError:
             logger.warning("SnowNLP未安装，跳过情感分析")
-            df['sentiment'] = "中性"
-        
-        return df
+            return ["中性"] * len(texts)
     
     def calculate_sentiment_distribution(self, df: pd.DataFrame) -> Dict[str, int]:
         """
@@ -140,16 +415,17 @@ class BaseAnalyzer:
         if 'sentiment' not in df.columns:
             return {}
         
-        sentiment_dist = df['sentiment'].value_counts().to_dict()
+        counter = self._weighted_counter(df['sentiment'], self.row_weights(df).tolist())
+        sentiment_dist = dict(sorted(counter.items(), key=lambda x: x[1], reverse=True))
         return sentiment_dist
     
-    def plot_frequency_bar(self, frequency: Dict[str, int], title: str, 
+    def plot_frequency_bar(self, frequency: Union[Dict[str, int], TermCounts, HeavyHitterSketch], title: str, 
                           filename: str, top_k: int = 10) -> str:
         """
         绘制频次柱状图
         
         Args:
-            frequency: 词频字典
+            frequency: 词频字典或词频统计
             title: 图表标题
             filename: 保存文件名
             top_k: 显示Top K
@@ -237,15 +513,19 @@ class BaseAnalyzer:
         Returns:
             统计字典
         """
+        weights = self.row_weights(df)
+        total = int(weights.sum())
+        relevant = int(weights[df['is_relevant'].astype(bool)].sum()) if 'is_relevant' in df.columns else 0
         stats = {
-            "总语料数": len(df),
-            "相关语料数": df['is_relevant'].sum() if 'is_relevant' in df.columns else 0,
-            "相关占比": f"{(df['is_relevant'].sum() / len(df) * 100):.2f}%" if 'is_relevant' in df.columns and len(df) > 0 else "0%",
+            "总语料数": total,
+            "相关语料数": relevant,
+            "相关占比": f"{(relevant / total * 100):.2f}%" if 'is_relevant' in df.columns and total > 0 else "0%",
         }
         
         # 类型分布
         if 'type' in df.columns:
-            type_dist = df['type'].value_counts().to_dict()
+            counter = self._weighted_counter(df['type'], weights.tolist())
+            type_dist = dict(sorted(counter.items(), key=lambda x: x[1], reverse=True))
             stats["类型分布"] = type_dist
         
         # 情感分布
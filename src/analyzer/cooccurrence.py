@@ -0,0 +1,200 @@
+"""维度-词共现矩阵与关联强度指标"""
+import numpy as np
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from ..preprocess.vocabulary import TokenArrays, Vocabulary, vocabulary
+
+
+def _expand(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """将区间 [start, start + length) 依次展开为连续的下标数组"""
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return shifts + np.arange(len(shifts), dtype=np.int64)
+
+
+class CooccurrenceMatrix:
+    """
+    维度-词共现矩阵（稀疏）
+
+    语料token数组即文档-词矩阵 X 的CSR表示（offsets为行指针，values为列下标，重复token即计数），
+    各维度命中的行构成稀疏的维度-文档矩阵 H（按维度排序的 (维度, 行) 对，只构建一次）。
+    共现计数 Hᵀ·diag(w)·X 以一次向量化的外积展开计算：每个命中的 (维度, 行) 展开为该行的全部位置，
+    得到按维度连续、维度内按语料位置排列的COO元素，计算量与共现矩阵的非零元素数成正比，
+    不再对每个维度扫描整个语料。元素顺序保留了各维度内token的首次出现顺序（Top K并列项顺序不变）。
+    """
+
+    def __init__(self, arrays: TokenArrays, tables: List[np.ndarray], exclude_ids: List[int]):
+        """
+        构建维度-文档矩阵
+
+        Args:
+            arrays: 语料token数组
+            tables: 各维度的词表级命中数组（以token id为下标，token包含维度词时为True）
+            exclude_ids: 各维度自身的token id（共现词中排除，-1表示不在词表中）
+        """
+        self.arrays = arrays
+        self.n_dims = len(tables)
+        self.exclude_ids = np.asarray(exclude_ids, dtype=np.int64)
+
+        values = arrays.values.astype(np.int64, copy=False)
+        n_rows = len(arrays)
+        if self.n_dims == 0 or len(values) == 0:
+            self.hit_dims = np.zeros(0, dtype=np.int64)
+            self.hit_rows = np.zeros(0, dtype=np.int64)
+            self.bounds = np.zeros(self.n_dims + 1, dtype=np.int64)
+            return
+
+        # 词-维度关联（按token id排序的CSR），一个token可能包含多个维度词
+        table_ids = [np.flatnonzero(table) for table in tables]
+        token_ids = np.concatenate(table_ids)
+        token_dims = np.repeat(np.arange(self.n_dims, dtype=np.int64), [len(ids) for ids in table_ids])
+        order = np.argsort(token_ids, kind='stable')
+        token_dims = token_dims[order]
+        dim_counts = np.bincount(token_ids, minlength=int(values.max()) + 1)
+        dim_starts = np.cumsum(dim_counts) - dim_counts
+
+        # 命中维度的位置展开为 (维度, 行) 对，去重后即维度-文档矩阵
+        positions = np.flatnonzero(dim_counts[values] > 0)
+        lengths = dim_counts[values[positions]]
+        dims = token_dims[_expand(dim_starts[values[positions]], lengths)]
+        rows = np.repeat(arrays.row_index()[positions], lengths)
+        hits = np.unique(dims * n_rows + rows)
+        self.hit_dims = hits // n_rows
+        self.hit_rows = hits % n_rows
+        self.bounds = np.searchsorted(self.hit_dims, np.arange(self.n_dims + 1))
+
+    def dimension_rows(self, dim_index: int) -> np.ndarray:
+        """
+        包含该维度的行
+
+        Args:
+            dim_index: 维度序号
+
+        Returns:
+            逐行是否包含该维度的布尔数组
+        """
+        rows = np.zeros(len(self.arrays), dtype=bool)
+        rows[self.hit_rows[self.bounds[dim_index]:self.bounds[dim_index + 1]]] = True
+        return rows
+
+    def _document_terms(self) -> Tuple[np.ndarray, np.ndarray]:
+        """二值文档-词矩阵的CSR表示（每行内重复token只保留一个）"""
+        values = self.arrays.values.astype(np.int64, copy=False)
+        size = int(values.max()) + 1 if len(values) else 1
+        pairs = np.unique(self.arrays.row_index() * size + values)
+        indptr = np.searchsorted(pairs // size, np.arange(len(self.arrays) + 1))
+        return pairs % size, indptr
+
+    def cooccurrences(self, documents: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        计算共现矩阵的COO元素（Hᵀ·X 的展开，行权重与分组由调用方按行号计入）
+
+        Args:
+            documents: True时按文档计数（同一行内重复token只计一次），否则按token出现次数计数
+
+        Returns:
+            (行号数组, token id数组, 维度区段边界)，第d个维度的元素为 [bounds[d], bounds[d+1])，
+            区段内按语料位置排列，已排除维度自身的token
+        """
+        if len(self.hit_rows) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(self.n_dims + 1, dtype=np.int64)
+
+        if documents:
+            columns, indptr = self._document_terms()
+        else:
+            columns, indptr = self.arrays.values, self.arrays.offsets
+        starts = indptr[self.hit_rows]
+        lengths = indptr[self.hit_rows + 1] - starts
+        values = columns[_expand(starts, lengths)].astype(np.int64, copy=False)
+        rows = np.repeat(self.hit_rows, lengths)
+        dims = np.repeat(self.hit_dims, lengths)
+
+        keep = values != self.exclude_ids[dims]
+        rows, values, dims = rows[keep], values[keep], dims[keep]
+        return rows, values, np.searchsorted(dims, np.arange(self.n_dims + 1))
+
+
+class AssociationMetrics:
+    """
+    维度关联强度指标（基于文档级共现的2×2列联表）
+
+    对维度d与词t，a 为同时包含二者的语料条数，n_d、n_t 分别为包含维度、包含该词的条数，N 为语料总数：
+    提升度 lift = a·N / (n_d·n_t)，PMI = log2(lift)，χ² 为2×2列联表的卡方统计量。
+    条数均按去重权重计。共现条数低于 min_cooccurrence 的词不参与排序（低频词的提升度/PMI不稳定）。
+    """
+
+    # 支持的排序方式及显示名称
+    RANKINGS = {"count": "共现条数", "lift": "提升度", "pmi": "PMI", "chi2": "χ²"}
+
+    def __init__(self, ranking: str = "lift", min_cooccurrence: int = 2, top_k: int = 10,
+                 vocab: Optional[Vocabulary] = None):
+        """
+        初始化关联强度指标
+
+        Args:
+            ranking: 排序方式（count/lift/pmi/chi2）
+            min_cooccurrence: 参与排序的最小共现条数
+            top_k: 每个维度保留的关联词数量
+            vocab: 词表（默认使用全局词表）
+        """
+        if ranking not in self.RANKINGS:
+            raise ValueError(f"不支持的关联强度排序方式: {ranking}（可选: {', '.join(self.RANKINGS)}）")
+
+        self.ranking = ranking
+        self.min_cooccurrence = min_cooccurrence
+        self.top_k = top_k
+        self.vocab = vocab if vocab is not None else vocabulary
+
+    @property
+    def label(self) -> str:
+        """排序方式的显示名称"""
+        return self.RANKINGS[self.ranking]
+
+    def rank(self, cooccurrence: Counter, documents: Counter, dim_documents: int,
+             term_documents: np.ndarray, total: int) -> List[Dict[str, Any]]:
+        """
+        计算单个维度各共现词的关联强度并排序
+
+        Args:
+            cooccurrence: 共现词的出现次数（按首次出现顺序）
+            documents: 共现词的共现条数
+            dim_documents: 包含该维度的语料条数
+            term_documents: 以token id为下标的文档频次
+            total: 语料总数
+
+        Returns:
+            [{"关联词", "共现次数", "共现条数", "提升度", "PMI", "χ²"}, ...]，按排序指标降序，
+            并列时按共现条数降序、再按首次出现顺序
+        """
+        tokens = [token for token in cooccurrence if documents.get(token, 0) >= self.min_cooccurrence]
+        if not tokens or dim_documents <= 0 or total <= 0:
+            return []
+
+        ids = np.asarray([self.vocab.token_to_id[token] for token in tokens], dtype=np.int64)
+        a = np.asarray([documents[token] for token in tokens], dtype=np.float64)
+        n_t = np.zeros(len(ids), dtype=np.float64)
+        known = ids < len(term_documents)
+        n_t[known] = term_documents[ids[known]]
+        n_t = np.maximum(n_t, a)
+        n_d = float(dim_documents)
+
+        lift = a * total / (n_d * n_t)
+        pmi = np.log2(lift)
+        denominator = n_d * n_t * (total - n_d) * (total - n_t)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chi2 = np.where(denominator > 0,
+                            total * (a * total - n_d * n_t) ** 2 / denominator, 0.0)
+
+        score = {"count": a, "lift": lift, "pmi": pmi, "chi2": chi2}[self.ranking]
+        order = np.lexsort((np.arange(len(tokens)), -a, -score))[:self.top_k]
+        return [
+            {
+                "关联词": tokens[i],
+                "共现次数": int(cooccurrence[tokens[i]]),
+                "共现条数": int(a[i]),
+                "提升度": round(float(lift[i]), 4),
+                "PMI": round(float(pmi[i]), 4),
+                "χ²": round(float(chi2[i]), 2),
+            }
+            for i in order.tolist()
+        ]
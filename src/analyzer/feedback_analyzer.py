@@ -1,22 +1,62 @@
 """反馈语料分析器"""
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 from .base_analyzer import BaseAnalyzer
+from .cooccurrence import AssociationMetrics
+from .partial_stats import PartialStats
+from .sentiment_engine import SentimentEngine
+from .sketches import HeavyHitterSketch, SketchSettings
+from .term_counts import TermCounts
+from ..preprocess.dimension_marker import DimensionMatcher
+from ..utils.cache import CacheManager
 from ..utils.logger import logger
 
 
 class FeedbackAnalyzer(BaseAnalyzer):
     """反馈语料分析器（聚焦效果反馈，适配自定义维度）"""
     
-    def __init__(self, custom_dimensions: List[str], output_dir: str = "output"):
+    # 问题分类规则 {类别: [关键词, ...]}（可通过配置 analyzer.rules.feedback.categories 覆盖）
+    category_rules = {
+        "操作体验": ["操作", "复杂", "困难", "不会用", "难用", "麻烦"],
+        "内容适配": ["内容", "不合适", "不适配", "不符合", "缺少"],
+        "格式问题": ["格式", "排版", "错乱", "变形", "显示"],
+        "功能缺失": ["功能", "缺少", "没有", "不支持", "无法"],
+        "性能问题": ["慢", "卡", "加载", "延迟", "响应"],
+        "效果满意": ["好", "满意", "不错", "很棒", "喜欢", "适合"]
+    }
+    
+    # 场景规则 {场景: [关键词, ...]}，按顺序取第一个命中的场景（可通过配置 analyzer.rules.feedback.scenes 覆盖）
+    scene_rules = {
+        "课堂教学": ["课堂", "上课", "教学", "讲课", "学生", "老师"],
+        "工作会议": ["工作", "会议", "汇报", "报告", "总结"],
+        "项目演示": ["项目", "展示", "演示", "介绍", "方案"],
+        "培训学习": ["培训", "学习", "教程", "指导"],
+        "其他": []
+    }
+    
+    def __init__(self, custom_dimensions: List[str], output_dir: str = "output",
+                 cache: Optional[CacheManager] = None,
+                 dimension_matcher: Optional[DimensionMatcher] = None,
+                 rules: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 sentiment_engine: Optional[SentimentEngine] = None,
+                 sketch: Optional[SketchSettings] = None,
+                 association_metrics: Optional[AssociationMetrics] = None):
         """
         初始化反馈语料分析器
         
         Args:
             custom_dimensions: 自定义维度列表
             output_dir: 输出目录
+            cache: 持久化结果缓存，None表示不缓存
+            dimension_matcher: 编译后的维度匹配器，用于维度加权词频
+            rules: 规则表 {"categories": {...}, "scenes": {...}}，缺省项使用内置规则
+            sentiment_engine: 批量情感分析引擎，None时按cache创建单进程引擎
+            sketch: 近似统计参数，None表示精确统计
+            association_metrics: 维度关联强度指标，None表示只统计共现次数
         """
-        super().__init__(custom_dimensions, output_dir)
+        super().__init__(custom_dimensions, output_dir, cache, dimension_matcher, rules, sentiment_engine, sketch,
+                         association_metrics)
         logger.info("初始化反馈语料分析器")
     
     def analyze(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -29,123 +69,100 @@ class FeedbackAnalyzer(BaseAnalyzer):
         Returns:
             分析结果字典
         """
-        logger.info(f"开始分析反馈语料，共 {len(df)} 条")
+        logger.info(f"开始分析反馈语料，共 {self.count_rows(df)} 条")
+        stats = self.collect_stats(df)
+        return self.summarize(stats)
+    
+    def summarize(self, stats: PartialStats) -> Dict[str, Any]:
+        """
+        由（合并后的）中间统计生成反馈语料分析结果
         
+        Args:
+            stats: 中间统计
+            
+        Returns:
+            分析结果字典
+        """
         results = {
             "维度": self.custom_dimensions,
             "分析类型": "反馈语料（效果反馈）"
         }
         
         # 1. 基础统计
-        results["基础统计"] = self.generate_summary_stats(df)
+        results["基础统计"] = stats.summary_stats()
         
         # 2. 频次分析
-        logger.info("进行频次分析...")
-        frequency = self.calculate_frequency(df)
+        frequency = stats.frequency
         results["总体词频Top10"] = self.get_top_k_tokens(frequency, k=10)
         
         # 维度相关词频
-        dim_frequency = self.calculate_dimension_frequency(df)
+        dim_frequency = stats.dim_frequency
         results["维度相关词频Top10"] = self.get_top_k_tokens(dim_frequency, k=10)
         
+        # 近似统计模式下注明误差界
+        sketch_report = stats.sketch_report()
+        if sketch_report is not None:
+            results["近似统计"] = sketch_report
+        
         # 3. 情感分析
-        logger.info("进行情感分析...")
-        df = self.analyze_sentiment(df)
-        sentiment_dist = self.calculate_sentiment_distribution(df)
+        sentiment_dist = stats.sentiment_distribution()
         results["情感分布"] = sentiment_dist
         
         # 4. 问题分类分析
-        logger.info("进行问题分类分析...")
-        problem_categories = self._classify_problems(df)
+        problem_categories = stats.category_counts
         results["问题分类"] = problem_categories
         
         # 5. 关联特征分析
-        logger.info("进行关联特征分析...")
-        associations = self._analyze_associations(df)
-        results["关联特征"] = associations
+        results["关联特征"] = stats.top_associations(k=5)
+        association_strength = stats.association_strength(self.association_metrics)
+        if association_strength is not None:
+            results["关联强度"] = association_strength
         
         # 6. 场景分析
-        logger.info("进行场景分析...")
-        scenes = self._analyze_scenes(df)
-        results["场景分布"] = scenes
+        results["场景分布"] = stats.scene_counts
         
         # 7. 优化建议生成
         logger.info("生成优化建议...")
-        suggestions = self._generate_suggestions(df, problem_categories, sentiment_dist)
+        suggestions = self._generate_suggestions(problem_categories, sentiment_dist, stats.dim_sentiment)
         results["优化建议"] = suggestions
         
         # 8. 生成可视化图表
         logger.info("生成可视化图表...")
-        self._generate_charts(df, frequency, dim_frequency, sentiment_dist)
+        self._generate_charts(frequency, dim_frequency, sentiment_dist)
         
         logger.info("反馈语料分析完成")
         return results
     
-    def _classify_problems(self, df: pd.DataFrame) -> Dict[str, int]:
+    def _collect_rule_stats(self, stats: PartialStats, contents: np.ndarray, weights: np.ndarray,
+                            sentiments: np.ndarray, dimension_rows: Dict[str, np.ndarray]) -> None:
         """
-        问题分类（基于关键词规则）
+        计算问题分类、场景分布及各维度情感统计
         
         Args:
-            df: 语料DataFrame
-            
-        Returns:
-            问题分类统计
+            stats: 待填充的中间统计
+            contents: 逐行内容
+            weights: 逐行计数权重
+            sentiments: 逐行情感标签
+            dimension_rows: {维度: 逐行是否包含该维度}
         """
-        # 定义问题关键词
-        problem_keywords = {
-            "操作体验": ["操作", "复杂", "困难", "不会用", "难用", "麻烦"],
-            "内容适配": ["内容", "不合适", "不适配", "不符合", "缺少"],
-            "格式问题": ["格式", "排版", "错乱", "变形", "显示"],
-            "功能缺失": ["功能", "缺少", "没有", "不支持", "无法"],
-            "性能问题": ["慢", "卡", "加载", "延迟", "响应"],
-            "效果满意": ["好", "满意", "不错", "很棒", "喜欢", "适合"]
-        }
-        
-        problem_counts = {category: 0 for category in problem_keywords.keys()}
+        logger.info("进行问题分类与场景分析...")
+        masks = self.rule_engine.scan(contents.tolist())
+        stats.category_counts = self.rule_engine.category_counts(masks, weights)
+        stats.scene_counts = self.rule_engine.scene_counts(masks, weights)
         
-        for _, row in df.iterrows():
-            content = str(row.get('content', ''))
-            tokens = row.get('tokens', [])
-            
-            # 检查每个问题类别
-            for category, keywords in problem_keywords.items():
-                if any(kw in content or kw in tokens for kw in keywords):
-                    problem_counts[category] += 1
-        
-        return problem_counts
+        stats.dim_sentiment = self._count_dim_sentiment(weights, sentiments, dimension_rows)
     
-    def _analyze_associations(self, df: pd.DataFrame) -> Dict[str, List[str]]:
+    def _classify_problems(self, df: pd.DataFrame) -> Dict[str, int]:
         """
-        分析自定义维度的关联特征
+        问题分类（基于关键词规则）
         
         Args:
             df: 语料DataFrame
             
         Returns:
-            关联特征字典
+            问题分类统计
         """
-        associations = {}
-        
-        for dim in self.custom_dimensions:
-            # 找出包含该维度的语料
-            dim_related = df[df['tokens'].apply(
-                lambda tokens: any(dim in token or token == dim for token in tokens)
-            )]
-            
-            if len(dim_related) == 0:
-                associations[dim] = []
-                continue
-            
-            # 统计与该维度共现的高频词
-            all_tokens = []
-            for tokens in dim_related['tokens']:
-                all_tokens.extend([t for t in tokens if t != dim])
-            
-            from collections import Counter
-            top_associated = Counter(all_tokens).most_common(5)
-            associations[dim] = [word for word, count in top_associated]
-        
-        return associations
+        return self.rule_engine.category_counts(self.rule_masks(df), self.row_weights(df).to_numpy())
     
     def _analyze_scenes(self, df: pd.DataFrame) -> Dict[str, int]:
         """
@@ -157,45 +174,36 @@ class FeedbackAnalyzer(BaseAnalyzer):
         Returns:
             场景分布统计
         """
-        # 定义场景关键词
-        scene_keywords = {
-            "课堂教学": ["课堂", "上课", "教学", "讲课", "学生", "老师"],
-            "工作会议": ["工作", "会议", "汇报", "报告", "总结"],
-            "项目演示": ["项目", "展示", "演示", "介绍", "方案"],
-            "培训学习": ["培训", "学习", "教程", "指导"],
-            "其他": []
-        }
-        
-        scene_counts = {scene: 0 for scene in scene_keywords.keys()}
+        return self.rule_engine.scene_counts(self.rule_masks(df), self.row_weights(df).to_numpy())
+    
+    def _count_dim_sentiment(self, weights: np.ndarray, sentiments: np.ndarray,
+                             dimension_rows: Dict[str, np.ndarray]) -> Dict[str, List[int]]:
+        """
+        统计各维度相关语料的条数与负面条数
         
-        for _, row in df.iterrows():
-            content = str(row.get('content', ''))
-            tokens = row.get('tokens', [])
-            
-            matched = False
-            # 检查每个场景
-            for scene, keywords in scene_keywords.items():
-                if scene == "其他":
-                    continue
-                if any(kw in content or kw in tokens for kw in keywords):
-                    scene_counts[scene] += 1
-                    matched = True
-                    break
+        Args:
+            weights: 逐行计数权重
+            sentiments: 逐行情感标签
+            dimension_rows: {维度: 逐行是否包含该维度}
             
-            if not matched:
-                scene_counts["其他"] += 1
-        
-        return scene_counts
+        Returns:
+            {维度: [相关条数, 负面条数]}
+        """
+        negative = sentiments == '负面'
+        return {
+            dim: [int(weights[rows].sum()), int(weights[rows & negative].sum())]
+            for dim, rows in dimension_rows.items()
+        }
     
-    def _generate_suggestions(self, df: pd.DataFrame, problem_categories: Dict[str, int], 
-                             sentiment_dist: Dict[str, int]) -> List[str]:
+    def _generate_suggestions(self, problem_categories: Dict[str, int], sentiment_dist: Dict[str, int], 
+                             dim_sentiment: Dict[str, List[int]]) -> List[str]:
         """
         基于反馈生成优化建议
         
         Args:
-            df: 语料DataFrame
             problem_categories: 问题分类统计
             sentiment_dist: 情感分布
+            dim_sentiment: 各维度相关语料的 [相关条数, 负面条数]
             
         Returns:
             优化建议列表
@@ -217,21 +225,17 @@ class FeedbackAnalyzer(BaseAnalyzer):
         
         # 针对自定义维度的建议
         for dim in self.custom_dimensions:
-            dim_related = df[df['tokens'].apply(
-                lambda tokens: any(dim in token or token == dim for token in tokens)
-            )]
+            dim_related, dim_negative = dim_sentiment.get(dim, [0, 0])
             
-            if len(dim_related) > 0:
+            if dim_related > 0:
                 # 分析该维度的情感倾向
-                if 'sentiment' in dim_related.columns:
-                    dim_negative = (dim_related['sentiment'] == '负面').sum()
-                    dim_negative_ratio = dim_negative / len(dim_related)
-                    
-                    if dim_negative_ratio > 0.4:
-                        suggestions.append(
-                            f"针对「{dim}」维度的反馈中负面占比{dim_negative_ratio*100:.1f}%，"
-                            f"建议深入分析该维度相关的PPT功能/场景优化方向"
-                        )
+                dim_negative_ratio = dim_negative / dim_related
+                
+                if dim_negative_ratio > 0.4:
+                    suggestions.append(
+                        f"针对「{dim}」维度的反馈中负面占比{dim_negative_ratio*100:.1f}%，"
+                        f"建议深入分析该维度相关的PPT功能/场景优化方向"
+                    )
         
         # 通用建议
         if not suggestions:
@@ -239,13 +243,13 @@ class FeedbackAnalyzer(BaseAnalyzer):
         
         return suggestions
     
-    def _generate_charts(self, df: pd.DataFrame, frequency: Dict[str, int], 
-                        dim_frequency: Dict[str, int], sentiment_dist: Dict[str, int]) -> None:
+    def _generate_charts(self, frequency: Union[TermCounts, HeavyHitterSketch],
+                        dim_frequency: Union[TermCounts, HeavyHitterSketch],
+                        sentiment_dist: Dict[str, int]) -> None:
         """
         生成所有图表
         
         Args:
-            df: 语料DataFrame
             frequency: 总体词频
             dim_frequency: 维度相关词频
             sentiment_dist: 情感分布
@@ -267,8 +271,8 @@ class FeedbackAnalyzer(BaseAnalyzer):
         )
         
         # 3. 情感分布饼图
-        self.plot_sentiment_distribution(
-            df,
+        self.plot_pie_chart(
+            sentiment_dist,
             f"反馈语料-情感分布",
             f"{dim_str}_反馈_情感分布.png"
         )
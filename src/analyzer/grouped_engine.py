@@ -0,0 +1,268 @@
+"""分组分析引擎（请求/反馈等子集的中间统计一次遍历完成）"""
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from .cooccurrence import CooccurrenceMatrix
+from .partial_stats import PartialStats
+from .sketches import HyperLogLog
+from .term_counts import TermCounts
+from ..preprocess.vocabulary import vocabulary
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from .base_analyzer import BaseAnalyzer
+
+
+class GroupedAnalysisEngine:
+    """
+    分组分析引擎
+
+    各分组以行掩码表示（不复制子集DataFrame），分组可以重叠（如type同时包含"请求"和"反馈"）。
+    每行按所属分组组合编码为一个组合码（第i位表示属于第i个分组），词频、维度相关词频、关联词、
+    类型分布、情感分布均在整个语料的token数组上按 (组合码, id) 一次计数，再按位汇总到各分组；
+    分词数组、行权重、维度命中行、情感标签等逐行结果对所有分组只计算一次。
+    计数及并列项顺序（按分组内首次出现顺序）与分别复制各子集后逐项统计一致。
+    """
+
+    def __init__(self, analyzers: Dict[str, "BaseAnalyzer"]):
+        """
+        初始化分组分析引擎
+
+        Args:
+            analyzers: {分组名: 分析器}，各分组的规则分类/场景等由对应分析器计算
+        """
+        self.analyzers = analyzers
+
+    def collect(self, df: pd.DataFrame, masks: Dict[str, np.ndarray],
+                content_col: str = 'content', tokens_col: str = 'tokens') -> Dict[str, PartialStats]:
+        """
+        计算各分组的中间统计
+
+        Args:
+            df: 语料DataFrame（需包含tokens或token_ids列）
+            masks: {分组名: 行掩码}（布尔数组，与df等长）
+            content_col: 内容列名
+            tokens_col: tokens列名（无token_ids列时使用）
+
+        Returns:
+            {分组名: 中间统计}，无语料的分组返回空统计
+        """
+        results = {
+            name: PartialStats(analyzer.custom_dimensions, analyzer.sketch) for name, analyzer in self.analyzers.items()
+        }
+        names = [name for name in self.analyzers if np.asarray(masks[name]).any()]
+        if not names:
+            return results
+
+        members = [np.asarray(masks[name], dtype=bool) for name in names]
+        codes = np.zeros(len(df), dtype=np.int64)
+        for bit, member in enumerate(members):
+            codes |= member.astype(np.int64) << bit
+        # 各分组包含的组合码
+        group_codes = [[code for code in range(1, 1 << len(names)) if code >> bit & 1] for bit in range(len(names))]
+
+        first = self.analyzers[names[0]]
+        weights = first.row_weights(df).to_numpy().astype(np.int64, copy=False)
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        values = arrays.values
+        position_codes = codes[arrays.row_index()]
+        position_weights = weights[arrays.row_index()]
+        dimensions = first.custom_dimensions
+        sketch = first.sketch
+
+        # 1. 基础统计
+        for name, member in zip(names, members):
+            stats = results[name]
+            stats.total = int(weights[member].sum())
+            if 'is_relevant' in df.columns:
+                stats.has_relevant_col = True
+                stats.relevant = int(weights[member & df['is_relevant'].astype(bool).to_numpy()].sum())
+            stats.has_type_col = 'type' in df.columns
+        if 'type' in df.columns:
+            type_codes, type_values = pd.factorize(df['type'])
+            type_counts = count_by_group(codes, type_codes, weights, group_codes)
+            for name, (ids, counts) in zip(names, type_counts):
+                results[name].type_counts.update(dict(zip(type_values[ids].tolist(), counts)))
+
+        # 2. 频次分析（总体词频与维度相关词频；精确模式同时统计文档频次，近似模式并入高频词摘要）
+        logger.info("进行频次分析...")
+        size = len(vocabulary)
+        row_index = arrays.row_index()
+        if sketch is None:
+            for name, counts in zip(names, self._term_counts_by_group(
+                    codes, weights, row_index, values, group_codes, size)):
+                results[name].frequency = counts
+        else:
+            content_hashes = HyperLogLog.hash_texts(df[content_col].astype(str))
+            for name, member, (ids, counts) in zip(names, members, count_by_group(
+                    position_codes, values, position_weights, group_codes)):
+                results[name].frequency = sketch.heavy_hitters(ids, counts)
+                results[name].distinct_tokens.add_hashes(HyperLogLog.hash_ids(ids))
+                results[name].distinct_contents.add_hashes(content_hashes[member])
+
+        if dimensions and len(values) > 0:
+            related = np.zeros(size, dtype=bool)
+            for dim in dimensions:
+                table = first.dimension_table(dim, "related")
+                related[:len(table)] |= table[:size]
+            positions = related[values]
+            if sketch is None:
+                for name, counts in zip(names, self._term_counts_by_group(
+                        codes, weights, row_index[positions], values[positions], group_codes, size)):
+                    results[name].dim_frequency = counts
+            else:
+                for name, (ids, counts) in zip(names, count_by_group(
+                        position_codes[positions], values[positions], position_weights[positions], group_codes)):
+                    results[name].dim_frequency = sketch.heavy_hitters(ids, counts)
+
+        # 3. 情感分析（各分组共用的情感引擎只对分组并集分析一次）
+        logger.info("进行情感分析...")
+        contents = df[content_col].astype(str).to_numpy()
+        sentiments = self._sentiments(df, arrays, names, members, content_col)
+        sentiment_codes, sentiment_values = pd.factorize(pd.Series(sentiments, dtype=object))
+        for name, (ids, counts) in zip(names, count_by_group(
+                codes, sentiment_codes, weights, group_codes)):
+            results[name].sentiment_counts.update(dict(zip(sentiment_values[ids].tolist(), counts)))
+
+        # 4. 关联特征分析（包含维度词的语料中、除维度词本身以外的词；所有维度由一次共现矩阵展开得到）
+        logger.info("进行关联特征分析...")
+        matrix = CooccurrenceMatrix(arrays, [first.dimension_table(dim) for dim in dimensions],
+                                    [vocabulary.token_to_id.get(dim, -1) for dim in dimensions])
+        dimension_rows = {dim: matrix.dimension_rows(d) for d, dim in enumerate(dimensions)}
+        rows, ids, bounds = matrix.cooccurrences()
+        for d, dim in enumerate(dimensions):
+            block = slice(bounds[d], bounds[d + 1])
+            for name, (dim_ids, counts) in zip(names, count_by_group(
+                    codes[rows[block]], ids[block], weights[rows[block]], group_codes)):
+                results[name].associations[dim] = (
+                    sketch.heavy_hitters(dim_ids, counts) if sketch is not None
+                    else Counter(dict(zip(vocabulary.decode(dim_ids), counts)))
+                )
+
+        # 关联强度所需的文档级共现条数（近似统计模式下不计算）
+        if first.association_metrics is not None and sketch is None:
+            rows, ids, bounds = matrix.cooccurrences(documents=True)
+            for d, dim in enumerate(dimensions):
+                block = slice(bounds[d], bounds[d + 1])
+                for name, member, (dim_ids, counts) in zip(names, members, count_by_group(
+                        codes[rows[block]], ids[block], weights[rows[block]], group_codes)):
+                    results[name].association_documents[dim] = Counter(dict(zip(vocabulary.decode(dim_ids), counts)))
+                    results[name].dim_documents[dim] = int(weights[dimension_rows[dim] & member].sum())
+
+        # 5. 规则分类/场景分析（各分组的规则表不同，只扫描分组内的行）
+        for name, member in zip(names, members):
+            self.analyzers[name]._collect_rule_stats(
+                results[name], contents[member], weights[member], sentiments[member],
+                {dim: rows[member] for dim, rows in dimension_rows.items()}
+            )
+
+        return results
+
+    def _sentiments(self, df: pd.DataFrame, arrays, names: List[str],
+                    members: List[np.ndarray], content_col: str) -> np.ndarray:
+        """
+        计算各分组所需的逐行情感标签（共用同一情感引擎的分组只对其并集分析一次）
+
+        Args:
+            df: 语料DataFrame
+            arrays: 语料token数组
+            names: 有语料的分组名
+            members: 各分组行掩码
+            content_col: 内容列名
+
+        Returns:
+            逐行情感标签数组（不属于任何分组的行为None）
+        """
+        sentiments = np.full(len(df), None, dtype=object)
+        by_engine: Dict[int, Tuple["BaseAnalyzer", np.ndarray]] = {}
+        for name, member in zip(names, members):
+            analyzer = self.analyzers[name]
+            key = id(analyzer.sentiment_engine)
+            if key in by_engine:
+                by_engine[key] = (by_engine[key][0], by_engine[key][1] | member)
+            else:
+                by_engine[key] = (analyzer, member.copy())
+
+        texts = df[content_col].to_numpy()
+        for analyzer, rows in by_engine.values():
+            uses_tokens = analyzer.sentiment_engine.uses_tokens
+            if rows.all():
+                sentiments[:] = analyzer.sentiment_labels(texts.tolist(), arrays if uses_tokens else None)
+            else:
+                sentiments[rows] = analyzer.sentiment_labels(
+                    texts[rows].tolist(), arrays.take(rows) if uses_tokens else None
+                )
+        return sentiments
+
+    def _term_counts_by_group(self, codes: np.ndarray, weights: np.ndarray, rows: np.ndarray,
+                              values: np.ndarray, group_codes: List[List[int]], size: int) -> List[TermCounts]:
+        """
+        按分组统计词频与文档频次
+
+        Args:
+            codes: 每行的组合码
+            weights: 每行的计数权重
+            rows: 参与统计的各位置所属行号
+            values: 参与统计的各位置token id
+            group_codes: 各分组包含的组合码
+            size: 词表大小
+
+        Returns:
+            各分组的词频统计
+        """
+        values = values.astype(np.int64, copy=False)
+        term_frequency = count_by_group(codes[rows], values, weights[rows], group_codes)
+        # 文档频次：同一行内重复出现的token只计一次
+        pairs = np.unique(rows * size + values)
+        pair_rows = pairs // size
+        document_frequency = count_by_group(codes[pair_rows], pairs % size, weights[pair_rows], group_codes)
+        return [
+            TermCounts.from_counts(size, ids, tf, df_ids, df)
+            for (ids, tf), (df_ids, df) in zip(term_frequency, document_frequency)
+        ]
+
+
+def count_by_group(codes: np.ndarray, values: np.ndarray, weights: np.ndarray,
+                   group_codes: List[List[int]]) -> List[Tuple[List[int], List[int]]]:
+    """
+    按 (组合码, 值) 一次加权计数，再汇总到各分组
+
+    值先在批次内重新编号（np.unique），计数数组的大小与批次内出现的不同值个数相关，
+    与全局词表大小无关。
+
+    Args:
+        codes: 每个元素的组合码（0表示不属于任何分组）
+        values: 每个元素的值编码（负数表示空值，不计数）
+        weights: 每个元素的权重
+        group_codes: 各分组包含的组合码
+
+    Returns:
+        每个分组的 (值编码列表, 计数列表)，按值在分组内首次出现的顺序排列
+    """
+    valid = (codes > 0) & (values >= 0)
+    if not valid.all():
+        codes, values, weights = codes[valid], values[valid], weights[valid]
+    if len(values) == 0:
+        return [([], []) for _ in group_codes]
+
+    unique_values, local_values = np.unique(values, return_inverse=True)
+    size = len(unique_values)
+    keys = codes * size + local_values.reshape(-1)
+    unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse.reshape(-1), weights=weights)
+    key_codes = unique_keys // size
+    key_values = unique_keys % size
+
+    results = []
+    for member_codes in group_codes:
+        in_group = np.isin(key_codes, member_codes)
+        group_values = key_values[in_group]
+        group_counts = np.bincount(group_values, weights=counts[in_group], minlength=size)
+        # 分组内首次出现位置：各组合码首次出现位置的最小值
+        group_first = np.full(size, len(keys), dtype=np.int64)
+        np.minimum.at(group_first, group_values, first_index[in_group])
+        ids = np.unique(group_values)
+        ids = ids[np.argsort(group_first[ids], kind='stable')]
+        results.append((unique_values[ids].tolist(), group_counts[ids].astype(np.int64).tolist()))
+    return results
@@ -0,0 +1,186 @@
+"""可合并的分析中间统计"""
+from collections import Counter
+from typing import Dict, List, Any, Optional
+from .cooccurrence import AssociationMetrics
+from .sketches import SketchSettings
+from .term_counts import TermCounts
+
+
+class PartialStats:
+    """单批次（或多批次合并后）的分析中间统计，支持按批次增量合并"""
+
+    def __init__(self, custom_dimensions: List[str], sketch: Optional[SketchSettings] = None):
+        """
+        初始化中间统计
+
+        Args:
+            custom_dimensions: 自定义维度列表
+            sketch: 近似统计参数，None表示精确统计；启用时词频与关联词使用有界内存的高频词摘要，
+                并以HyperLogLog估计不同词条数和不同内容数
+        """
+        self.custom_dimensions = custom_dimensions
+        self.sketch = sketch
+        # 基础统计
+        self.total = 0
+        self.relevant = 0
+        self.has_relevant_col = False
+        self.has_type_col = False
+        self.type_counts: Counter = Counter()
+        # 词频/情感
+        self.frequency = sketch.heavy_hitters() if sketch else TermCounts()
+        self.dim_frequency = sketch.heavy_hitters() if sketch else TermCounts()
+        self.sentiment_counts: Counter = Counter()
+        # 规则分类（需求分类/问题分类）与场景分布
+        self.category_counts: Dict[str, int] = {}
+        self.scene_counts: Dict[str, int] = {}
+        # 维度关联：{维度: 共现词Counter}
+        self.associations: Dict[str, Counter] = {
+            dim: sketch.heavy_hitters() if sketch else Counter() for dim in custom_dimensions
+        }
+        # 维度关联强度的文档级统计（启用关联强度时填充）：{维度: 共现条数Counter}、{维度: 包含维度的条数}
+        self.association_documents: Dict[str, Counter] = {dim: Counter() for dim in custom_dimensions}
+        self.dim_documents: Dict[str, int] = {dim: 0 for dim in custom_dimensions}
+        # 维度相关语料的情感：{维度: [相关条数, 负面条数]}
+        self.dim_sentiment: Dict[str, List[int]] = {dim: [0, 0] for dim in custom_dimensions}
+        # 近似统计模式下的基数估计（不同词条数、不同内容数）
+        self.distinct_tokens = sketch.distinct() if sketch else None
+        self.distinct_contents = sketch.distinct() if sketch else None
+
+    def merge(self, other: "PartialStats") -> "PartialStats":
+        """
+        合并另一份中间统计（按批次顺序合并，保证Top K并列项顺序与一次性分析一致）
+
+        Args:
+            other: 待合并的中间统计
+
+        Returns:
+            合并后的自身
+        """
+        self.total += other.total
+        self.relevant += other.relevant
+        self.has_relevant_col = self.has_relevant_col or other.has_relevant_col
+        self.has_type_col = self.has_type_col or other.has_type_col
+        self.type_counts.update(other.type_counts)
+
+        self.frequency.merge(other.frequency)
+        self.dim_frequency.merge(other.dim_frequency)
+        self.sentiment_counts.update(other.sentiment_counts)
+
+        for category, count in other.category_counts.items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + count
+        for scene, count in other.scene_counts.items():
+            self.scene_counts[scene] = self.scene_counts.get(scene, 0) + count
+
+        for dim, counter in other.associations.items():
+            current = self.associations.get(dim)
+            if current is None:
+                self.associations[dim] = counter
+            elif isinstance(current, Counter):
+                current.update(counter)
+            else:
+                current.merge(counter)
+        for dim, counter in other.association_documents.items():
+            self.association_documents.setdefault(dim, Counter()).update(counter)
+        for dim, count in other.dim_documents.items():
+            self.dim_documents[dim] = self.dim_documents.get(dim, 0) + count
+        for dim, (related, negative) in other.dim_sentiment.items():
+            current = self.dim_sentiment.setdefault(dim, [0, 0])
+            current[0] += related
+            current[1] += negative
+
+        if self.distinct_tokens is not None and other.distinct_tokens is not None:
+            self.distinct_tokens.merge(other.distinct_tokens)
+            self.distinct_contents.merge(other.distinct_contents)
+
+        return self
+
+    def sketch_report(self) -> Optional[Dict[str, Any]]:
+        """
+        近似统计的误差说明
+
+        Returns:
+            {指标: 数值}，精确统计时为None
+        """
+        if self.sketch is None:
+            return None
+
+        bound = self.sketch.top_k_error
+        return {
+            "统计方式": "近似（Misra-Gries/Space-Saving高频词摘要 + HyperLogLog基数估计）",
+            # 词频为真实词频的下界，真实词频 ≤ 词频 + 误差上限
+            "总体词频误差上限": self.frequency.error,
+            "维度相关词频误差上限": self.dim_frequency.error,
+            # 维度关联词的共现次数同样为下界，各维度的误差上限取其最大值
+            "关联词共现次数误差上限": max(
+                (counter.error for counter in self.associations.values() if hasattr(counter, "error")), default=0
+            ),
+            "词频误差界": f"≤ {bound:.4%} × 词条总数({self.frequency.total}) = {int(bound * self.frequency.total)}",
+            "不同词条数（估算）": self.distinct_tokens.count(),
+            "不同内容数（估算）": self.distinct_contents.count(),
+            "基数估计相对标准误差": f"±{self.distinct_tokens.relative_error:.2%}",
+        }
+
+    def summary_stats(self) -> Dict[str, Any]:
+        """
+        生成与BaseAnalyzer.generate_summary_stats一致的汇总统计
+
+        Returns:
+            统计字典
+        """
+        stats = {
+            "总语料数": self.total,
+            "相关语料数": self.relevant if self.has_relevant_col else 0,
+            "相关占比": f"{(self.relevant / self.total * 100):.2f}%" if self.has_relevant_col and self.total > 0 else "0%",
+        }
+
+        if self.has_type_col:
+            # 与value_counts一致：按数量降序
+            stats["类型分布"] = dict(sorted(self.type_counts.items(), key=lambda x: x[1], reverse=True))
+
+        return stats
+
+    def sentiment_distribution(self) -> Dict[str, int]:
+        """
+        情感分布（与value_counts一致：按数量降序）
+
+        Returns:
+            情感分布字典 {sentiment: count}
+        """
+        return dict(sorted(self.sentiment_counts.items(), key=lambda x: x[1], reverse=True))
+
+    def top_associations(self, k: int = 5) -> Dict[str, List[str]]:
+        """
+        各维度共现频次最高的关联词
+
+        Args:
+            k: 每个维度返回的关联词数量
+
+        Returns:
+            关联特征字典 {维度: [关联词, ...]}
+        """
+        return {
+            dim: [word for word, count in counter.most_common(k)]
+            for dim, counter in self.associations.items()
+        }
+
+    def association_strength(self, metrics: Optional[AssociationMetrics]) -> Optional[Dict[str, Any]]:
+        """
+        各维度关联词的关联强度（提升度/PMI/χ²）
+
+        Args:
+            metrics: 关联强度指标，None表示未启用
+
+        Returns:
+            {"排序方式": 指标名称, "维度": {维度: [关联词指标, ...]}}，未启用或近似统计模式下为None
+        """
+        if metrics is None or self.sketch is not None:
+            return None
+
+        return {
+            "排序方式": metrics.label,
+            "维度": {
+                dim: metrics.rank(counter, self.association_documents.get(dim, Counter()),
+                                  self.dim_documents.get(dim, 0), self.frequency.df, self.total)
+                for dim, counter in self.associations.items()
+            },
+        }
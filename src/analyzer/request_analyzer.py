@@ -1,22 +1,61 @@
 """请求语料分析器"""
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 from .base_analyzer import BaseAnalyzer
+from .cooccurrence import AssociationMetrics
+from .partial_stats import PartialStats
+from .sentiment_engine import SentimentEngine
+from .sketches import HeavyHitterSketch, SketchSettings
+from .term_counts import TermCounts
+from ..preprocess.dimension_marker import DimensionMatcher
+from ..utils.cache import CacheManager
 from ..utils.logger import logger
 
 
 class RequestAnalyzer(BaseAnalyzer):
     """请求语料分析器（聚焦需求分析，适配自定义维度）"""
     
-    def __init__(self, custom_dimensions: List[str], output_dir: str = "output"):
+    # 需求分类规则 {类别: [关键词, ...]}（可通过配置 analyzer.rules.request.categories 覆盖）
+    category_rules = {
+        "模板定制": ["模板", "定制", "样式", "风格", "主题"],
+        "内容模块": ["内容", "模块", "功能", "添加", "新增"],
+        "格式适配": ["格式", "适配", "兼容", "导出", "排版"],
+        "页数相关": ["页数", "页面", "幻灯片", "多少页"],
+        "操作简化": ["简单", "容易", "方便", "快速", "操作"]
+    }
+    
+    # 场景规则 {场景: [关键词, ...]}，按顺序取第一个命中的场景（可通过配置 analyzer.rules.request.scenes 覆盖）
+    scene_rules = {
+        "课堂演示": ["课堂", "上课", "教学", "讲课", "学生"],
+        "工作汇报": ["工作", "汇报", "总结", "报告", "会议"],
+        "项目展示": ["项目", "展示", "演示", "介绍", "方案"],
+        "培训材料": ["培训", "学习", "教程", "指导"],
+        "其他": []
+    }
+    
+    def __init__(self, custom_dimensions: List[str], output_dir: str = "output",
+                 cache: Optional[CacheManager] = None,
+                 dimension_matcher: Optional[DimensionMatcher] = None,
+                 rules: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 sentiment_engine: Optional[SentimentEngine] = None,
+                 sketch: Optional[SketchSettings] = None,
+                 association_metrics: Optional[AssociationMetrics] = None):
         """
         初始化请求语料分析器
         
         Args:
             custom_dimensions: 自定义维度列表
             output_dir: 输出目录
+            cache: 持久化结果缓存，None表示不缓存
+            dimension_matcher: 编译后的维度匹配器，用于维度加权词频
+            rules: 规则表 {"categories": {...}, "scenes": {...}}，缺省项使用内置规则
+            sentiment_engine: 批量情感分析引擎，None时按cache创建单进程引擎
+            sketch: 近似统计参数，None表示精确统计
+            association_metrics: 维度关联强度指标，None表示只统计共现次数
         """
-        super().__init__(custom_dimensions, output_dir)
+        super().__init__(custom_dimensions, output_dir, cache, dimension_matcher, rules, sentiment_engine, sketch,
+                         association_metrics)
         logger.info("初始化请求语料分析器")
     
     def analyze(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -29,117 +68,92 @@ class RequestAnalyzer(BaseAnalyzer):
         Returns:
             分析结果字典
         """
-        logger.info(f"开始分析请求语料，共 {len(df)} 条")
+        logger.info(f"开始分析请求语料，共 {self.count_rows(df)} 条")
+        stats = self.collect_stats(df)
+        return self.summarize(stats)
+    
+    def summarize(self, stats: PartialStats) -> Dict[str, Any]:
+        """
+        由（合并后的）中间统计生成请求语料分析结果
         
+        Args:
+            stats: 中间统计
+            
+        Returns:
+            分析结果字典
+        """
         results = {
             "维度": self.custom_dimensions,
             "分析类型": "请求语料（需求分析）"
         }
         
         # 1. 基础统计
-        results["基础统计"] = self.generate_summary_stats(df)
+        results["基础统计"] = stats.summary_stats()
         
         # 2. 频次分析
-        logger.info("进行频次分析...")
-        frequency = self.calculate_frequency(df)
+        frequency = stats.frequency
         results["总体词频Top10"] = self.get_top_k_tokens(frequency, k=10)
         
         # 维度相关词频
-        dim_frequency = self.calculate_dimension_frequency(df)
+        dim_frequency = stats.dim_frequency
         results["维度相关词频Top10"] = self.get_top_k_tokens(dim_frequency, k=10)
         
+        # 近似统计模式下注明误差界
+        sketch_report = stats.sketch_report()
+        if sketch_report is not None:
+            results["近似统计"] = sketch_report
+        
         # 3. 情感分析
-        logger.info("进行情感分析...")
-        df = self.analyze_sentiment(df)
-        sentiment_dist = self.calculate_sentiment_distribution(df)
+        sentiment_dist = stats.sentiment_distribution()
         results["情感分布"] = sentiment_dist
         
         # 4. 需求分类分析（基于高频词推断）
-        logger.info("进行需求分类分析...")
-        demand_categories = self._classify_demands(df)
-        results["需求分类"] = demand_categories
+        results["需求分类"] = stats.category_counts
         
         # 5. 关联特征分析
-        logger.info("进行关联特征分析...")
-        associations = self._analyze_associations(df)
-        results["关联特征"] = associations
+        results["关联特征"] = stats.top_associations(k=5)
+        association_strength = stats.association_strength(self.association_metrics)
+        if association_strength is not None:
+            results["关联强度"] = association_strength
         
         # 6. 场景分析
-        logger.info("进行场景分析...")
-        scenes = self._analyze_scenes(df)
-        results["场景分布"] = scenes
+        results["场景分布"] = stats.scene_counts
         
         # 7. 生成可视化图表
         logger.info("生成可视化图表...")
-        self._generate_charts(df, frequency, dim_frequency, sentiment_dist)
+        self._generate_charts(frequency, dim_frequency, sentiment_dist)
         
         logger.info("请求语料分析完成")
         return results
     
-    def _classify_demands(self, df: pd.DataFrame) -> Dict[str, int]:
+    def _collect_rule_stats(self, stats: PartialStats, contents: np.ndarray, weights: np.ndarray,
+                            sentiments: np.ndarray, dimension_rows: Dict[str, np.ndarray]) -> None:
         """
-        需求分类（基于关键词规则）
+        计算需求分类与场景分布
         
         Args:
-            df: 语料DataFrame
-            
-        Returns:
-            需求分类统计
+            stats: 待填充的中间统计
+            contents: 逐行内容
+            weights: 逐行计数权重
+            sentiments: 逐行情感标签
+            dimension_rows: {维度: 逐行是否包含该维度}
         """
-        # 定义需求关键词
-        demand_keywords = {
-            "模板定制": ["模板", "定制", "样式", "风格", "主题"],
-            "内容模块": ["内容", "模块", "功能", "添加", "新增"],
-            "格式适配": ["格式", "适配", "兼容", "导出", "排版"],
-            "页数相关": ["页数", "页面", "幻灯片", "多少页"],
-            "操作简化": ["简单", "容易", "方便", "快速", "操作"]
-        }
-        
-        demand_counts = {category: 0 for category in demand_keywords.keys()}
-        
-        for _, row in df.iterrows():
-            content = str(row.get('content', ''))
-            tokens = row.get('tokens', [])
-            
-            # 检查每个需求类别
-            for category, keywords in demand_keywords.items():
-                if any(kw in content or kw in tokens for kw in keywords):
-                    demand_counts[category] += 1
-        
-        return demand_counts
+        logger.info("进行需求分类与场景分析...")
+        masks = self.rule_engine.scan(contents.tolist())
+        stats.category_counts = self.rule_engine.category_counts(masks, weights)
+        stats.scene_counts = self.rule_engine.scene_counts(masks, weights)
     
-    def _analyze_associations(self, df: pd.DataFrame) -> Dict[str, List[str]]:
+    def _classify_demands(self, df: pd.DataFrame) -> Dict[str, int]:
         """
-        分析自定义维度的关联特征
+        需求分类（基于关键词规则）
         
         Args:
             df: 语料DataFrame
             
         Returns:
-            关联特征字典
+            需求分类统计
         """
-        associations = {}
-        
-        for dim in self.custom_dimensions:
-            # 找出包含该维度的语料
-            dim_related = df[df['tokens'].apply(
-                lambda tokens: any(dim in token or token == dim for token in tokens)
-            )]
-            
-            if len(dim_related) == 0:
-                associations[dim] = []
-                continue
-            
-            # 统计与该维度共现的高频词
-            all_tokens = []
-            for tokens in dim_related['tokens']:
-                all_tokens.extend([t for t in tokens if t != dim])
-            
-            from collections import Counter
-            top_associated = Counter(all_tokens).most_common(5)
-            associations[dim] = [word for word, count in top_associated]
-        
-        return associations
+        return self.rule_engine.category_counts(self.rule_masks(df), self.row_weights(df).to_numpy())
     
     def _analyze_scenes(self, df: pd.DataFrame) -> Dict[str, int]:
         """
@@ -151,43 +165,15 @@ class RequestAnalyzer(BaseAnalyzer):
         Returns:
             场景分布统计
         """
-        # 定义场景关键词
-        scene_keywords = {
-            "课堂演示": ["课堂", "上课", "教学", "讲课", "学生"],
-            "工作汇报": ["工作", "汇报", "总结", "报告", "会议"],
-            "项目展示": ["项目", "展示", "演示", "介绍", "方案"],
-            "培训材料": ["培训", "学习", "教程", "指导"],
-            "其他": []
-        }
-        
-        scene_counts = {scene: 0 for scene in scene_keywords.keys()}
-        
-        for _, row in df.iterrows():
-            content = str(row.get('content', ''))
-            tokens = row.get('tokens', [])
-            
-            matched = False
-            # 检查每个场景
-            for scene, keywords in scene_keywords.items():
-                if scene == "其他":
-                    continue
-                if any(kw in content or kw in tokens for kw in keywords):
-                    scene_counts[scene] += 1
-                    matched = True
-                    break
-            
-            if not matched:
-                scene_counts["其他"] += 1
-        
-        return scene_counts
+        return self.rule_engine.scene_counts(self.rule_masks(df), self.row_weights(df).to_numpy())
     
-    def _generate_charts(self, df: pd.DataFrame, frequency: Dict[str, int], 
-                        dim_frequency: Dict[str, int], sentiment_dist: Dict[str, int]) -> None:
+    def _generate_charts(self, frequency: Union[TermCounts, HeavyHitterSketch],
+                        dim_frequency: Union[TermCounts, HeavyHitterSketch],
+                        sentiment_dist: Dict[str, int]) -> None:
         """
         生成所有图表
         
         Args:
-            df: 语料DataFrame
             frequency: 总体词频
             dim_frequency: 维度相关词频
             sentiment_dist: 情感分布
@@ -209,8 +195,8 @@ class RequestAnalyzer(BaseAnalyzer):
         )
         
         # 3. 情感分布饼图
-        self.plot_sentiment_distribution(
-            df,
+        self.plot_pie_chart(
+            sentiment_dist,
             f"请求语料-情感分布",
             f"{dim_str}_请求_情感分布.png"
         )
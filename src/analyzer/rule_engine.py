@@ -0,0 +1,100 @@
+"""关键词规则引擎（分类/场景）"""
+import numpy as np
+from typing import Dict, Iterable, List
+from ..utils.keyword_matcher import KeywordMatcher
+
+
+class RuleEngine:
+    """
+    关键词规则引擎
+
+    分类规则（多标签：命中任一关键词即计入该类）与场景规则（单标签：按表顺序取第一个命中的场景，
+    均未命中计入"其他"）共用一个多模式自动机，每条内容只扫描一次得到位掩码，各项计数均由位掩码派生。
+    """
+
+    # 场景兜底类别（不参与关键词匹配）
+    OTHER_SCENE = "其他"
+
+    def __init__(self, category_rules: Dict[str, List[str]], scene_rules: Dict[str, List[str]]):
+        """
+        编译规则表
+
+        Args:
+            category_rules: 分类规则 {类别: [关键词, ...]}
+            scene_rules: 场景规则 {场景: [关键词, ...]}（按优先级排列）
+        """
+        self.categories = list(category_rules)
+        self.scenes = list(scene_rules)
+        if self.OTHER_SCENE not in self.scenes:
+            self.scenes.append(self.OTHER_SCENE)
+        self.matched_scenes = [scene for scene in self.scenes if scene != self.OTHER_SCENE]
+
+        # 位分配：分类占低位，场景依次占用其后的位
+        self.category_bits = {category: 1 << i for i, category in enumerate(self.categories)}
+        offset = len(self.categories)
+        self.scene_bits = {scene: 1 << (offset + i) for i, scene in enumerate(self.matched_scenes)}
+
+        keyword_groups = [
+            (keyword, self.category_bits[category])
+            for category, keywords in category_rules.items() for keyword in keywords
+        ]
+        keyword_groups += [
+            (keyword, self.scene_bits[scene])
+            for scene in self.matched_scenes for keyword in scene_rules.get(scene, [])
+        ]
+        self.matcher = KeywordMatcher(keyword_groups)
+
+        # 位数不超过64时使用uint64数组运算，否则退回Python整数
+        self._dtype = np.uint64 if offset + len(self.matched_scenes) <= 64 else object
+
+    def _bit(self, value: int):
+        """转换为与掩码数组同类型的位值"""
+        return np.uint64(value) if self._dtype is np.uint64 else value
+
+    def scan(self, contents: Iterable[str]) -> np.ndarray:
+        """
+        扫描内容，生成逐行位掩码
+
+        Args:
+            contents: 内容序列
+
+        Returns:
+            位掩码数组
+        """
+        return np.array(self.matcher.scan_many(contents), dtype=self._dtype)
+
+    def category_counts(self, masks: np.ndarray, weights: np.ndarray) -> Dict[str, int]:
+        """
+        由位掩码统计各分类数量（多标签）
+
+        Args:
+            masks: 逐行位掩码
+            weights: 逐行计数权重
+
+        Returns:
+            {类别: 数量}
+        """
+        return {
+            category: int(weights[(masks & self._bit(bit)) != 0].sum())
+            for category, bit in self.category_bits.items()
+        }
+
+    def scene_counts(self, masks: np.ndarray, weights: np.ndarray) -> Dict[str, int]:
+        """
+        由位掩码统计场景分布（单标签，按规则表顺序取第一个命中的场景）
+
+        Args:
+            masks: 逐行位掩码
+            weights: 逐行计数权重
+
+        Returns:
+            {场景: 数量}
+        """
+        counts = {scene: 0 for scene in self.scenes}
+        assigned = np.zeros(len(masks), dtype=bool)
+        for scene in self.matched_scenes:
+            hit = ((masks & self._bit(self.scene_bits[scene])) != 0) & ~assigned
+            counts[scene] = int(weights[hit].sum())
+            assigned |= hit
+        counts[self.OTHER_SCENE] = int(weights[~assigned].sum())
+        return counts
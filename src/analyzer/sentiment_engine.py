@@ -0,0 +1,345 @@
+"""批量情感分析引擎"""
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from ..preprocess.vocabulary import TokenArrays, Vocabulary, vocabulary
+from ..utils.cache import CacheManager
+from ..utils.logger import logger
+
+
+# 情感阈值：得分 ≥ POSITIVE_THRESHOLD 为正面，≤ NEGATIVE_THRESHOLD 为负面，其余为中性
+POSITIVE_THRESHOLD = 0.6
+NEGATIVE_THRESHOLD = 0.4
+
+
+def sentiment_label(score: float) -> str:
+    """
+    情感得分转换为标签
+
+    Args:
+        score: 情感得分（0~1）
+
+    Returns:
+        "正面"/"中性"/"负面"
+    """
+    if score >= POSITIVE_THRESHOLD:
+        return "正面"
+    elif score <= NEGATIVE_THRESHOLD:
+        return "负面"
+    else:
+        return "中性"
+
+
+def sentiment_labels(scores: np.ndarray) -> List[str]:
+    """
+    批量将情感得分转换为标签（阈值与sentiment_label一致）
+
+    Args:
+        scores: 情感得分数组
+
+    Returns:
+        标签列表
+    """
+    labels = np.select(
+        [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+        ["正面", "负面"], default="中性"
+    )
+    return labels.tolist()
+
+
+def _score_text(text: str) -> str:
+    """SnowNLP单条情感分析（异常时视为中性）"""
+    from snownlp import SnowNLP
+
+    try:
+        return sentiment_label(SnowNLP(text).sentiments)
+    except Exception:
+        return "中性"
+
+
+def _init_worker() -> None:
+    """工作进程初始化：预先加载SnowNLP分词与情感模型"""
+    _score_text("预热")
+
+
+def _score_chunk(texts: List[str]) -> List[str]:
+    """工作进程内分析一个分块"""
+    return [_score_text(text) for text in texts]
+
+
+class TokenSentimentScorer:
+    """
+    基于已有分词结果的朴素贝叶斯情感评分（复用SnowNLP情感模型参数）
+
+    SnowNLP的情感得分为 P(pos) = 1 / (1 + exp(-(先验差 + Σ 词的对数似然比)))，
+    其中每个词的对数似然比只取决于词本身。将其预先计算为以token id为下标的词表级数组后，
+    整批语料的得分只需一次查表和按行求和，无需SnowNLP再次分词。
+    与SnowNLP逐条结果的差异仅来自分词方式不同（jieba切分、停用词及单字过滤），
+    可通过 agreement 在参考语料上评估一致率。
+    """
+
+    def __init__(self, vocab: Optional[Vocabulary] = None):
+        """
+        加载SnowNLP情感模型参数
+
+        Args:
+            vocab: 词表（默认使用全局词表）
+
+        Raises:
+            ImportError: SnowNLP未安装
+        """
+        from snownlp import normal, sentiment
+
+        self.vocab = vocab if vocab is not None else vocabulary
+        model = sentiment.classifier.classifier
+        self._pos = model.d['pos']
+        self._neg = model.d['neg']
+        self._stopwords = normal.stop
+        # 先验对数比 log P(pos) - log P(neg)
+        self.prior = float(np.log(self._pos.getsum()) - np.log(self._neg.getsum()))
+
+    def _word_log_ratio(self, token: str) -> float:
+        """单个词的对数似然比 log P(w|pos) - log P(w|neg)（SnowNLP停用词不参与计算）"""
+        if token in self._stopwords:
+            return 0.0
+        return float(np.log(self._pos.freq(token)) - np.log(self._neg.freq(token)))
+
+    def log_ratio_table(self) -> np.ndarray:
+        """词表级对数似然比数组（以token id为下标，新增词条时增量计算）"""
+        return self.vocab.derived(("sentiment_log_ratio", id(self._pos), id(self._neg)),
+                                  self._word_log_ratio, dtype=np.float64)
+
+    def score(self, arrays: TokenArrays) -> np.ndarray:
+        """
+        批量计算情感得分
+
+        Args:
+            arrays: 语料token数组
+
+        Returns:
+            每行的情感得分（0~1）
+        """
+        table = self.log_ratio_table()
+        log_odds = self.prior + np.bincount(
+            arrays.row_index(), weights=table[arrays.values], minlength=len(arrays)
+        )
+        with np.errstate(over='ignore'):
+            return 1.0 / (1.0 + np.exp(-log_odds))
+
+    def labels(self, arrays: TokenArrays) -> List[str]:
+        """
+        批量情感分析
+
+        Args:
+            arrays: 语料token数组
+
+        Returns:
+            每行的情感标签
+        """
+        return sentiment_labels(self.score(arrays))
+
+
+class SentimentEngine:
+    """
+    批量情感分析引擎
+
+    snownlp 方式：相同文本只分析一次，支持跨运行的结果缓存和多进程分析（每个进程预先加载模型），
+    标签与逐条调用SnowNLP按0.4/0.6阈值划分的结果一致。
+    tokens 方式：复用已有分词结果，以词表级对数似然比数组批量评分（见 TokenSentimentScorer），
+    可按抽样条数与SnowNLP结果对比并记录一致率。两种方式均记录吞吐量。
+    """
+
+    # 支持的评分方式
+    METHODS = ("snownlp", "tokens")
+
+    def __init__(self, workers: int = 1, chunk_size: int = 500, parallel_threshold: int = 2000,
+                 cache: Optional[CacheManager] = None, method: str = "snownlp",
+                 agreement_sample: int = 0):
+        """
+        初始化情感分析引擎
+
+        Args:
+            workers: 分析进程数（1为单进程，0为CPU核数）
+            chunk_size: 多进程分析时每个分块的条数
+            parallel_threshold: 待分析文本数达到该值时才启用多进程（避免小批量承担进程启动开销）
+            cache: 持久化结果缓存（跨运行复用已分析文本的标签），None表示不缓存
+            method: 评分方式，"snownlp"（逐条SnowNLP）或 "tokens"（复用分词结果的朴素贝叶斯评分）
+            agreement_sample: tokens方式下每批取前N条与SnowNLP结果对比一致率，0表示不对比
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"不支持的情感评分方式: {method}（可选: {', '.join(self.METHODS)}）")
+
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self.cache = cache
+        self.method = method
+        self.agreement_sample = agreement_sample
+        self._executor = None
+        self._cache_version = None
+        self._token_scorer = None
+
+    @property
+    def uses_tokens(self) -> bool:
+        """是否需要分词结果作为输入"""
+        return self.method == "tokens"
+
+    @property
+    def cache_version(self) -> str:
+        """缓存版本（SnowNLP版本与阈值变化时已缓存的标签失效）"""
+        if self._cache_version is None:
+            try:
+                from importlib.metadata import version
+                snownlp_version = version('snownlp')
+            except Exception:
+                snownlp_version = "unknown"
+            self._cache_version = f"snownlp-{snownlp_version}|{NEGATIVE_THRESHOLD}/{POSITIVE_THRESHOLD}"
+        return self._cache_version
+
+    @property
+    def token_scorer(self) -> TokenSentimentScorer:
+        """基于分词结果的评分器（首次使用时加载模型参数）"""
+        if self._token_scorer is None:
+            self._token_scorer = TokenSentimentScorer()
+        return self._token_scorer
+
+    def analyze(self, texts: List[str], token_arrays: Optional[TokenArrays] = None) -> List[str]:
+        """
+        批量情感分析
+
+        Args:
+            texts: 文本列表
+            token_arrays: 与texts逐行对应的token数组（tokens方式必需）
+
+        Returns:
+            与输入顺序一致的情感标签列表
+
+        Raises:
+            ImportError: SnowNLP未安装
+        """
+        if self.uses_tokens and token_arrays is not None:
+            return self._analyze_tokens(texts, token_arrays)
+        return self._analyze_snownlp(texts)
+
+    def _analyze_tokens(self, texts: List[str], token_arrays: TokenArrays) -> List[str]:
+        """
+        基于分词结果批量评分（可选抽样对比SnowNLP结果）
+
+        Args:
+            texts: 文本列表
+            token_arrays: token数组
+
+        Returns:
+            情感标签列表
+        """
+        scorer = self.token_scorer
+        start_time = time.perf_counter()
+        labels = scorer.labels(token_arrays)
+        elapsed = time.perf_counter() - start_time
+        throughput = len(labels) / elapsed if elapsed > 0 else 0.0
+        logger.info(f"情感分析（分词结果评分）: {len(labels)} 条，耗时 {elapsed:.3f} 秒，{throughput:.0f} 条/秒")
+
+        if self.agreement_sample > 0 and len(texts) > 0:
+            n = min(self.agreement_sample, len(texts))
+            sample = TokenArrays(token_arrays.values[:token_arrays.offsets[n]], token_arrays.offsets[:n + 1])
+            self.agreement(texts[:n], sample)
+        return labels
+
+    def _analyze_snownlp(self, texts: List[str]) -> List[str]:
+        """
+        SnowNLP批量分析（去重、缓存、多进程）
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            情感标签列表
+        """
+        import snownlp  # noqa: F401
+
+        start_time = time.perf_counter()
+        unique_texts = list(dict.fromkeys(texts))
+
+        labels = self.cache.get_many("sentiment", unique_texts, self.cache_version) if self.cache is not None else {}
+        missing = [text for text in unique_texts if text not in labels]
+        if missing:
+            computed = dict(zip(missing, self._score_texts(missing)))
+            if self.cache is not None:
+                self.cache.set_many("sentiment", computed, self.cache_version)
+            labels.update(computed)
+
+        elapsed = time.perf_counter() - start_time
+        throughput = len(missing) / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"情感分析: {len(texts)} 条（唯一文本 {len(unique_texts)} 条，缓存命中 {len(unique_texts) - len(missing)} 条，"
+            f"新分析 {len(missing)} 条），耗时 {elapsed:.2f} 秒，{throughput:.0f} 条/秒"
+        )
+        return [labels[text] for text in texts]
+
+    def agreement(self, texts: List[str], token_arrays: TokenArrays) -> Dict[str, Any]:
+        """
+        在参考语料上对比分词结果评分与SnowNLP逐条分析的标签一致性
+
+        Args:
+            texts: 参考语料文本列表
+            token_arrays: 与texts逐行对应的token数组
+
+        Returns:
+            对比报告 {"样本数", "一致数", "一致率", "混淆矩阵": {SnowNLP标签: {分词评分标签: 数量}}}
+        """
+        token_labels = self.token_scorer.labels(token_arrays)
+        reference = self._analyze_snownlp(texts)
+
+        matrix: Dict[str, Dict[str, int]] = {}
+        for ref_label, token_label in zip(reference, token_labels):
+            row = matrix.setdefault(ref_label, {})
+            row[token_label] = row.get(token_label, 0) + 1
+        matched = sum(ref == tok for ref, tok in zip(reference, token_labels))
+        rate = matched / len(texts) if texts else 0.0
+
+        logger.info(f"情感评分一致性（分词结果评分 vs SnowNLP）: 样本 {len(texts)} 条，一致 {matched} 条，一致率 {rate:.2%}")
+        return {"样本数": len(texts), "一致数": matched, "一致率": rate, "混淆矩阵": matrix}
+
+    def _score_texts(self, texts: List[str]) -> List[str]:
+        """
+        分析文本列表（条数达到阈值时使用多进程）
+
+        Args:
+            texts: 待分析文本列表
+
+        Returns:
+            情感标签列表
+        """
+        if self.workers > 1 and len(texts) >= self.parallel_threshold:
+            return self._score_parallel(texts)
+        return [_score_text(text) for text in texts]
+
+    def _score_parallel(self, texts: List[str]) -> List[str]:
+        """
+        多进程情感分析（按分块提交，结果顺序与输入一致）
+
+        Args:
+            texts: 待分析文本列表
+
+        Returns:
+            情感标签列表
+        """
+        if self._executor is None:
+            logger.info(f"启动 {self.workers} 个情感分析进程")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+        # 文本较少时缩小分块，使各进程负载均衡
+        chunk_size = max(1, min(self.chunk_size, -(-len(texts) // self.workers)))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results = []
+        for chunk_labels in self._executor.map(_score_chunk, chunks):
+            results.extend(chunk_labels)
+        return results
+
+    def close(self) -> None:
+        """关闭情感分析进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
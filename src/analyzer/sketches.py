@@ -0,0 +1,276 @@
+"""有界内存的近似统计（高频词摘要与基数估计）"""
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, ItemsView, List, Optional, Tuple
+from ..preprocess.vocabulary import Vocabulary, vocabulary
+
+
+class HeavyHitterSketch:
+    """
+    高频词摘要（可合并的 Misra-Gries / Space-Saving 摘要）
+
+    最多保留 capacity 个token id及其计数。每批精确计数后并入摘要，超出容量时所有计数减去
+    第 capacity+1 大的计数并丢弃非正项。保留的计数是真实频次的下界，真实频次不超过
+    计数 + error（error为累计扣减量，即对应Space-Saving摘要的估计上界），且
+    error ≤ total / (capacity + 1)。多批次/多进程的摘要按同样方式合并，误差界不变。
+    """
+
+    def __init__(self, capacity: int, vocab: Optional[Vocabulary] = None):
+        """
+        初始化空摘要
+
+        Args:
+            capacity: 保留的计数器个数
+            vocab: 词表（默认使用全局词表）
+        """
+        self.capacity = capacity
+        self.vocab = vocab if vocab is not None else vocabulary
+        # 计数器（按token首次进入摘要的顺序）
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        # 已计入的总频次与累计扣减量
+        self.total = 0
+        self.error = 0
+
+    @classmethod
+    def from_counts(cls, capacity: int, ids: List[int], counts: List[int],
+                    vocab: Optional[Vocabulary] = None) -> "HeavyHitterSketch":
+        """
+        由一批精确计数构建摘要
+
+        Args:
+            capacity: 保留的计数器个数
+            ids: token id（按首次出现顺序）
+            counts: 与ids对应的计数
+            vocab: 词表
+
+        Returns:
+            摘要
+        """
+        sketch = cls(capacity, vocab)
+        sketch.ids = np.asarray(ids, dtype=np.int64)
+        sketch.counts = np.asarray(counts, dtype=np.int64)
+        sketch.total = int(sketch.counts.sum())
+        sketch._reduce()
+        return sketch
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _reduce(self) -> None:
+        """超出容量时扣减第 capacity+1 大的计数，只保留计数为正的项"""
+        if len(self.counts) <= self.capacity:
+            return
+        cut = int(np.partition(self.counts, len(self.counts) - self.capacity - 1)[len(self.counts) - self.capacity - 1])
+        keep = self.counts > cut
+        self.ids = self.ids[keep]
+        self.counts = self.counts[keep] - cut
+        self.error += cut
+
+    def merge(self, other: "HeavyHitterSketch") -> "HeavyHitterSketch":
+        """
+        合并另一份摘要（other中新出现的token排在已有token之后）
+
+        Args:
+            other: 待合并的摘要（需使用同一词表）
+
+        Returns:
+            合并后的自身
+        """
+        if len(other) > 0:
+            position = {token_id: i for i, token_id in enumerate(self.ids.tolist())}
+            counts = self.counts.tolist()
+            ids = self.ids.tolist()
+            for token_id, count in zip(other.ids.tolist(), other.counts.tolist()):
+                i = position.get(token_id)
+                if i is None:
+                    position[token_id] = len(ids)
+                    ids.append(token_id)
+                    counts.append(count)
+                else:
+                    counts[i] += count
+            self.ids = np.asarray(ids, dtype=np.int64)
+            self.counts = np.asarray(counts, dtype=np.int64)
+        self.total += other.total
+        self.error += other.error
+        self._reduce()
+        return self
+
+    def top_k(self, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        计数最高的K个token
+
+        Args:
+            k: 返回数量
+
+        Returns:
+            [(token, 计数下界), ...]，计数降序，并列时按进入摘要的顺序
+        """
+        if k <= 0 or len(self.ids) == 0:
+            return []
+        selected = np.argsort(-self.counts, kind='stable')[:k]
+        return list(zip(self.vocab.decode(self.ids[selected].tolist()), self.counts[selected].tolist()))
+
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """与Counter.most_common一致的接口"""
+        return self.top_k(len(self.ids) if k is None else k)
+
+    def to_dict(self) -> Dict[str, int]:
+        """
+        摘要中的计数字典
+
+        Returns:
+            {token: 计数下界}
+        """
+        return dict(zip(self.vocab.decode(self.ids.tolist()), self.counts.tolist()))
+
+    def items(self) -> ItemsView:
+        """与计数字典的 items 一致"""
+        return self.to_dict().items()
+
+
+class HyperLogLog:
+    """
+    HyperLogLog基数估计
+
+    2^precision 个寄存器，相对标准误差约为 1.04 / sqrt(2^precision)；
+    合并为寄存器逐位取最大值，与对全部数据一次估计的结果一致。
+    """
+
+    def __init__(self, precision: int):
+        """
+        初始化估计器
+
+        Args:
+            precision: 寄存器索引位数（4~18）
+        """
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """相对标准误差"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    @staticmethod
+    def hash_ids(ids: np.ndarray) -> np.ndarray:
+        """
+        计算整数id的64位哈希（splitmix64）
+
+        Args:
+            ids: 整数数组
+
+        Returns:
+            uint64哈希数组
+        """
+        with np.errstate(over='ignore'):
+            z = np.asarray(ids, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            return z ^ (z >> np.uint64(31))
+
+    @staticmethod
+    def hash_texts(texts: pd.Series) -> np.ndarray:
+        """
+        计算文本的64位哈希
+
+        Args:
+            texts: 文本Series
+
+        Returns:
+            uint64哈希数组
+        """
+        return pd.util.hash_pandas_object(texts, index=False).to_numpy()
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        加入一批元素（以64位哈希表示）
+
+        Args:
+            hashes: uint64哈希数组
+        """
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes << np.uint64(self.precision)
+
+        # rank = 剩余位中首个1的位置（从1计），全0时为 64 - precision + 1
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = rest >> np.uint64(shift)
+            moved = high > 0
+            bit_length[moved] += shift
+            rest = np.where(moved, high, rest)
+        bit_length += (rest > 0)
+        rank = np.minimum(64 - bit_length + 1, 64 - self.precision + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        合并另一估计器（需相同precision）
+
+        Args:
+            other: 待合并的估计器
+
+        Returns:
+            合并后的自身
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """
+        估计基数
+
+        Returns:
+            不同元素个数的估计值
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # 小基数时使用线性计数修正
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class SketchSettings:
+    """近似统计模式的参数（由误差要求推导摘要容量与HyperLogLog精度）"""
+
+    def __init__(self, top_k_error: float = 0.0001, distinct_error: float = 0.01):
+        """
+        初始化近似统计参数
+
+        Args:
+            top_k_error: 高频词计数误差上限（占该分组token总数的比例）
+            distinct_error: 基数估计（不同词条数、不同内容数）的相对标准误差
+        """
+        self.top_k_error = top_k_error
+        self.distinct_error = distinct_error
+        # error ≤ total / (capacity + 1) ≤ top_k_error * total
+        self.capacity = max(1, math.ceil(1 / top_k_error) - 1)
+        # 1.04 / sqrt(2^p) ≤ distinct_error
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / distinct_error) ** 2))))
+
+    def heavy_hitters(self, ids: Optional[List[int]] = None, counts: Optional[List[int]] = None) -> HeavyHitterSketch:
+        """
+        创建高频词摘要
+
+        Args:
+            ids: 初始计数的token id（按首次出现顺序），None表示空摘要
+            counts: 与ids对应的计数
+
+        Returns:
+            高频词摘要
+        """
+        if ids is None:
+            return HeavyHitterSketch(self.capacity)
+        return HeavyHitterSketch.from_counts(self.capacity, ids, counts)
+
+    def distinct(self) -> HyperLogLog:
+        """创建基数估计器"""
+        return HyperLogLog(self.precision)
@@ -0,0 +1,160 @@
+"""可合并的词频统计（按token id计数的词频与文档频次）"""
+import numpy as np
+from typing import Dict, ItemsView, List, Optional, Tuple
+from ..preprocess.vocabulary import TokenArrays, Vocabulary, vocabulary
+
+
+class TermCounts:
+    """
+    可合并的词频统计
+
+    以token id为下标存储词频（TF，token出现次数）与文档频次（DF，包含该token的语料条数），
+    并记录token首次出现的顺序。分批或多进程得到的部分统计可通过 merge 按批次顺序合并，
+    合并结果（含Top K并列项顺序）与对全部语料一次统计一致。
+    """
+
+    def __init__(self, vocab: Optional[Vocabulary] = None):
+        """
+        初始化空统计
+
+        Args:
+            vocab: 词表（默认使用全局词表）
+        """
+        self.vocab = vocab if vocab is not None else vocabulary
+        self.tf = np.zeros(0, dtype=np.int64)
+        self.df = np.zeros(0, dtype=np.int64)
+        # 出现过的token id（按首次出现顺序）
+        self.order = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_counts(cls, size: int, ids: List[int], tf: List[int], df_ids: List[int], df: List[int],
+                    vocab: Optional[Vocabulary] = None) -> "TermCounts":
+        """
+        由按id计数的结果构建
+
+        Args:
+            size: 词表大小
+            ids: 出现过的token id（按首次出现顺序）
+            tf: 与ids对应的词频
+            df_ids: 文档频次对应的token id
+            df: 与df_ids对应的文档频次
+            vocab: 词表
+
+        Returns:
+            词频统计
+        """
+        counts = cls(vocab)
+        counts.tf = np.zeros(size, dtype=np.int64)
+        counts.tf[ids] = tf
+        counts.df = np.zeros(size, dtype=np.int64)
+        counts.df[df_ids] = df
+        counts.order = np.asarray(ids, dtype=np.int64)
+        return counts
+
+    @classmethod
+    def from_arrays(cls, arrays: TokenArrays, row_weights: np.ndarray,
+                    positions: Optional[np.ndarray] = None, vocab: Optional[Vocabulary] = None) -> "TermCounts":
+        """
+        在token数组上一次计算词频与文档频次
+
+        Args:
+            arrays: 语料token数组
+            row_weights: 每行权重（去重后的重复次数）
+            positions: 参与统计的位置（与values等长的布尔数组），None表示全部位置
+            vocab: 词表
+
+        Returns:
+            词频统计
+        """
+        counts = cls(vocab)
+        values = arrays.values.astype(np.int64)
+        rows = arrays.row_index()
+        if positions is not None:
+            values, rows = values[positions], rows[positions]
+        if len(values) == 0:
+            return counts
+
+        size = len(counts.vocab)
+        counts.tf = np.bincount(values, weights=row_weights[rows], minlength=size).astype(np.int64)
+        unique_ids, first_index = np.unique(values, return_index=True)
+        counts.order = unique_ids[np.argsort(first_index)]
+
+        # 同一行内重复出现的token只计一次
+        pairs = np.unique(rows * size + values)
+        counts.df = np.bincount(pairs % size, weights=row_weights[pairs // size], minlength=size).astype(np.int64)
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _grow(self, size: int) -> None:
+        """扩展计数数组（词表增长后）"""
+        if len(self.tf) < size:
+            self.tf = np.concatenate([self.tf, np.zeros(size - len(self.tf), dtype=np.int64)])
+            self.df = np.concatenate([self.df, np.zeros(size - len(self.df), dtype=np.int64)])
+
+    def merge(self, other: "TermCounts") -> "TermCounts":
+        """
+        合并另一份统计（other中新出现的token排在已有token之后，与Counter.update一致）
+
+        Args:
+            other: 待合并的统计（需使用同一词表）
+
+        Returns:
+            合并后的自身
+        """
+        if len(other) == 0:
+            return self
+
+        self._grow(len(other.tf))
+        seen = np.zeros(len(self.tf), dtype=bool)
+        seen[self.order] = True
+        self.order = np.concatenate([self.order, other.order[~seen[other.order]]])
+        self.tf[:len(other.tf)] += other.tf
+        self.df[:len(other.df)] += other.df
+        return self
+
+    def to_dict(self) -> Dict[str, int]:
+        """
+        词频字典
+
+        Returns:
+            {token: 词频}，按token首次出现顺序排列
+        """
+        return dict(zip(self.vocab.decode(self.order.tolist()), self.tf[self.order].tolist()))
+
+    def items(self) -> ItemsView:
+        """与词频字典的 items 一致"""
+        return self.to_dict().items()
+
+    def document_frequency(self) -> Dict[str, int]:
+        """
+        文档频次字典
+
+        Returns:
+            {token: 包含该token的语料条数}，按token首次出现顺序排列
+        """
+        return dict(zip(self.vocab.decode(self.order.tolist()), self.df[self.order].tolist()))
+
+    def top_k(self, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        词频最高的K个token（部分选择，无需对整个词表排序）
+
+        Args:
+            k: 返回数量
+
+        Returns:
+            [(token, 词频), ...]，词频降序，并列时按首次出现顺序（与对词频字典稳定排序一致）
+        """
+        if k <= 0 or len(self.order) == 0:
+            return []
+
+        counts = self.tf[self.order]
+        if k < len(counts):
+            # 第K大的词频，只对不小于该值的候选排序
+            kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+            candidates = np.flatnonzero(counts >= kth)
+        else:
+            candidates = np.arange(len(counts))
+        selected = candidates[np.argsort(-counts[candidates], kind='stable')][:k]
+        return list(zip(self.vocab.decode(self.order[selected].tolist()), counts[selected].tolist()))
@@ -0,0 +1,269 @@
+"""语料列式缓存模块"""
+import hashlib
+import json
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+from ..utils.logger import logger
+
+
+# 缓存格式版本（数据结构变化时递增，使旧缓存失效）
+CACHE_VERSION = 2
+
+
+class CorpusCache:
+    """
+    语料列式缓存（Parquet，压缩+列裁剪）
+
+    首次加载并校验后的语料写入列式副本，后续加载按文件指纹（路径、大小、修改时间、内容哈希）
+    命中时直接读取副本，源文件变化时自动回退到重新解析源文件。依赖pyarrow，未安装时自动禁用。
+    """
+
+    def __init__(self, cache_dir: str = ".cache/corpus", compression: str = "zstd"):
+        """
+        初始化语料缓存
+
+        Args:
+            cache_dir: 缓存目录
+            compression: Parquet压缩算法
+        """
+        self.cache_dir = Path(cache_dir)
+        self.compression = compression
+
+        try:
+            import pyarrow  # noqa: F401
+            self.available = True
+        except ImportError:
+            logger.warning("pyarrow未安装，语料列式缓存不可用")
+            self.available = False
+
+    def _cache_paths(self, file_path: Path, params: Dict[str, Any]) -> Dict[str, Path]:
+        """
+        计算缓存数据文件和清单文件路径
+
+        Args:
+            file_path: 源文件路径
+            params: 影响加载结果的参数（如最小内容长度、保留列）
+
+        Returns:
+            {"data": 数据文件路径, "manifest": 清单文件路径}
+        """
+        key_str = f"{file_path.resolve()}|{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+        cache_key = hashlib.md5(key_str.encode('utf-8')).hexdigest()
+        return {
+            "data": self.cache_dir / f"{cache_key}.parquet",
+            "manifest": self.cache_dir / f"{cache_key}.json"
+        }
+
+    @staticmethod
+    def _content_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """计算文件内容哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def lookup(self, file_path: Union[str, Path], params: Dict[str, Any]) -> Optional[Path]:
+        """
+        查找有效缓存
+
+        大小与修改时间一致时直接命中；仅修改时间变化时校验内容哈希，内容未变则刷新清单后命中。
+
+        Args:
+            file_path: 源文件路径
+            params: 影响加载结果的参数
+
+        Returns:
+            缓存数据文件路径，无有效缓存返回None
+        """
+        if not self.available:
+            return None
+
+        file_path = Path(file_path)
+        paths = self._cache_paths(file_path, params)
+        if not paths["data"].exists() or not paths["manifest"].exists():
+            return None
+
+        try:
+            with open(paths["manifest"], 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        stat = file_path.stat()
+        if manifest.get("version") != CACHE_VERSION or manifest.get("size") != stat.st_size:
+            return None
+
+        if manifest.get("mtime_ns") != stat.st_mtime_ns:
+            if manifest.get("content_hash") != self._content_hash(file_path):
+                logger.info(f"源文件已变化，语料缓存失效: {file_path}")
+                return None
+            manifest["mtime_ns"] = stat.st_mtime_ns
+            self._write_manifest(paths["manifest"], manifest)
+
+        logger.info(f"命中语料列式缓存: {paths['data']}（{manifest.get('rows', 0)} 条）")
+        return paths["data"]
+
+    def read(self, data_path: Path) -> pd.DataFrame:
+        """
+        一次性读取缓存语料
+
+        Args:
+            data_path: 缓存数据文件路径
+
+        Returns:
+            语料DataFrame
+        """
+        return pd.read_parquet(data_path)
+
+    def iter_batches(self, data_path: Path, batch_size: int) -> Iterator[pd.DataFrame]:
+        """
+        分批读取缓存语料
+
+        Args:
+            data_path: 缓存数据文件路径
+            batch_size: 批次大小
+
+        Yields:
+            批次DataFrame
+        """
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(data_path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield record_batch.to_pandas()
+
+    def open_writer(self, file_path: Union[str, Path], params: Dict[str, Any]) -> Optional["CorpusCacheWriter"]:
+        """
+        打开增量写入器（流式加载时逐批写入，全部完成后提交）
+
+        Args:
+            file_path: 源文件路径
+            params: 影响加载结果的参数
+
+        Returns:
+            写入器，缓存不可用时返回None
+        """
+        if not self.available:
+            return None
+
+        file_path = Path(file_path)
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        return CorpusCacheWriter(self, file_path, self._cache_paths(file_path, params))
+
+    def write(self, file_path: Union[str, Path], params: Dict[str, Any], df: pd.DataFrame) -> None:
+        """
+        一次性写入缓存语料
+
+        Args:
+            file_path: 源文件路径
+            params: 影响加载结果的参数
+            df: 已校验的语料DataFrame
+        """
+        writer = self.open_writer(file_path, params)
+        if writer is None:
+            return
+        try:
+            writer.write(df)
+            writer.commit()
+        except Exception as e:
+            # 缓存写入失败不影响本次加载
+            logger.warning(f"写入语料缓存失败，本次不缓存: {str(e)}")
+        finally:
+            writer.abort()
+
+    @staticmethod
+    def _write_manifest(manifest_path: Path, manifest: Dict[str, Any]) -> None:
+        """原子写入清单文件"""
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+
+
+class CorpusCacheWriter:
+    """语料缓存增量写入器（写入临时文件，提交时原子替换）"""
+
+    def __init__(self, cache: CorpusCache, file_path: Path, paths: Dict[str, Path]):
+        """
+        初始化写入器
+
+        Args:
+            cache: 所属语料缓存
+            file_path: 源文件路径
+            paths: 缓存数据文件和清单文件路径
+        """
+        self.cache = cache
+        self.file_path = file_path
+        self.paths = paths
+        self.tmp_path = paths["data"].with_suffix('.parquet.tmp')
+        self.stat = file_path.stat()
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._done = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        追加写入一个批次
+
+        所有列按可空字符串写入（schema由首个批次的列名确定），各批次推断出的类型不同
+        （如某列先为整数后为文本）时仍可写入同一文件；命中缓存时附加列读回为字符串。
+
+        Args:
+            df: 批次DataFrame
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._done:
+            return
+
+        if self._writer is None:
+            self._schema = pa.schema([(str(col), pa.string()) for col in df.columns])
+            self._writer = pq.ParquetWriter(self.tmp_path, self._schema, compression=self.cache.compression)
+
+        # 分类列按原始值、其余列按字符串写入（缺失值保持为空）
+        table = pa.Table.from_pandas(df.astype("string"), schema=self._schema, preserve_index=False)
+
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def commit(self) -> None:
+        """提交缓存（源文件在加载期间被修改时放弃提交）"""
+        if self._done or self._writer is None:
+            return
+
+        self._writer.close()
+        self._writer = None
+
+        stat = self.file_path.stat()
+        if stat.st_size != self.stat.st_size or stat.st_mtime_ns != self.stat.st_mtime_ns:
+            logger.warning(f"加载期间源文件被修改，放弃写入语料缓存: {self.file_path}")
+            return
+
+        # 先移除旧清单，避免清单与数据文件不一致
+        self.paths["manifest"].unlink(missing_ok=True)
+        os.replace(self.tmp_path, self.paths["data"])
+        manifest = {
+            "version": CACHE_VERSION,
+            "source": str(self.file_path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": CorpusCache._content_hash(self.file_path),
+            "rows": self.rows
+        }
+        CorpusCache._write_manifest(self.paths["manifest"], manifest)
+        self._done = True
+        logger.info(f"语料列式缓存已写入: {self.paths['data']}（{self.rows} 条）")
+
+    def abort(self) -> None:
+        """放弃未提交的缓存并清理临时文件"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if not self._done and self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self._done = True
@@ -1,31 +1,79 @@
 """大规模数据加载模块"""
+import io
+import json
 import pandas as pd
-import dask.dataframe as dd
+from contextlib import closing
 from pathlib import Path
-from typing import Iterator, Union
+from typing import Any, Dict, Iterator, List, Union
+from .corpus_cache import CorpusCache
+from .encoding_detector import EncodingDetector
 from ..utils.logger import logger
 
 
+# 内存估算经验值：分词后每个字符带来的额外内存（token id数组、标记列等对象）
+PROCESSED_BYTES_PER_CHAR = 100
+# 内存估算经验值：每行的固定开销（列表/字典对象头、标记列等）
+PROCESSED_ROW_OVERHEAD = 600
+# 一次性加载时，估算内存不超过预算的该比例（为分析阶段的中间副本预留空间）
+EAGER_MEMORY_FRACTION = 0.5
+# 分批加载时，单个批次估算内存占预算的比例
+BATCH_MEMORY_FRACTION = 0.25
+# 自动计算的批次大小范围
+MIN_AUTO_BATCH_SIZE = 1000
+MAX_AUTO_BATCH_SIZE = 500000
+
+
 class DataLoader:
     """大规模语料数据加载器"""
     
-    def __init__(self, batch_size: int = 10000, min_content_length: int = 2):
+    def __init__(self, batch_size: int = 10000, min_content_length: int = 2, 
+                 default_encoding: str = 'utf-8', cache_dir: str = None, 
+                 jsonl_fields: Dict[str, str] = None, max_memory_gb: float = 2.0, 
+                 extra_columns: List[str] = None):
         """
         初始化数据加载器
         
         Args:
             batch_size: 批次大小
             min_content_length: 最小内容长度
+            default_encoding: 无法从内容判断编码时（如纯ASCII）使用的编码
+            cache_dir: 语料列式缓存目录（None表示不使用缓存）
+            jsonl_fields: JSONL字段映射 {"content": JSON字段, "type": JSON字段}，支持"a.b"形式的嵌套字段
+            max_memory_gb: 内存预算（GB），auto_load据此选择加载方式和批次大小
+            extra_columns: 除content/type外需要保留的列（其余列在读取时即被裁剪）
         """
         self.batch_size = batch_size
         self.min_content_length = min_content_length
+        self.encoding_detector = EncodingDetector(fallback_encoding=default_encoding)
+        self.corpus_cache = CorpusCache(cache_dir) if cache_dir else None
+        self.jsonl_fields = {"content": "content", "type": "type"}
+        if jsonl_fields:
+            self.jsonl_fields.update(jsonl_fields)
+        self.max_memory_gb = max_memory_gb
+        self.load_columns = ["content", "type"] + [col for col in (extra_columns or []) if col not in ("content", "type")]
+        
+        # content使用Arrow字符串（未安装pyarrow时退回普通字符串）
+        try:
+            import pyarrow  # noqa: F401
+            self.content_dtype = pd.StringDtype("pyarrow")
+        except ImportError:
+            self.content_dtype = str
+    
+    def _cache_params(self) -> dict:
+        """影响加载结果的参数（参数变化时缓存失效）"""
+        return {
+            "min_content_length": self.min_content_length,
+            "columns": self.load_columns,
+            "jsonl_fields": self.jsonl_fields
+        }
     
-    def load_large_corpus(self, file_path: Union[str, Path]) -> Iterator[pd.DataFrame]:
+    def load_large_corpus(self, file_path: Union[str, Path], batch_size: int = None) -> Iterator[pd.DataFrame]:
         """
         加载大规模语料，返回分批迭代器（通用化，无维度绑定）
         
         Args:
-            file_path: 语料文件路径（支持 .xlsx, .csv）
+            file_path: 语料文件路径（支持 .xlsx, .csv, .jsonl/.ndjson）
+            batch_size: 本次加载的批次大小（默认使用self.batch_size，不修改实例配置）
             
         Yields:
             分批加载的DataFrame
@@ -35,6 +83,7 @@ class DataLoader:
             FileNotFoundError: 文件不存在
         """
         file_path = Path(file_path)
+        batch_size = batch_size or self.batch_size
         
         # 检查文件是否存在
         if not file_path.exists():
@@ -42,79 +91,300 @@ class DataLoader:
         
         logger.info(f"开始加载语料文件: {file_path}")
         
+        # 命中列式缓存时直接分批读取
+        if self.corpus_cache is not None:
+            cached_path = self.corpus_cache.lookup(file_path, self._cache_params())
+            if cached_path is not None:
+                for batch in self.corpus_cache.iter_batches(cached_path, batch_size):
+                    yield self._compact_dtypes(batch)
+                return
+        
         # 根据文件格式选择读取方式
+        cache_writer = None
         try:
             if file_path.suffix.lower() == '.xlsx':
-                # Excel文件使用dask读取
-                ddf = dd.read_excel(
-                    str(file_path),
-                    engine='openpyxl'
-                )
+                # Excel文件使用openpyxl只读模式逐行读取
+                batches = self._stream_xlsx(file_path, batch_size)
             elif file_path.suffix.lower() == '.csv':
-                # CSV文件使用dask读取，尝试多种编码
-                encodings = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig']
-                ddf = None
-                for encoding in encodings:
-                    try:
-                        ddf = dd.read_csv(
-                            str(file_path),
-                            encoding=encoding,
-                            low_memory=False
-                        )
-                        logger.info(f"成功使用编码 {encoding} 读取CSV文件")
-                        break
-                    except (UnicodeDecodeError, Exception):
-                        continue
-                
-                if ddf is None:
-                    raise ValueError(f"无法读取CSV文件，尝试了编码: {encodings}")
+                # CSV文件使用pandas分块读取（单次顺序扫描，内存占用与批次大小相关）
+                batches = self._stream_csv(file_path, batch_size)
+            elif file_path.suffix.lower() in ('.jsonl', '.ndjson'):
+                # JSONL文件逐行解析
+                batches = self._stream_jsonl(file_path, batch_size)
             else:
                 raise ValueError(f"不支持的文件格式: {file_path.suffix}")
             
-            # 校验核心字段
-            required_cols = ["content"]
-            if not all(col in ddf.columns for col in required_cols):
-                raise ValueError(f"语料文件必须包含核心字段：{required_cols}，当前字段：{list(ddf.columns)}")
-            
-            logger.info(f"文件列名: {list(ddf.columns)}")
-            
-            # 计算总行数
-            total_rows = len(ddf)
-            logger.info(f"总语料数: {total_rows}")
+            if self.corpus_cache is not None:
+                cache_writer = self.corpus_cache.open_writer(file_path, self._cache_params())
             
-            # 分批加载并过滤无效数据
             batch_count = 0
-            for i in range(0, total_rows, self.batch_size):
-                batch = ddf.iloc[i:i+self.batch_size].compute()  # 仅加载当前批次到内存
-                
-                # 过滤空值/无效行（通用规则，无维度绑定）
-                original_count = len(batch)
-                batch = batch[
-                    batch['content'].notna() 
-                    & (batch['content'].astype(str).str.strip() != '')
-                    & (batch['content'].astype(str).str.len() >= self.min_content_length)
-                ]
-                
-                # 确保content字段为字符串类型
-                batch['content'] = batch['content'].astype(str)
-                
-                # 如果有type字段，确保为字符串类型
-                if 'type' in batch.columns:
-                    batch['type'] = batch['type'].fillna('unknown').astype(str)
-                
-                filtered_count = original_count - len(batch)
+            for chunk in batches:
                 batch_count += 1
-                
-                logger.info(f"批次 {batch_count}: 原始 {original_count} 条，过滤 {filtered_count} 条，有效 {len(batch)} 条")
-                
+                batch = self._filter_batch(chunk, batch_count)
                 if len(batch) > 0:
+                    if cache_writer is not None:
+                        cache_writer = self._write_cache_batch(cache_writer, batch)
                     yield batch
             
             logger.info(f"数据加载完成，共处理 {batch_count} 个批次")
             
+            if cache_writer is not None:
+                try:
+                    cache_writer.commit()
+                except Exception as e:
+                    logger.warning(f"提交语料缓存失败，本次不缓存: {str(e)}")
+            
         except Exception as e:
             logger.error(f"加载文件时出错: {str(e)}")
             raise
+        finally:
+            # 未完整读取（出错或迭代提前终止）时不保留缓存
+            if cache_writer is not None:
+                cache_writer.abort()
+    
+    def _write_cache_batch(self, cache_writer, batch: pd.DataFrame):
+        """
+        将批次写入语料缓存（写入失败时放弃缓存，不影响加载）
+        
+        Args:
+            cache_writer: 缓存写入器
+            batch: 已过滤的批次DataFrame
+            
+        Returns:
+            写入器，写入失败时为None
+        """
+        try:
+            cache_writer.write(batch[self._cached_columns(batch)])
+            return cache_writer
+        except Exception as e:
+            logger.warning(f"写入语料缓存失败，本次不缓存: {str(e)}")
+            cache_writer.abort()
+            return None
+    
+    def _stream_csv(self, file_path: Path, batch_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        流式读取CSV文件（单次顺序扫描，不预先统计总行数）
+        
+        Args:
+            file_path: CSV文件路径
+            batch_size: 批次大小（默认使用self.batch_size）
+            
+        Yields:
+            未过滤的原始批次DataFrame
+            
+        Raises:
+            ValueError: 缺少必需字段
+        """
+        detected = self.encoding_detector.detect(file_path)
+        encoding = detected["encoding"]
+        
+        with pd.read_csv(file_path, encoding=encoding, encoding_errors=detected["errors"], 
+                         usecols=self._use_column, chunksize=batch_size or self.batch_size) as reader:
+            is_first = True
+            for chunk in reader:
+                if is_first:
+                    self._check_required_columns(list(chunk.columns))
+                    logger.info(f"使用编码 {encoding} 读取CSV文件")
+                    is_first = False
+                yield chunk
+    
+    def _stream_xlsx(self, file_path: Path, batch_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        流式读取Excel文件（openpyxl只读模式逐行迭代，仅保留所需列）
+        
+        Args:
+            file_path: Excel文件路径
+            batch_size: 批次大小（默认使用self.batch_size）
+            
+        Yields:
+            未过滤的原始批次DataFrame（仅含所需列）
+            
+        Raises:
+            ValueError: 缺少必需字段
+        """
+        from openpyxl import load_workbook
+        
+        batch_size = batch_size or self.batch_size
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            columns = [col for col in header if col is not None]
+            self._check_required_columns(columns)
+            
+            # 只保留所需列，其余单元格不进入内存
+            needed_cols = [col for col in self.load_columns if col in columns]
+            col_indices = [header.index(col) for col in needed_cols]
+            
+            buffer = []
+            for row in rows:
+                buffer.append([row[i] if i < len(row) else None for i in col_indices])
+                if len(buffer) >= batch_size:
+                    yield pd.DataFrame(buffer, columns=needed_cols)
+                    buffer = []
+            
+            if buffer:
+                yield pd.DataFrame(buffer, columns=needed_cols)
+        finally:
+            workbook.close()
+    
+    def _stream_jsonl(self, file_path: Path, batch_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        流式读取JSONL/NDJSON文件（逐行解析，按字段映射提取content/type）
+        
+        Args:
+            file_path: JSONL文件路径
+            batch_size: 批次大小（默认使用self.batch_size）
+            
+        Yields:
+            未过滤的原始批次DataFrame（content、type及额外保留列）
+            
+        Raises:
+            ValueError: 文件中没有任何包含content字段的记录
+        """
+        batch_size = batch_size or self.batch_size
+        detected = self.encoding_detector.detect(file_path)
+        content_field = self.jsonl_fields["content"]
+        columns = self.load_columns
+        # 额外保留列未配置映射时使用同名字段
+        other_fields = [self.jsonl_fields.get(col, col) for col in columns[1:]]
+        logger.info(f"JSONL字段映射: {self.jsonl_fields}")
+        
+        valid_count = 0
+        malformed_count = 0
+        missing_count = 0
+        buffer = []
+        
+        with open(file_path, 'r', encoding=detected["encoding"], errors=detected["errors"]) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    malformed_count += 1
+                    continue
+                
+                content = self._get_json_field(record, content_field)
+                if content is None:
+                    missing_count += 1
+                    continue
+                
+                buffer.append([content] + [self._get_json_field(record, field) if field else None for field in other_fields])
+                valid_count += 1
+                if len(buffer) >= batch_size:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+        
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns)
+        
+        logger.info(f"JSONL解析完成: 有效 {valid_count} 行，格式错误 {malformed_count} 行，缺少content字段 {missing_count} 行")
+        
+        if valid_count == 0 and (malformed_count > 0 or missing_count > 0):
+            raise ValueError(f"JSONL文件中没有包含字段 {content_field} 的有效记录")
+    
+    @staticmethod
+    def _get_json_field(record: Any, field: str) -> Any:
+        """
+        按字段路径提取JSON值（支持"a.b"形式的嵌套字段）
+        
+        Args:
+            record: 解析后的JSON记录
+            field: 字段路径
+            
+        Returns:
+            字段值，不存在返回None
+        """
+        value = record
+        for key in field.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    
+    def _check_required_columns(self, columns: List[str]) -> None:
+        """
+        校验核心字段
+        
+        Args:
+            columns: 文件列名
+            
+        Raises:
+            ValueError: 缺少必需字段
+        """
+        required_cols = ["content"]
+        if not all(col in columns for col in required_cols):
+            raise ValueError(f"语料文件必须包含核心字段：{required_cols}，当前字段：{list(columns)}")
+        
+        logger.info(f"文件列名: {list(columns)}")
+    
+    def _use_column(self, column: str) -> bool:
+        """读取时的列裁剪规则"""
+        return column in self.load_columns
+    
+    def _cached_columns(self, df: pd.DataFrame) -> List[str]:
+        """缓存中保留的列"""
+        return [col for col in self.load_columns if col in df.columns]
+    
+    def _filter_valid_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        过滤空值/无效行并转换为紧凑类型（content只做一次字符串转换）
+        
+        Args:
+            df: 原始DataFrame
+            
+        Returns:
+            过滤后的DataFrame
+        """
+        df = df[df['content'].notna()]
+        content = df['content'].astype(self.content_dtype)
+        keep = ((content.str.strip() != '') & (content.str.len() >= self.min_content_length)).to_numpy(dtype=bool)
+        
+        df = df[keep].copy()
+        df['content'] = content[keep]
+        
+        # type字段缺失值统一为unknown
+        if 'type' in df.columns:
+            df['type'] = df['type'].fillna('unknown').astype(str)
+        
+        return self._compact_dtypes(df)
+    
+    def _compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        转换为紧凑类型：content为Arrow字符串，type为分类类型
+        
+        Args:
+            df: 已过滤的DataFrame
+            
+        Returns:
+            转换后的DataFrame
+        """
+        df['content'] = df['content'].astype(self.content_dtype)
+        if 'type' in df.columns:
+            df['type'] = df['type'].astype('category')
+        return df
+    
+    def _filter_batch(self, batch: pd.DataFrame, batch_count: int) -> pd.DataFrame:
+        """
+        过滤单个批次中的空值/无效行（通用规则，无维度绑定）
+        
+        Args:
+            batch: 原始批次DataFrame
+            batch_count: 批次序号（用于日志）
+            
+        Returns:
+            过滤后的批次DataFrame
+        """
+        original_count = len(batch)
+        batch = self._filter_valid_rows(batch)
+        
+        filtered_count = original_count - len(batch)
+        logger.info(f"批次 {batch_count}: 原始 {original_count} 条，过滤 {filtered_count} 条，有效 {len(batch)} 条")
+        
+        return batch
     
     def load_small_corpus(self, file_path: Union[str, Path]) -> pd.DataFrame:
         """
@@ -130,23 +400,27 @@ class DataLoader:
         
         logger.info(f"加载小规模语料文件: {file_path}")
         
+        # 命中列式缓存时直接读取
+        if self.corpus_cache is not None:
+            cached_path = self.corpus_cache.lookup(file_path, self._cache_params())
+            if cached_path is not None:
+                return self._compact_dtypes(self.corpus_cache.read(cached_path))
+        
         try:
             if file_path.suffix.lower() == '.xlsx':
-                df = pd.read_excel(file_path, engine='openpyxl')
+                # 逐批读取所需列后合并，避免整表加载
+                chunks = list(self._stream_xlsx(file_path))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=["content"])
             elif file_path.suffix.lower() == '.csv':
-                # 尝试多种编码
-                encodings = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig']
-                df = None
-                for encoding in encodings:
-                    try:
-                        df = pd.read_csv(file_path, encoding=encoding)
-                        logger.info(f"成功使用编码 {encoding} 读取CSV文件")
-                        break
-                    except (UnicodeDecodeError, Exception):
-                        continue
-                
-                if df is None:
-                    raise ValueError(f"无法读取CSV文件，尝试了编码: {encodings}")
+                # 先探测编码，再一次性读取（仅读取所需列）
+                detected = self.encoding_detector.detect(file_path)
+                df = pd.read_csv(file_path, encoding=detected["encoding"], encoding_errors=detected["errors"], 
+                                 usecols=self._use_column)
+                logger.info(f"使用编码 {detected['encoding']} 读取CSV文件")
+            elif file_path.suffix.lower() in ('.jsonl', '.ndjson'):
+                # 逐批解析后合并
+                chunks = list(self._stream_jsonl(file_path))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=self.load_columns)
             else:
                 raise ValueError(f"不支持的文件格式: {file_path.suffix}")
             
@@ -157,51 +431,182 @@ class DataLoader:
             
             # 过滤无效数据
             original_count = len(df)
-            df = df[
-                df['content'].notna() 
-                & (df['content'].astype(str).str.strip() != '')
-                & (df['content'].astype(str).str.len() >= self.min_content_length)
-            ]
-            
-            # 确保content字段为字符串类型
-            df['content'] = df['content'].astype(str)
-            
-            # 如果有type字段，确保为字符串类型
-            if 'type' in df.columns:
-                df['type'] = df['type'].fillna('unknown').astype(str)
+            df = self._filter_valid_rows(df)
             
             filtered_count = original_count - len(df)
             logger.info(f"原始 {original_count} 条，过滤 {filtered_count} 条，有效 {len(df)} 条")
             
+            if self.corpus_cache is not None:
+                self.corpus_cache.write(file_path, self._cache_params(), df[self._cached_columns(df)])
+            
             return df
             
         except Exception as e:
             logger.error(f"加载文件时出错: {str(e)}")
             raise
     
-    def auto_load(self, file_path: Union[str, Path], large_threshold: int = 50000) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    def estimate_corpus(self, file_path: Union[str, Path], sample_chars: int = 1024 * 1024, 
+                        sample_rows: int = 2000) -> Dict[str, float]:
         """
-        自动选择加载方式（根据文件大小）
+        采样文件头部，估算总行数和预处理后的内存占用
         
         Args:
             file_path: 语料文件路径
-            large_threshold: 大规模阈值（超过此行数使用分批加载）
+            sample_chars: CSV/JSONL采样读取的字符数
+            sample_rows: Excel采样读取的行数
             
         Returns:
-            DataFrame 或分批迭代器
+            估算结果字典：
+            - estimated_rows: 估算总行数
+            - bytes_per_row: 文件中平均每行字节数
+            - memory_per_row: 分词/标记后平均每行内存（字节）
+            - estimated_memory: 估算总内存（字节）
         """
         file_path = Path(file_path)
+        file_size = file_path.stat().st_size
+        suffix = file_path.suffix.lower()
+        
+        if suffix == '.xlsx':
+            with closing(self._stream_xlsx(file_path, batch_size=sample_rows)) as batches:
+                sample = next(batches, pd.DataFrame(columns=["content"]))
+            estimated_rows = self._xlsx_row_count(file_path)
+            if estimated_rows is None:
+                # 缺少行数元数据时按每行20字节（压缩后）保守估算
+                estimated_rows = file_size / 20
+            bytes_per_row = file_size / estimated_rows if estimated_rows > 0 else 0
+        elif suffix in ('.csv', '.jsonl', '.ndjson'):
+            detected = self.encoding_detector.detect(file_path)
+            with open(file_path, 'r', encoding=detected["encoding"], errors='replace') as f:
+                text = f.read(sample_chars)
+            
+            # 未读到文件末尾时丢弃最后一条不完整的记录（CSV引号内的换行不是记录边界）
+            if len(text) == sample_chars and '\n' in text:
+                text = self._complete_csv_records(text) if suffix == '.csv' else text[:text.rfind('\n') + 1]
+            sample_bytes = len(text.encode(detected["encoding"], errors='replace'))
+            
+            if suffix == '.csv':
+                sample = pd.read_csv(io.StringIO(text), usecols=self._use_column)
+            else:
+                records = []
+                for line in text.splitlines():
+                    try:
+                        records.append(self._get_json_field(json.loads(line), self.jsonl_fields["content"]))
+                    except ValueError:
+                        continue
+                sample = pd.DataFrame({"content": records})
+            
+            bytes_per_row = sample_bytes / len(sample) if len(sample) > 0 else sample_bytes
+            estimated_rows = file_size / bytes_per_row if bytes_per_row > 0 else 0
+        else:
+            raise ValueError(f"不支持的文件格式: {file_path.suffix}")
+        
+        if len(sample) > 0 and 'content' in sample.columns:
+            content = sample['content'].dropna().astype(str)
+            avg_chars = content.str.len().mean() if len(content) > 0 else 0
+            row_bytes = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        else:
+            avg_chars = 0
+            row_bytes = 0
+        
+        memory_per_row = row_bytes + PROCESSED_ROW_OVERHEAD + avg_chars * PROCESSED_BYTES_PER_CHAR
+        
+        return {
+            "estimated_rows": float(estimated_rows),
+            "bytes_per_row": float(bytes_per_row),
+            "memory_per_row": float(memory_per_row),
+            "estimated_memory": float(estimated_rows * memory_per_row)
+        }
+    
+    @staticmethod
+    def _complete_csv_records(text: str) -> str:
+        """
+        截取CSV文本中的完整记录（到最后一个不在引号字段内的换行为止）
+        
+        Args:
+            text: 从文件头部截取的CSV文本
+            
+        Returns:
+            截断后的文本，没有完整记录时为空字符串
+        """
+        end = 0
+        in_quotes = False
+        position = 0
+        # 按行累计引号个数，转义的双引号（""）成对出现，不改变奇偶性
+        for line in text.split('\n')[:-1]:
+            position += len(line) + 1
+            in_quotes ^= line.count('"') % 2 == 1
+            if not in_quotes:
+                end = position
+        return text[:end]
+    
+    @staticmethod
+    def _xlsx_row_count(file_path: Path) -> Union[int, None]:
+        """
+        读取Excel工作表的行数元数据（不遍历数据行）
+        
+        Args:
+            file_path: Excel文件路径
+            
+        Returns:
+            数据行数（不含表头），元数据缺失返回None
+        """
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        return max(max_row - 1, 0) if max_row else None
+    
+    def plan_load(self, file_path: Union[str, Path], large_threshold: int = None) -> Dict[str, Any]:
+        """
+        根据采样估算和内存预算（max_memory_gb）规划加载方式
         
-        # 简单估算：通过文件大小判断（粗略估计）
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+        Args:
+            file_path: 语料文件路径
+            large_threshold: 可选的行数阈值（超过此行数时无论内存估算如何均分批加载）
+            
+        Returns:
+            规划结果字典：streaming（是否分批加载）、batch_size（批次大小）及估算明细
+        """
+        estimate = self.estimate_corpus(file_path)
+        budget = self.max_memory_gb * 1024 ** 3
+        
+        streaming = estimate["estimated_memory"] > budget * EAGER_MEMORY_FRACTION
+        if large_threshold is not None and estimate["estimated_rows"] > large_threshold:
+            streaming = True
         
-        # 估算行数（假设每行平均1KB）
-        estimated_rows = file_size_mb * 1000
+        batch_size = self.batch_size
+        if streaming and estimate["memory_per_row"] > 0:
+            batch_size = int(budget * BATCH_MEMORY_FRACTION / estimate["memory_per_row"])
+            batch_size = max(MIN_AUTO_BATCH_SIZE, min(MAX_AUTO_BATCH_SIZE, batch_size))
         
-        if estimated_rows > large_threshold:
-            logger.info(f"检测到大规模文件（估算 {estimated_rows:.0f} 行），使用分批加载")
-            return self.load_large_corpus(file_path)
+        logger.info(
+            f"加载规划: 估算 {estimate['estimated_rows']:.0f} 行，"
+            f"每行约 {estimate['bytes_per_row']:.0f} 字节（文件）/ {estimate['memory_per_row']:.0f} 字节（预处理后），"
+            f"估算内存 {estimate['estimated_memory'] / 1024 ** 2:.0f} MB，预算 {self.max_memory_gb} GB -> "
+            f"{'分批加载（批次大小 ' + str(batch_size) + '）' if streaming else '一次性加载'}"
+        )
+        
+        return dict(estimate, streaming=streaming, batch_size=batch_size)
+    
+    def auto_load(self, file_path: Union[str, Path], large_threshold: int = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        自动选择加载方式（根据采样估算的内存占用和内存预算）
+        
+        Args:
+            file_path: 语料文件路径
+            large_threshold: 可选的大规模阈值（超过此行数使用分批加载）
+            
+        Returns:
+            DataFrame 或分批迭代器
+        """
+        plan = self.plan_load(file_path, large_threshold)
+        
+        if plan["streaming"]:
+            logger.info(f"检测到大规模文件（估算 {plan['estimated_rows']:.0f} 行），使用分批加载")
+            return self.load_large_corpus(file_path, plan["batch_size"])
         else:
-            logger.info(f"检测到小规模文件（估算 {estimated_rows:.0f} 行），使用一次性加载")
+            logger.info(f"检测到小规模文件（估算 {plan['estimated_rows']:.0f} 行），使用一次性加载")
             return self.load_small_corpus(file_path)
-
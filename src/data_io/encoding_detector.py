@@ -0,0 +1,165 @@
+"""文件编码探测模块"""
+import codecs
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Union
+from ..utils.logger import logger
+
+
+class EncodingDetector:
+    """文本文件编码探测器（仅读取有限字节样本，避免整文件试错重读）"""
+
+    # BOM标记与对应编码（UTF-32需排在UTF-16之前，其BOM以UTF-16 BOM开头）
+    BOMS = [
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    ]
+
+    def __init__(self, sample_size: int = 64 * 1024, sample_windows: int = 3,
+                 fallback_encoding: str = 'utf-8', mixed_threshold: float = 0.01):
+        """
+        初始化编码探测器
+
+        Args:
+            sample_size: 每个采样窗口读取的字节数
+            sample_windows: 采样窗口数量（文件头、中部、尾部均匀分布）
+            fallback_encoding: 样本全为ASCII时使用的编码
+            mixed_threshold: GBK文件中恰好也是合法UTF-8的行占比超过该值时判定为混合编码
+                （短GBK文本偶尔也是合法的UTF-8字节序列）
+        """
+        self.sample_size = sample_size
+        self.sample_windows = max(1, sample_windows)
+        self.fallback_encoding = fallback_encoding
+        self.mixed_threshold = mixed_threshold
+
+    def detect(self, file_path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        探测文件编码
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            探测结果字典：
+            - encoding: 编码名称
+            - confidence: 置信度（0~1，样本中符合该编码的非ASCII行占比）
+            - mixed: 样本中是否混有多种编码
+            - errors: 读取时建议的解码错误处理方式（"strict"/"replace"）
+        """
+        start_time = time.perf_counter()
+        file_path = Path(file_path)
+        file_size = file_path.stat().st_size
+
+        with open(file_path, 'rb') as f:
+            head = f.read(4)
+
+            # 1. BOM标记
+            for bom, encoding in self.BOMS:
+                if head.startswith(bom):
+                    result = {"encoding": encoding, "confidence": 1.0, "mixed": False, "errors": "strict"}
+                    self._log_result(file_path, result, start_time, "BOM")
+                    return result
+
+            # 2. 按行统计非ASCII内容可被哪种编码解码
+            samples = self._read_samples(f, file_size)
+
+        utf8_lines = 0
+        gbk_lines = 0
+        invalid_lines = 0
+        for sample in samples:
+            for line in sample.split(b'\n'):
+                if line.isascii():
+                    continue
+                if self._can_decode(line, 'utf-8'):
+                    utf8_lines += 1
+                elif self._can_decode(line, 'gb18030'):
+                    gbk_lines += 1
+                else:
+                    invalid_lines += 1
+
+        non_ascii_lines = utf8_lines + gbk_lines + invalid_lines
+        if non_ascii_lines == 0:
+            # 未采样到的部分仍可能含非ASCII字符，读取时替换无法解码的字符而不中断
+            result = {"encoding": self.fallback_encoding, "confidence": 0.5, "mixed": False, "errors": "replace"}
+            self._log_result(file_path, result, start_time, "样本均为ASCII")
+            return result
+
+        # GBK/GB2312均按其超集GB18030解码
+        if utf8_lines >= gbk_lines:
+            encoding = 'utf-8'
+            matched_lines = utf8_lines
+            mixed = gbk_lines > 0 or invalid_lines > 0
+        else:
+            encoding = 'gb18030'
+            matched_lines = gbk_lines
+            mixed = invalid_lines > 0 or utf8_lines / non_ascii_lines > self.mixed_threshold
+
+        result = {
+            "encoding": encoding,
+            "confidence": round(matched_lines / non_ascii_lines, 4),
+            "mixed": mixed,
+            "errors": "replace" if mixed else "strict"
+        }
+        self._log_result(file_path, result, start_time, f"采样 {non_ascii_lines} 行非ASCII文本")
+
+        if mixed:
+            logger.warning(
+                f"文件疑似混合编码（UTF-8 {utf8_lines} 行，GBK {gbk_lines} 行，无法识别 {invalid_lines} 行），"
+                f"将按 {encoding} 读取并替换无法解码的字符"
+            )
+
+        return result
+
+    def _read_samples(self, f, file_size: int) -> List[bytes]:
+        """
+        读取均匀分布的采样窗口，并裁掉窗口首尾不完整的行
+
+        Args:
+            f: 以二进制模式打开的文件对象
+            file_size: 文件大小（字节）
+
+        Returns:
+            采样字节块列表
+        """
+        if file_size <= self.sample_size * self.sample_windows:
+            f.seek(0)
+            return [f.read()]
+
+        samples = []
+        step = (file_size - self.sample_size) // max(1, self.sample_windows - 1)
+        for i in range(self.sample_windows):
+            offset = i * step
+            f.seek(offset)
+            chunk = f.read(self.sample_size)
+
+            # 非文件头窗口丢弃第一行残片
+            if offset > 0:
+                chunk = chunk.split(b'\n', 1)[1] if b'\n' in chunk else b''
+            # 非文件尾窗口丢弃最后一行残片（避免截断多字节字符）
+            if offset + self.sample_size < file_size:
+                chunk = chunk.rsplit(b'\n', 1)[0] if b'\n' in chunk else b''
+
+            samples.append(chunk)
+
+        return samples
+
+    @staticmethod
+    def _can_decode(data: bytes, encoding: str) -> bool:
+        """判断字节串能否按指定编码严格解码"""
+        try:
+            data.decode(encoding)
+            return True
+        except UnicodeDecodeError:
+            return False
+
+    @staticmethod
+    def _log_result(file_path: Path, result: Dict[str, Any], start_time: float, basis: str) -> None:
+        """记录探测结果与耗时"""
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"编码探测: {file_path.name} -> {result['encoding']}"
+            f"（置信度 {result['confidence']:.2f}，依据: {basis}，耗时 {elapsed_ms:.1f} ms）"
+        )
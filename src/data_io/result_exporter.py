@@ -1,6 +1,7 @@
 """结果输出模块"""
 import pandas as pd
 from pathlib import Path
+from xml.sax.saxutils import escape
 from typing import Dict, List, Any
 from datetime import datetime
 from ..utils.logger import logger
@@ -159,6 +160,7 @@ class ResultExporter:
             for i, (word, count) in enumerate(results["请求分析"]["维度相关词频Top10"], 1):
                 md += f"| {i} | {word} | {count} |\n"
             md += "\n"
+            md += self._sketch_note(results["请求分析"])
         
         if "反馈分析" in results and "维度相关词频Top10" in results["反馈分析"]:
             md += "#### 反馈语料高频词\n\n"
@@ -167,6 +169,13 @@ class ResultExporter:
             for i, (word, count) in enumerate(results["反馈分析"]["维度相关词频Top10"], 1):
                 md += f"| {i} | {word} | {count} |\n"
             md += "\n"
+            md += self._sketch_note(results["反馈分析"])
+        
+        # 2.2 维度关联强度（启用关联强度时）
+        if any("关联强度" in results.get(group, {}) for group in ("请求分析", "反馈分析")):
+            md += f"### 2.2 {dim_str}关联强度\n\n"
+            md += self._association_table(results.get("请求分析", {}), "请求语料")
+            md += self._association_table(results.get("反馈分析", {}), "反馈语料")
         
         # 3. 可视化图表
         md += "## 3. 可视化图表\n\n"
@@ -192,6 +201,144 @@ class ResultExporter:
         
         return md
     
+    def _sketch_note(self, group_results: Dict[str, Any]) -> str:
+        """
+        近似统计模式下的误差说明（Markdown）
+        
+        Args:
+            group_results: 请求/反馈分析结果
+            
+        Returns:
+            Markdown内容，精确统计时为空
+        """
+        report = group_results.get("近似统计")
+        if not report:
+            return ""
+        
+        md = f"> **近似统计**：{report.get('统计方式', '')}。表中频次为真实频次的下界，"
+        md += f"真实频次不超过频次 + {report.get('维度相关词频误差上限', 0)}"
+        md += f"（总体词频为 + {report.get('总体词频误差上限', 0)}，误差界 {report.get('词频误差界', '')}）；"
+        md += f"维度关联词的共现次数同为下界，真实次数不超过共现次数 + {report.get('关联词共现次数误差上限', 0)}；"
+        md += f"不同词条数约 {report.get('不同词条数（估算）', 0)}，不同内容数约 {report.get('不同内容数（估算）', 0)}"
+        md += f"（相对标准误差 {report.get('基数估计相对标准误差', '')}）。"
+        md += "摘要本身内存有界，但全局词表仍随不同词条数增长。\n\n"
+        return md
+    
+    def _association_table(self, group_results: Dict[str, Any], title: str) -> str:
+        """
+        维度关联强度表（Markdown）
+        
+        Args:
+            group_results: 请求/反馈分析结果
+            title: 表格标题
+            
+        Returns:
+            Markdown内容，未启用关联强度时为空
+        """
+        strength = group_results.get("关联强度")
+        if not strength:
+            return ""
+        
+        md = f"#### {title}维度关联词（按{strength['排序方式']}排序）\n\n"
+        md += "| 维度 | 关联词 | 共现次数 | 共现条数 | 提升度 | PMI | χ² |\n"
+        md += "|------|--------|----------|----------|--------|-----|----|\n"
+        for dim, rows in strength["维度"].items():
+            for row in rows:
+                md += (f"| {dim} | {row['关联词']} | {row['共现次数']} | {row['共现条数']} | "
+                       f"{row['提升度']:.2f} | {row['PMI']:.2f} | {row['χ²']:.2f} |\n")
+        md += "\n"
+        return md
+    
+    def _export_association_sheet(self, group_results: Dict[str, Any], writer: pd.ExcelWriter, sheet_name: str) -> None:
+        """导出维度关联强度Sheet（未启用关联强度时不导出）"""
+        strength = group_results.get("关联强度")
+        if not strength:
+            return
+        
+        association_data = [
+            {"维度": dim, "排名": i + 1, **row}
+            for dim, rows in strength["维度"].items()
+            for i, row in enumerate(rows)
+        ]
+        pd.DataFrame(association_data).to_excel(writer, sheet_name=sheet_name, index=False)
+    
+    def export_association_graph(self, results: Dict[str, Any], analysis_type: str = "双场景") -> List[str]:
+        """
+        导出维度关联图（维度与关联词为节点，关联强度为边属性）
+        
+        同时输出GraphML（可导入Gephi、networkx等）和CSV边表。
+        
+        Args:
+            results: 分析结果字典
+            analysis_type: 分析类型
+            
+        Returns:
+            文件路径列表，未启用关联强度时为空
+        """
+        edges = [
+            {"语料类型": group, "维度": dim, **row}
+            for group in ("请求分析", "反馈分析")
+            if "关联强度" in results.get(group, {})
+            for dim, rows in results[group]["关联强度"]["维度"].items()
+            for row in rows
+        ]
+        if not edges:
+            return []
+        
+        logger.info(f"导出维度关联图: {analysis_type}，共 {len(edges)} 条边")
+        dimensions = results.get("维度", [])
+        dim_str = ",".join(dimensions) if dimensions else "通用"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        csv_path = self.output_dir / f"维度关联图_{dim_str}_{timestamp}.csv"
+        pd.DataFrame(edges).to_csv(csv_path, index=False, encoding='utf-8-sig')
+        
+        # 节点：维度与关联词（同名时为同一节点）
+        nodes = {}
+        for edge in edges:
+            nodes.setdefault(edge["维度"], "维度")
+            nodes.setdefault(edge["关联词"], "关联词")
+        
+        attributes = [("语料类型", "string"), ("共现次数", "int"), ("共现条数", "int"),
+                      ("提升度", "double"), ("PMI", "double"), ("χ²", "double")]
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">',
+            '  <key id="type" for="node" attr.name="类型" attr.type="string"/>',
+        ]
+        for i, (name, attr_type) in enumerate(attributes):
+            lines.append(f'  <key id="e{i}" for="edge" attr.name="{escape(name)}" attr.type="{attr_type}"/>')
+        lines.append('  <graph id="dimension_associations" edgedefault="directed">')
+        for node, node_type in nodes.items():
+            lines.append(f'    <node id="{escape(node, {chr(34): "&quot;"})}"><data key="type">{node_type}</data></node>')
+        for edge in edges:
+            source = escape(edge["维度"], {chr(34): "&quot;"})
+            target = escape(edge["关联词"], {chr(34): "&quot;"})
+            data = "".join(
+                f'<data key="e{i}">{escape(str(edge[name]))}</data>' for i, (name, _) in enumerate(attributes)
+            )
+            lines.append(f'    <edge source="{source}" target="{target}">{data}</edge>')
+        lines.append('  </graph>')
+        lines.append('</graphml>')
+        
+        graphml_path = self.output_dir / f"维度关联图_{dim_str}_{timestamp}.graphml"
+        with open(graphml_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        
+        logger.info(f"维度关联图已保存: {graphml_path}")
+        return [str(graphml_path), str(csv_path)]
+    
+    def _export_sketch_sheet(self, group_results: Dict[str, Any], writer: pd.ExcelWriter, sheet_name: str) -> None:
+        """导出近似统计误差说明Sheet（精确统计时不导出）"""
+        report = group_results.get("近似统计")
+        if not report:
+            return
+        
+        sketch_data = [{"指标": key, "数值": value} for key, value in report.items()]
+        sketch_data.append({"指标": "说明", "数值": "词频与关联词共现次数为真实频次的下界，真实频次 ≤ 频次 + 误差上限"})
+        sketch_data.append({"指标": "内存说明", "数值": "高频词摘要与基数估计内存有界；全局词表仍随不同词条数增长（内存 O(词表大小)）"})
+        pd.DataFrame(sketch_data).to_excel(writer, sheet_name=sheet_name, index=False)
+    
     def export_excel(self, results: Dict[str, Any], analysis_type: str = "双场景") -> str:
         """
         导出Excel报告
@@ -265,6 +412,12 @@ class ResultExporter:
             ]
             df_demand = pd.DataFrame(demand_data)
             df_demand.to_excel(writer, sheet_name="请求-需求分类", index=False)
+        
+        # 维度关联强度
+        self._export_association_sheet(request_results, writer, "请求-维度关联")
+        
+        # 近似统计误差说明
+        self._export_sketch_sheet(request_results, writer, "请求-近似统计")
     
     def _export_feedback_sheet(self, feedback_results: Dict[str, Any], writer: pd.ExcelWriter) -> None:
         """导出反馈分析Sheet"""
@@ -294,6 +447,12 @@ class ResultExporter:
             ]
             df_suggestion = pd.DataFrame(suggestion_data)
             df_suggestion.to_excel(writer, sheet_name="反馈-优化建议", index=False)
+        
+        # 维度关联强度
+        self._export_association_sheet(feedback_results, writer, "反馈-维度关联")
+        
+        # 近似统计误差说明
+        self._export_sketch_sheet(feedback_results, writer, "反馈-近似统计")
     
     def export_all(self, results: Dict[str, Any], analysis_type: str = "双场景") -> Dict[str, str]:
         """
@@ -324,6 +483,14 @@ class ResultExporter:
         except Exception as e:
             logger.error(f"导出Excel失败: {str(e)}")
         
+        # 导出维度关联图（启用关联强度时）
+        try:
+            graph_paths = self.export_association_graph(results, analysis_type)
+            if graph_paths:
+                filepaths["graphml"], filepaths["graph_csv"] = graph_paths
+        except Exception as e:
+            logger.error(f"导出维度关联图失败: {str(e)}")
+        
         logger.info(f"所有报告导出完成: {list(filepaths.keys())}")
         return filepaths
 
@@ -183,6 +183,14 @@ class AnalyzerGUI:
             self.root.after(0, lambda: messagebox.showerror("错误", error_msg))
         
         finally:
+            # 释放分词/情感分析进程池和结果缓存连接
+            if self.analyzer is not None:
+                try:
+                    self.analyzer.close()
+                except Exception as e:
+                    logger.warning(f"释放分析器资源失败: {str(e)}")
+                self.analyzer = None
+            
             # 恢复按钮
             self.root.after(0, lambda: self.start_button.config(state="normal", text="开始分析"))
 
@@ -195,5 +203,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为EXE时多进程分词/情感分析需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
 
@@ -4,8 +4,10 @@ PPT主题生成场景语料分析工具 - 主入口
 """
 import sys
 import json
+from contextlib import closing
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import numpy as np
 import pandas as pd
 
 # 添加src目录到路径
@@ -18,6 +20,12 @@ from preprocess.tokenizer import Tokenizer
 from preprocess.dimension_marker import DimensionMarker
 from analyzer.request_analyzer import RequestAnalyzer
 from analyzer.feedback_analyzer import FeedbackAnalyzer
+from analyzer.cooccurrence import AssociationMetrics
+from analyzer.grouped_engine import GroupedAnalysisEngine
+from analyzer.partial_stats import PartialStats
+from analyzer.sentiment_engine import SentimentEngine
+from analyzer.sketches import SketchSettings
+from utils.cache import CacheManager
 from utils.logger import logger
 
 
@@ -37,7 +45,13 @@ class CorpusAnalyzer:
         # 初始化各模块
         self.data_loader = DataLoader(
             batch_size=self.config["data_loader"]["batch_size"],
-            min_content_length=self.config["data_loader"]["min_content_length"]
+            min_content_length=self.config["data_loader"]["min_content_length"],
+            default_encoding=self.config["data_loader"].get("default_encoding", "utf-8"),
+            cache_dir=self.config["data_loader"].get("corpus_cache_dir", ".cache/corpus")
+            if self.config["performance"].get("enable_cache", False) else None,
+            jsonl_fields=self.config["data_loader"].get("jsonl_fields"),
+            max_memory_gb=self.config["performance"].get("max_memory_gb", 2.0),
+            extra_columns=self.config["data_loader"].get("extra_columns")
         )
         
         self.cleaner = TextCleaner()
@@ -48,11 +62,49 @@ class CorpusAnalyzer:
         else:
             config_dir = Path(__file__).parent / "config"
         
+        performance = self.config.get("performance", {})
+        
+        # 分词/情感结果持久化缓存（跨运行复用）
+        self.result_cache = CacheManager(
+            cache_dir=performance.get("result_cache_dir", ".cache/results"),
+            max_size_mb=performance.get("result_cache_max_mb", 512)
+        ) if performance.get("enable_cache", False) else None
+        
+        workers = performance.get("thread_count", 1) if performance.get("enable_multithread", False) else 1
+        
         self.tokenizer = Tokenizer(
             business_dict_path=str(config_dir / "ppt_business_dict.txt"),
-            stopwords_path=str(config_dir / "stopwords.txt")
+            stopwords_path=str(config_dir / "stopwords.txt"),
+            workers=workers,
+            cache=self.result_cache
+        )
+        
+        # 请求/反馈分析器共用的批量情感分析引擎（进程池与模型预热只发生一次）
+        self.sentiment_engine = SentimentEngine(
+            workers=workers,
+            parallel_threshold=performance.get("sentiment_parallel_threshold", 2000),
+            cache=self.result_cache,
+            method=self.config["analyzer"].get("sentiment_method", "snownlp"),
+            agreement_sample=self.config["analyzer"].get("sentiment_agreement_sample", 0)
         )
         
+        # 近似统计模式（超大规模语料下词频/关联词使用有界内存摘要）
+        approximate = self.config["analyzer"].get("approximate", {})
+        self.sketch = SketchSettings(
+            top_k_error=approximate.get("top_k_error", 0.0001),
+            distinct_error=approximate.get("distinct_error", 0.01)
+        ) if approximate.get("enabled", False) else None
+        
+        # 维度关联强度（提升度/PMI/χ²）及维度关联图导出
+        association = self.config["analyzer"].get("association_metrics", {})
+        self.association_metrics = AssociationMetrics(
+            ranking=association.get("ranking", "lift"),
+            min_cooccurrence=association.get("min_cooccurrence", 2),
+            top_k=association.get("top_k", 10)
+        ) if association.get("enabled", False) else None
+        if self.association_metrics is not None and self.sketch is not None:
+            logger.warning("近似统计模式下不计算维度关联强度")
+        
         self.dimension_marker = DimensionMarker(
             synonym_dict_path=str(config_dir / "synonym_dict.txt"),
             weight_multiplier=self.config["preprocess"]["custom_dimension_weight_multiplier"]
@@ -71,8 +123,16 @@ class CorpusAnalyzer:
         logger.info(f"配置文件加载成功: {config_path}")
         return config
     
+    def close(self) -> None:
+        """释放分词/情感分析进程池和结果缓存连接"""
+        self.tokenizer.close()
+        self.sentiment_engine.close()
+        if self.result_cache is not None:
+            self.result_cache.close()
+    
     def analyze(self, file_path: str, custom_dimensions: List[str], 
-               analysis_type: str = "both", output_dir: str = "output") -> Dict[str, Any]:
+               analysis_type: str = "both", output_dir: str = "output",
+               streaming: bool = None) -> Dict[str, Any]:
         """
         执行语料分析
         
@@ -81,17 +141,45 @@ class CorpusAnalyzer:
             custom_dimensions: 自定义维度列表（如 ["老师", "教学"]）
             analysis_type: 分析类型（"request"=请求, "feedback"=反馈, "both"=双场景）
             output_dir: 输出目录
+            streaming: 是否使用分批流式分析（None表示读取配置 data_loader.streaming，
+                "auto"表示根据采样估算的内存占用和 performance.max_memory_gb 自动选择）
             
         Returns:
             分析结果字典
         """
+        if streaming is None:
+            streaming = self.config["data_loader"].get("streaming", "auto")
+        
+        # 自动规划的批次大小只用于本次分析，不覆盖加载器的配置
+        batch_size = None
+        if streaming == "auto":
+            try:
+                plan = self.data_loader.plan_load(file_path)
+                streaming = plan["streaming"]
+                if streaming:
+                    batch_size = plan["batch_size"]
+            except Exception as e:
+                logger.warning(f"加载规划失败，使用一次性加载: {str(e)}")
+                streaming = False
+        
         logger.info("="*60)
         logger.info("开始语料分析")
         logger.info(f"文件: {file_path}")
         logger.info(f"自定义维度: {custom_dimensions}")
         logger.info(f"分析类型: {analysis_type}")
+        logger.info(f"分析模式: {'分批流式' if streaming else '一次性加载'}")
         logger.info("="*60)
         
+        if streaming:
+            results = self._analyze_streaming(file_path, custom_dimensions, analysis_type, output_dir, batch_size)
+            if results:
+                logger.info("\n[步骤 4/5] 导出结果...")
+                self._export_results(results, analysis_type, output_dir)
+                
+                logger.info("\n[步骤 5/5] 分析完成！")
+                logger.info("="*60)
+            return results
+        
         # 1. 加载数据
         logger.info("\n[步骤 1/5] 加载数据...")
         df_all = self._load_data(file_path)
@@ -110,7 +198,7 @@ class CorpusAnalyzer:
             logger.error("预处理后数据为空")
             return {}
         
-        logger.info(f"预处理完成，剩余 {len(df_processed)} 条有效语料")
+        logger.info(f"预处理完成，剩余 {self._row_count(df_processed)} 条有效语料")
         
         # 3. 分析
         logger.info("\n[步骤 3/5] 执行分析...")
@@ -142,6 +230,14 @@ class CorpusAnalyzer:
             logger.info("1/3 清洗文本...")
             df = self.cleaner.clean_corpus(df)
             
+            # 相同文本只分词、标记、情感分析一次，统计时按重复次数加权
+            if self.config["preprocess"].get("deduplicate", True):
+                df = self.cleaner.collapse_duplicates(df)
+            
+            # 不含任何维度词子串的语料必然不相关，跳过分词
+            if self.config["preprocess"].get("relevance_prefilter", True):
+                df = self.dimension_marker.prefilter_corpus(df, custom_dimensions)
+            
             # 2. 分词
             logger.info("2/3 分词...")
             df = self.tokenizer.tokenize_corpus(df)
@@ -167,37 +263,50 @@ class CorpusAnalyzer:
         }
         
         try:
-            # 分割请求和反馈语料
-            df_request = df[df['type'].str.contains('请求|request', case=False, na=False)] if 'type' in df.columns else df
-            df_feedback = df[df['type'].str.contains('反馈|feedback', case=False, na=False)] if 'type' in df.columns else pd.DataFrame()
+            # 按type划分请求和反馈语料（行掩码，不复制子集）
+            request_mask, feedback_mask = self._type_masks(df)
             
             # 如果没有type字段或无法区分，则全部视为请求语料
-            if len(df_request) == 0 and len(df_feedback) == 0:
+            if not request_mask.any() and not feedback_mask.any():
                 logger.warning("无type字段或无法区分请求/反馈，全部视为请求语料")
-                df_request = df
+                request_mask = np.ones(len(df), dtype=bool)
             
-            logger.info(f"请求语料: {len(df_request)} 条, 反馈语料: {len(df_feedback)} 条")
+            request_count = self._row_count(df, request_mask)
+            feedback_count = self._row_count(df, feedback_mask)
+            logger.info(f"请求语料: {request_count} 条, 反馈语料: {feedback_count} 条")
             
-            # 分析请求语料
-            if analysis_type in ["request", "both"] and len(df_request) > 0:
-                logger.info("分析请求语料...")
-                request_analyzer = RequestAnalyzer(custom_dimensions, output_dir)
-                results["请求分析"] = request_analyzer.analyze(df_request)
+            matcher = self.dimension_marker.compile(custom_dimensions)
+            analyzers = {}
+            masks = {}
+            if analysis_type in ["request", "both"] and request_mask.any():
+                analyzers["请求分析"] = RequestAnalyzer(
+                    custom_dimensions, output_dir, self.result_cache, matcher,
+                    self._rules("request"), self.sentiment_engine, self.sketch, self.association_metrics
+                )
+                masks["请求分析"] = request_mask
+            if analysis_type in ["feedback", "both"] and feedback_mask.any():
+                analyzers["反馈分析"] = FeedbackAnalyzer(
+                    custom_dimensions, output_dir, self.result_cache, matcher,
+                    self._rules("feedback"), self.sentiment_engine, self.sketch, self.association_metrics
+                )
+                masks["反馈分析"] = feedback_mask
             
-            # 分析反馈语料
-            if analysis_type in ["feedback", "both"] and len(df_feedback) > 0:
-                logger.info("分析反馈语料...")
-                feedback_analyzer = FeedbackAnalyzer(custom_dimensions, output_dir)
-                results["反馈分析"] = feedback_analyzer.analyze(df_feedback)
+            # 请求/反馈语料的中间统计在一次遍历中完成
+            if analyzers:
+                logger.info(f"分析{'、'.join(name[:2] + '语料' for name in analyzers)}...")
+                group_stats = GroupedAnalysisEngine(analyzers).collect(df, masks)
+                for name, analyzer in analyzers.items():
+                    results[name] = analyzer.summarize(group_stats[name])
             
             # 整体统计
+            total_count = self._row_count(df)
             results["基础统计"] = {
-                "总语料数": len(df),
-                "相关语料数": len(df),
+                "总语料数": total_count,
+                "相关语料数": total_count,
                 "相关占比": "100%",
                 "类型分布": {
-                    "请求语料": len(df_request),
-                    "反馈语料": len(df_feedback)
+                    "请求语料": request_count,
+                    "反馈语料": feedback_count
                 }
             }
             
@@ -209,6 +318,175 @@ class CorpusAnalyzer:
             traceback.print_exc()
             return results
     
+    def _rules(self, analysis_type: str) -> Dict[str, Any]:
+        """
+        读取配置中的关键词规则表（analyzer.rules.request / analyzer.rules.feedback）
+        
+        Args:
+            analysis_type: "request" 或 "feedback"
+            
+        Returns:
+            规则表 {"categories": {...}, "scenes": {...}}，未配置时为空（使用内置规则）
+        """
+        return self.config.get("analyzer", {}).get("rules", {}).get(analysis_type, {})
+    
+    @staticmethod
+    def _row_count(df: pd.DataFrame, mask: np.ndarray = None) -> int:
+        """
+        统计语料条数（去重后按重复次数还原为原始条数）
+        
+        Args:
+            df: 语料DataFrame
+            mask: 行掩码（只统计选中的行），None表示全部行
+            
+        Returns:
+            原始语料条数
+        """
+        if 'dup_count' in df.columns:
+            counts = df['dup_count'].to_numpy()
+            return int(counts[mask].sum() if mask is not None else counts.sum())
+        return int(mask.sum()) if mask is not None else len(df)
+    
+    def _type_masks(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按type字段划分请求和反馈语料（type编码为类别码，每个取值只匹配一次）
+        
+        Args:
+            df: 语料DataFrame
+            
+        Returns:
+            (请求语料行掩码, 反馈语料行掩码)，无type字段时全部为请求语料
+        """
+        if 'type' not in df.columns:
+            return np.ones(len(df), dtype=bool), np.zeros(len(df), dtype=bool)
+        
+        codes, values = pd.factorize(df['type'])
+        values = pd.Series(values, dtype=object)
+        # 末尾追加False，使空值（类别码-1）不属于任何分组
+        is_request = np.append(values.str.contains('请求|request', case=False, na=False).to_numpy(dtype=bool), False)
+        is_feedback = np.append(values.str.contains('反馈|feedback', case=False, na=False).to_numpy(dtype=bool), False)
+        return is_request[codes], is_feedback[codes]
+    
+    def _analyze_streaming(self, file_path: str, custom_dimensions: List[str], 
+                           analysis_type: str, output_dir: str, batch_size: int = None) -> Dict[str, Any]:
+        """
+        分批流式分析：逐批预处理并计算中间统计，合并后生成与一次性分析一致的结果
+        
+        Args:
+            file_path: 语料文件路径
+            custom_dimensions: 自定义维度列表
+            analysis_type: 分析类型
+            output_dir: 输出目录
+            batch_size: 本次分析的批次大小（None表示使用配置 data_loader.batch_size）
+            
+        Returns:
+            分析结果字典
+        """
+        matcher = self.dimension_marker.compile(custom_dimensions)
+        request_analyzer = RequestAnalyzer(
+            custom_dimensions, output_dir, self.result_cache, matcher, self._rules("request"),
+            self.sentiment_engine, self.sketch, self.association_metrics
+        ) if analysis_type in ["request", "both"] else None
+        feedback_analyzer = FeedbackAnalyzer(
+            custom_dimensions, output_dir, self.result_cache, matcher, self._rules("feedback"),
+            self.sentiment_engine, self.sketch, self.association_metrics
+        ) if analysis_type in ["feedback", "both"] else None
+        
+        # 每批请求/反馈语料的中间统计在一次遍历中完成
+        engine = GroupedAnalysisEngine({
+            name: analyzer for name, analyzer in (("request", request_analyzer), ("feedback", feedback_analyzer))
+            if analyzer is not None
+        })
+        
+        request_stats = PartialStats(custom_dimensions, self.sketch)
+        feedback_stats = PartialStats(custom_dimensions, self.sketch)
+        # 无法区分请求/反馈的批次，仅当全量语料均无法区分时作为请求语料使用
+        fallback_stats = PartialStats(custom_dimensions, self.sketch)
+        
+        loaded_count = 0
+        relevant_count = 0
+        request_count = 0
+        feedback_count = 0
+        fallback_count = 0
+        
+        logger.info("\n[步骤 1-3/5] 分批加载、预处理并分析...")
+        # 只捕获数据加载的异常；预处理之后的分析异常与一次性加载模式一致，直接抛出
+        with closing(self.data_loader.load_large_corpus(file_path, batch_size)) as batches:
+            batch_index = 0
+            while True:
+                try:
+                    batch = next(batches, None)
+                except Exception as e:
+                    logger.error(f"数据加载失败: {str(e)}")
+                    return {}
+                if batch is None:
+                    break
+                batch_index += 1
+                loaded_count += len(batch)
+                
+                batch = self._preprocess(batch, custom_dimensions)
+                if batch is None:
+                    logger.error(f"批次 {batch_index} 预处理失败")
+                    return {}
+                if len(batch) == 0:
+                    continue
+                
+                relevant_count += self._row_count(batch)
+                request_mask, feedback_mask = self._type_masks(batch)
+                
+                if not request_mask.any() and not feedback_mask.any():
+                    fallback_count += self._row_count(batch)
+                    if request_analyzer is not None:
+                        fallback_stats.merge(request_analyzer.collect_stats(batch))
+                    continue
+                
+                request_count += self._row_count(batch, request_mask)
+                feedback_count += self._row_count(batch, feedback_mask)
+                masks = {"request": request_mask, "feedback": feedback_mask}
+                totals = {"request": request_stats, "feedback": feedback_stats}
+                for name, stats in engine.collect(batch, masks).items():
+                    if masks[name].any():
+                        totals[name].merge(stats)
+        
+        if loaded_count == 0:
+            logger.error("数据加载失败或数据为空")
+            return {}
+        if relevant_count == 0:
+            logger.error("预处理后数据为空")
+            return {}
+        
+        logger.info(f"数据加载完成，共 {loaded_count} 条语料，预处理后剩余 {relevant_count} 条有效语料")
+        
+        # 如果没有type字段或无法区分，则全部视为请求语料
+        if request_count == 0 and feedback_count == 0:
+            logger.warning("无type字段或无法区分请求/反馈，全部视为请求语料")
+            request_stats = fallback_stats
+            request_count = fallback_count
+        
+        logger.info(f"请求语料: {request_count} 条, 反馈语料: {feedback_count} 条")
+        
+        results = {
+            "维度": custom_dimensions
+        }
+        
+        if request_analyzer is not None and request_count > 0:
+            results["请求分析"] = request_analyzer.summarize(request_stats)
+        
+        if feedback_analyzer is not None and feedback_count > 0:
+            results["反馈分析"] = feedback_analyzer.summarize(feedback_stats)
+        
+        results["基础统计"] = {
+            "总语料数": relevant_count,
+            "相关语料数": relevant_count,
+            "相关占比": "100%",
+            "类型分布": {
+                "请求语料": request_count,
+                "反馈语料": feedback_count
+            }
+        }
+        
+        return results
+    
     def _export_results(self, results: Dict[str, Any], analysis_type: str, output_dir: str) -> None:
         """导出结果"""
         try:
@@ -228,7 +506,7 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="PPT语料分析工具")
-    parser.add_argument("file", help="语料文件路径 (.xlsx 或 .csv)")
+    parser.add_argument("file", help="语料文件路径 (.xlsx、.csv 或 .jsonl)")
     parser.add_argument("--dimensions", "-d", required=True, 
                        help="自定义维度（多个用逗号分隔，如：老师,教学）")
     parser.add_argument("--type", "-t", choices=["request", "feedback", "both"], 
@@ -237,6 +515,8 @@ def main():
                        help="输出目录（默认：output）")
     parser.add_argument("--config", "-c", default=None, 
                        help="配置文件路径（可选）")
+    parser.add_argument("--streaming", "-s", action="store_true", default=None,
+                       help="分批流式分析（内存占用取决于批次大小，适合超大规模语料）")
     
     args = parser.parse_args()
     
@@ -249,12 +529,16 @@ def main():
     
     # 创建分析器并执行
     analyzer = CorpusAnalyzer(config_path=args.config)
-    results = analyzer.analyze(
-        file_path=args.file,
-        custom_dimensions=dimensions,
-        analysis_type=args.type,
-        output_dir=args.output
-    )
+    try:
+        results = analyzer.analyze(
+            file_path=args.file,
+            custom_dimensions=dimensions,
+            analysis_type=args.type,
+            output_dir=args.output,
+            streaming=args.streaming
+        )
+    finally:
+        analyzer.close()
     
     if results:
         logger.info("\n分析成功完成！")
@@ -265,5 +549,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为EXE时多进程分词需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
 
@@ -14,12 +14,17 @@ class TextCleaner:
         self.special_chars_pattern = re.compile(r'[^\w\s\u4e00-\u9fa5.,!?;:，。！？；：、]')
         # 多余空格清理规则
         self.whitespace_pattern = re.compile(r'\s+')
-        # 数字转换规则
+        # 特殊符号+空白合并规则（特殊符号替换为空格后再合并空白，等价于一次替换连续的特殊符号/空白）
+        self.fused_pattern = re.compile(r'[^\w\u4e00-\u9fa5.,!?;:，。！？；：、]+')
+        # 数字转换规则（逐字符转换）
         self.number_mapping = {
             '0': '零', '1': '一', '2': '二', '3': '三', '4': '四',
-            '5': '五', '6': '六', '7': '七', '8': '八', '9': '九',
-            '10': '十'
+            '5': '五', '6': '六', '7': '七', '8': '八', '9': '九'
         }
+        self.number_table = str.maketrans(self.number_mapping)
+        # 全角转半角规则（全角ASCII字符及全角空格）
+        self.width_table = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+        self.width_table[0x3000] = ord(' ')
     
     def clean_special_chars(self, text: str) -> str:
         """
@@ -61,10 +66,21 @@ class TextCleaner:
         """
         if convert_chinese:
             # 将常见数字转为中文（可选功能，默认不开启）
-            for num, chinese in self.number_mapping.items():
-                text = text.replace(num, chinese)
+            text = text.translate(self.number_table)
         return text
     
+    def normalize_width(self, text: str) -> str:
+        """
+        全角字符转半角
+        
+        Args:
+            text: 原始文本
+            
+        Returns:
+            转换后的文本
+        """
+        return text.translate(self.width_table)
+    
     def remove_duplicates(self, texts: List[str]) -> List[str]:
         """
         去除重复文本
@@ -85,7 +101,8 @@ class TextCleaner:
         return unique_texts
     
     def clean_text(self, text: str, remove_chars: bool = True, 
-                   normalize_space: bool = True, convert_numbers: bool = False) -> str:
+                   normalize_space: bool = True, convert_numbers: bool = False, 
+                   normalize_width: bool = False) -> str:
         """
         综合清洗文本
         
@@ -94,6 +111,7 @@ class TextCleaner:
             remove_chars: 是否清理特殊符号
             normalize_space: 是否标准化空格
             convert_numbers: 是否转换数字为中文
+            normalize_width: 是否将全角字符转为半角
             
         Returns:
             清洗后的文本
@@ -101,6 +119,10 @@ class TextCleaner:
         if not text or not isinstance(text, str):
             return ""
         
+        # 全角转半角
+        if normalize_width:
+            text = self.normalize_width(text)
+        
         # 清理特殊符号
         if remove_chars:
             text = self.clean_special_chars(text)
@@ -115,6 +137,45 @@ class TextCleaner:
         
         return text
     
+    def clean_series(self, texts: pd.Series, remove_chars: bool = True, 
+                     normalize_space: bool = True, convert_numbers: bool = False, 
+                     normalize_width: bool = False) -> pd.Series:
+        """
+        向量化批量清洗文本（结果与逐条调用clean_text一致）
+        
+        特殊符号清理与空格合并同时开启时合并为一次正则替换，数字/全角转换使用预编译转换表。
+        
+        Args:
+            texts: 文本Series
+            remove_chars: 是否清理特殊符号
+            normalize_space: 是否标准化空格
+            convert_numbers: 是否转换数字为中文
+            normalize_width: 是否将全角字符转为半角
+            
+        Returns:
+            清洗后的文本Series（非字符串值清洗为空字符串）
+        """
+        if isinstance(texts.dtype, pd.StringDtype):
+            texts = texts.fillna("")
+        else:
+            texts = texts.where(texts.map(lambda x: isinstance(x, str)), "")
+        
+        if normalize_width:
+            texts = texts.str.translate(self.width_table)
+        
+        # 传入预编译正则，保证Unicode语义与clean_text一致
+        if remove_chars and normalize_space:
+            texts = texts.str.replace(self.fused_pattern, ' ', regex=True).str.strip()
+        elif remove_chars:
+            texts = texts.str.replace(self.special_chars_pattern, ' ', regex=True)
+        elif normalize_space:
+            texts = texts.str.replace(self.whitespace_pattern, ' ', regex=True).str.strip()
+        
+        if convert_numbers:
+            texts = texts.str.translate(self.number_table)
+        
+        return texts
+    
     def clean_corpus(self, df: pd.DataFrame, content_col: str = 'content') -> pd.DataFrame:
         """
         批量清洗语料
@@ -129,9 +190,7 @@ class TextCleaner:
         logger.info(f"开始清洗语料，共 {len(df)} 条")
         
         # 清洗文本
-        df[content_col] = df[content_col].apply(
-            lambda x: self.clean_text(x) if isinstance(x, str) else ""
-        )
+        df[content_col] = self.clean_series(df[content_col])
         
         # 过滤清洗后为空的文本
         original_count = len(df)
@@ -141,4 +200,37 @@ class TextCleaner:
         logger.info(f"清洗完成，过滤掉 {filtered_count} 条空文本，剩余 {len(df)} 条")
         
         return df
-
+    
+    def collapse_duplicates(self, df: pd.DataFrame, content_col: str = 'content',
+                            count_col: str = 'dup_count') -> pd.DataFrame:
+        """
+        合并清洗后内容相同的语料，保留首次出现的行并记录重复次数
+        
+        后续分词、维度标记和情感分析只需对唯一文本各执行一次，
+        统计时按重复次数加权，结果与不去重时一致。
+        
+        Args:
+            df: 清洗后的语料DataFrame
+            content_col: 内容列名
+            count_col: 重复次数列名（已存在时累加原有次数）
+            
+        Returns:
+            去重后的DataFrame
+        """
+        if len(df) == 0:
+            return df
+        
+        # 类型不同的相同内容分属请求/反馈，不能合并
+        keys = [content_col] + (['type'] if 'type' in df.columns else [])
+        grouped = df.groupby(keys, sort=False, observed=True, dropna=False)
+        if count_col in df.columns:
+            counts = grouped[count_col].transform('sum')
+        else:
+            counts = grouped[content_col].transform('size')
+        
+        first = ~df.duplicated(subset=keys)
+        df = df[first].assign(**{count_col: counts[first].astype('int64')})
+        
+        logger.info(f"去重完成，{first.size} 条语料合并为 {len(df)} 条唯一文本")
+        
+        return df
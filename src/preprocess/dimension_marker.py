@@ -1,10 +1,103 @@
 """自定义维度标记模块"""
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
+from .vocabulary import TokenArrays, Vocabulary, vocabulary
+from ..utils.keyword_matcher import KeywordMatcher
 from ..utils.logger import logger
 
 
+class DimensionMatcher:
+    """
+    编译后的维度匹配器（每次分析只构建一次）
+
+    持有扩展后的维度词集合和同义词反查索引，并在词表上预先计算每个词条是否命中，
+    逐行标记只需查表。
+    """
+
+    def __init__(self, dimensions: List[str], expanded: Set[str], synonym_index: Dict[str, Set[str]],
+                 weight_multiplier: float, vocab: Vocabulary = vocabulary):
+        """
+        初始化维度匹配器
+
+        Args:
+            dimensions: 自定义维度列表
+            expanded: 扩展后的维度词集合（含同义词）
+            synonym_index: 同义词反查索引 {维度词或同义词: 所属自定义维度集合}
+            weight_multiplier: 命中维度词的权重倍数
+            vocab: token编码词表
+        """
+        self.dimensions = dimensions
+        self.expanded = frozenset(expanded)
+        self.synonym_index = synonym_index
+        self.weight_multiplier = weight_multiplier
+        self.vocab = vocab
+        self._content_matcher = None
+
+    def hit_table(self) -> np.ndarray:
+        """
+        词表级命中表（以token id为下标，新增词条时增量计算）
+
+        Returns:
+            布尔数组，True表示该词条属于扩展维度词
+        """
+        expanded = self.expanded
+        return self.vocab.derived(("dimension_hit", expanded), lambda token: token in expanded)
+
+    def match(self, arrays: TokenArrays) -> np.ndarray:
+        """
+        逐位置判断是否命中维度词
+
+        Args:
+            arrays: token数组
+
+        Returns:
+            与arrays.values等长的布尔数组
+        """
+        return self.hit_table()[arrays.values]
+
+    def may_match(self, contents: List[str]) -> np.ndarray:
+        """
+        分词前预筛选：判断内容是否包含任一维度词子串
+        
+        相关语料必然存在与维度词完全相同的token，而token均为内容的子串，
+        因此未通过预筛选的内容一定不相关；通过的内容仍需分词后精确判断。
+
+        Args:
+            contents: 清洗后的内容列表
+
+        Returns:
+            每条内容是否可能相关的布尔数组
+        """
+        if self._content_matcher is None:
+            self._content_matcher = KeywordMatcher((term, 1) for term in self.expanded)
+        return np.array(self._content_matcher.scan_many(contents), dtype=bool)
+
+    def is_relevant(self, tokens: List[str]) -> bool:
+        """判断token列表是否包含维度词"""
+        return any(token in self.expanded for token in tokens)
+
+    def weights(self, tokens: List[str]) -> Dict[str, float]:
+        """生成带权重的token字典 {token: weight}"""
+        return {
+            token: self.weight_multiplier if token in self.expanded else 1.0
+            for token in tokens
+        }
+
+    def dimensions_of(self, token: str) -> Set[str]:
+        """
+        查询维度词或同义词所属的自定义维度
+
+        Args:
+            token: 维度词或同义词
+
+        Returns:
+            所属自定义维度集合（非维度词返回空集合）
+        """
+        return self.synonym_index.get(token, set())
+
+
 class DimensionMarker:
     """自定义维度标记器（通用化，支持任意维度）"""
     
@@ -19,6 +112,8 @@ class DimensionMarker:
         self.synonym_dict_path = synonym_dict_path
         self.weight_multiplier = weight_multiplier
         self.synonym_dict: Dict[str, Set[str]] = {}
+        # 已编译的维度匹配器 {维度元组: 匹配器}
+        self._matchers: Dict[Tuple[str, ...], DimensionMatcher] = {}
         
         # 加载同义词词典
         if synonym_dict_path:
@@ -85,6 +180,36 @@ class DimensionMarker:
         logger.info(f"维度扩展: {custom_dimensions} -> {len(expanded)} 个关键词")
         return expanded
     
+    def compile(self, custom_dimensions: List[str]) -> DimensionMatcher:
+        """
+        编译维度匹配器（同一组维度只扩展一次，后续调用直接复用）
+        
+        Args:
+            custom_dimensions: 用户输入的自定义维度列表
+            
+        Returns:
+            维度匹配器
+        """
+        key = tuple(custom_dimensions)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            synonym_index: Dict[str, Set[str]] = {}
+            for dim in custom_dimensions:
+                dim = dim.strip()
+                if not dim:
+                    continue
+                for term in {dim} | self.synonym_dict.get(dim, set()):
+                    synonym_index.setdefault(term, set()).add(dim)
+            
+            matcher = DimensionMatcher(
+                dimensions=list(custom_dimensions),
+                expanded=self.expand_dimensions(custom_dimensions),
+                synonym_index=synonym_index,
+                weight_multiplier=self.weight_multiplier
+            )
+            self._matchers[key] = matcher
+        return matcher
+    
     def mark_dimension_weight(self, tokens: List[str], custom_dimensions: List[str]) -> Dict[str, float]:
         """
         通用化自定义维度权重标记
@@ -96,18 +221,8 @@ class DimensionMarker:
         Returns:
             带权重的token字典 {token: weight}
         """
-        # 扩展维度（包含同义词）
-        expanded_dimensions = self.expand_dimensions(custom_dimensions)
-        
-        weight_dict = {}
-        for token in tokens:
-            # 匹配自定义维度或其同义词（通用逻辑，无硬编码）
-            if token in expanded_dimensions:
-                weight_dict[token] = self.weight_multiplier  # 目标维度权重提升
-            else:
-                weight_dict[token] = 1.0  # 普通词基础权重
-        
-        return weight_dict
+        # 匹配自定义维度或其同义词（目标维度权重提升，普通词基础权重）
+        return self.compile(custom_dimensions).weights(tokens)
     
     def check_dimension_relevance(self, tokens: List[str], custom_dimensions: List[str]) -> bool:
         """
@@ -120,11 +235,8 @@ class DimensionMarker:
         Returns:
             是否相关
         """
-        # 扩展维度
-        expanded_dimensions = self.expand_dimensions(custom_dimensions)
-        
-        # 检查是否有任何token匹配维度
-        return any(token in expanded_dimensions for token in tokens)
+        # 检查是否有任何token匹配维度（含同义词）
+        return self.compile(custom_dimensions).is_relevant(tokens)
     
     def mark_corpus_dimension(self, df: pd.DataFrame, custom_dimensions: List[str], 
                              tokens_col: str = 'tokens') -> pd.DataFrame:
@@ -132,30 +244,77 @@ class DimensionMarker:
         批量标记语料的维度权重
         
         Args:
-            df: 语料DataFrame（需包含tokens列）
+            df: 语料DataFrame（需包含token_ids列或tokens列）
             custom_dimensions: 自定义维度列表
-            tokens_col: tokens列名
+            tokens_col: tokens列名（无token_ids列时使用）
             
         Returns:
-            添加dimension_weights和is_relevant列的DataFrame
+            添加dimension_hits（命中维度词的token数）和is_relevant列的DataFrame，
+            逐词权重字典可通过dimension_weights按需生成
         """
         logger.info(f"开始标记自定义维度: {custom_dimensions}")
         
-        # 标记权重
-        df['dimension_weights'] = df[tokens_col].apply(
-            lambda tokens: self.mark_dimension_weight(tokens, custom_dimensions)
-        )
+        matcher = self.compile(custom_dimensions)
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        
+        # 一次查表得到所有位置是否命中维度词，命中数与相关性均由此派生
+        hits = matcher.match(arrays)
+        
+        # 仅记录每行命中维度词的token数（未命中的普通词权重均为1，无需逐词存储）
+        df['dimension_hits'] = np.bincount(
+            arrays.row_index()[hits], minlength=len(arrays)
+        ).astype(np.int32)
         
         # 标记是否相关
-        df['is_relevant'] = df[tokens_col].apply(
-            lambda tokens: self.check_dimension_relevance(tokens, custom_dimensions)
-        )
+        df['is_relevant'] = df['dimension_hits'] > 0
         
         relevant_count = df['is_relevant'].sum()
         logger.info(f"维度标记完成，{len(df)} 条语料中有 {relevant_count} 条与自定义维度相关")
         
         return df
     
+    def prefilter_corpus(self, df: pd.DataFrame, custom_dimensions: List[str],
+                         content_col: str = 'content') -> pd.DataFrame:
+        """
+        分词前按维度词子串预筛选语料，只保留可能相关的行（不会漏掉相关语料）
+        
+        Args:
+            df: 清洗后的语料DataFrame
+            custom_dimensions: 自定义维度列表
+            content_col: 内容列名
+            
+        Returns:
+            可能相关的语料（分词后仍需mark_corpus_dimension精确判断）
+        """
+        candidates = self.compile(custom_dimensions).may_match(df[content_col].tolist())
+        df = df[candidates]
+        logger.info(f"维度预筛选: {len(candidates)} 条中 {len(df)} 条可能相关，其余跳过分词")
+        return df
+    
+    def dimension_weights(self, df: pd.DataFrame, custom_dimensions: List[str],
+                          tokens_col: str = 'tokens') -> List[Dict[str, float]]:
+        """
+        按需生成逐行带权重的token字典（与mark_dimension_weight结果一致）
+        
+        Args:
+            df: 语料DataFrame（需包含token_ids列或tokens列）
+            custom_dimensions: 自定义维度列表
+            tokens_col: tokens列名（无token_ids列时使用）
+            
+        Returns:
+            每行的 {token: weight} 字典
+        """
+        matcher = self.compile(custom_dimensions)
+        arrays = vocabulary.arrays_from_frame(df, tokens_col)
+        
+        position_weights = np.where(matcher.match(arrays), matcher.weight_multiplier, 1.0).tolist()
+        tokens = vocabulary.decode(arrays.values.tolist())
+        offsets = arrays.offsets.tolist()
+        return [
+            dict(zip(tokens[start:end], position_weights[start:end]))
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+    
     def filter_relevant_corpus(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         过滤出与自定义维度相关的语料
@@ -1,33 +1,86 @@
 """分词模块"""
+import os
+import time
 import jieba
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
+from .vocabulary import TokenArrays, Vocabulary, vocabulary
+from ..utils.cache import CacheManager, file_fingerprint
 from ..utils.logger import logger
 
 
+# 工作进程内的分词器实例（每个进程初始化时加载一次词典和停用词）
+_worker_tokenizer = None
+
+
+def _init_worker(business_dict_path: str, stopwords_path: str) -> None:
+    """工作进程初始化：加载业务词典和停用词"""
+    global _worker_tokenizer
+    _worker_tokenizer = Tokenizer(business_dict_path, stopwords_path)
+    _worker_tokenizer._ensure_dictionary()
+
+
+def _segment_chunk(texts: List[str]) -> List[List[str]]:
+    """工作进程内切分一个分块（停用词等过滤在主进程按词表批量完成）"""
+    return [_worker_tokenizer.segment(text) for text in texts]
+
+
 class Tokenizer:
     """分词器（支持PPT场景专属词典）"""
     
-    def __init__(self, business_dict_path: str = None, stopwords_path: str = None):
+    def __init__(self, business_dict_path: str = None, stopwords_path: str = None, 
+                 workers: int = 1, chunk_size: int = 2000, parallel_threshold: int = 20000,
+                 cache: Optional[CacheManager] = None, vocab: Optional[Vocabulary] = None):
         """
         初始化分词器
         
         Args:
             business_dict_path: PPT业务词典路径
             stopwords_path: 停用词词典路径
+            workers: 分词进程数（1为单进程，0为CPU核数）
+            chunk_size: 多进程分词时每个分块的条数
+            parallel_threshold: 语料条数达到该值时才启用多进程（避免小语料承担进程启动开销）
+            cache: 持久化结果缓存（跨运行复用已分词文本的结果），None表示不缓存
+            vocab: token编码词表（默认使用全局词表）
         """
         self.business_dict_path = business_dict_path
         self.stopwords_path = stopwords_path
         self.stopwords: Set[str] = set()
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self._executor = None
+        self.vocab = vocab if vocab is not None else vocabulary
+        self.cache = cache
+        # 缓存版本：词典或停用词内容变化时已缓存的分词结果失效
+        self.cache_version = (
+            f"jieba-{jieba.__version__}|{file_fingerprint(business_dict_path, stopwords_path)}"
+            if cache is not None else ""
+        )
         
-        # 加载业务词典
-        if business_dict_path:
-            self._load_business_dict(business_dict_path)
-        
-        # 加载停用词
+        # 加载停用词（业务词典在首次切分时加载）
         if stopwords_path:
             self._load_stopwords(stopwords_path)
+        self._dictionary_loaded = False
+    
+    def _ensure_dictionary(self) -> None:
+        """
+        首次切分前加载业务词典（jieba前缀词典随之从jieba自身缓存载入）
+        
+        分词结果全部命中持久化缓存时不需要切分，也就不加载约9MB的前缀词典。
+        """
+        if self._dictionary_loaded:
+            return
+        self._dictionary_loaded = True
+        
+        start_time = time.perf_counter()
+        jieba.dt.check_initialized()
+        if self.business_dict_path:
+            self._load_business_dict(self.business_dict_path)
+        logger.info(f"分词词典加载完成，耗时 {time.perf_counter() - start_time:.2f} 秒")
     
     def _load_business_dict(self, dict_path: str) -> None:
         """
@@ -68,6 +121,53 @@ class Tokenizer:
         else:
             logger.warning(f"停用词文件不存在: {stopwords_path}")
     
+    def segment(self, text: str) -> List[str]:
+        """
+        jieba切分（不做任何过滤）
+        
+        Args:
+            text: 待分词文本
+            
+        Returns:
+            切分结果列表
+        """
+        if not text or not isinstance(text, str):
+            return []
+        self._ensure_dictionary()
+        return list(jieba.cut(text))
+    
+    def _keep_token(self, token: str, remove_stopwords: bool) -> bool:
+        """判断切分结果是否保留（与tokenize的过滤规则一致）"""
+        if remove_stopwords and token in self.stopwords:
+            return False
+        stripped = token.strip()
+        return bool(stripped) and (len(stripped) > 1 or token.isdigit())
+    
+    def filter_tokens(self, arrays: TokenArrays, remove_stopwords: bool = True) -> TokenArrays:
+        """
+        按词表批量过滤切分结果：停用词、空白和单字符（保留数字），并去除首尾空白
+        
+        每个词条只判断一次，结果与逐条调用tokenize一致。
+        
+        Args:
+            arrays: 编码后的切分结果
+            remove_stopwords: 是否过滤停用词
+            
+        Returns:
+            过滤后的token数组
+        """
+        stopwords_key = hash(frozenset(self.stopwords)) if remove_stopwords else None
+        keep = self.vocab.derived(
+            ("token_keep", stopwords_key),
+            lambda token: self._keep_token(token, remove_stopwords)
+        )
+        strip_map = self.vocab.derived(
+            "token_strip",
+            lambda token: self.vocab.get_id(token.strip()),
+            dtype=np.int32
+        )
+        return arrays.filter(keep[arrays.values]).map(strip_map)
+    
     def tokenize(self, text: str, remove_stopwords: bool = True) -> List[str]:
         """
         分词
@@ -79,11 +179,8 @@ class Tokenizer:
         Returns:
             分词结果列表
         """
-        if not text or not isinstance(text, str):
-            return []
-        
         # jieba分词
-        tokens = list(jieba.cut(text))
+        tokens = self.segment(text)
         
         # 过滤停用词
         if remove_stopwords and self.stopwords:
@@ -108,20 +205,98 @@ class Tokenizer:
             remove_stopwords: 是否过滤停用词
             
         Returns:
-            添加tokens列的DataFrame
+            添加token_ids列的DataFrame（每行为词表id数组，需要token文本时通过词表解码）
         """
         logger.info(f"开始分词，共 {len(df)} 条")
         
-        df['tokens'] = df[content_col].apply(
-            lambda x: self.tokenize(x, remove_stopwords=remove_stopwords)
-        )
+        if self.cache is not None:
+            arrays = self._tokenize_cached(df[content_col].tolist(), remove_stopwords)
+        else:
+            arrays = self._tokenize_texts(df[content_col].tolist(), remove_stopwords)
+        df['token_ids'] = arrays.rows()
         
         # 过滤分词后为空的行
         original_count = len(df)
-        df = df[df['tokens'].apply(len) > 0]
+        df = df[arrays.lengths() > 0]
         filtered_count = original_count - len(df)
         
         logger.info(f"分词完成，过滤掉 {filtered_count} 条空结果，剩余 {len(df)} 条")
         
         return df
 
+    
+    def _tokenize_texts(self, texts: List[str], remove_stopwords: bool) -> TokenArrays:
+        """
+        分词文本列表（条数达到阈值时使用多进程切分），编码后按词表批量过滤
+        
+        Args:
+            texts: 待分词文本列表
+            remove_stopwords: 是否过滤停用词
+            
+        Returns:
+            token数组
+        """
+        if self.workers > 1 and len(texts) >= self.parallel_threshold:
+            segments = self._segment_parallel(texts)
+        else:
+            segments = [self.segment(text) for text in texts]
+        return self.filter_tokens(self.vocab.encode_rows(segments), remove_stopwords)
+    
+    def _tokenize_cached(self, texts: List[str], remove_stopwords: bool) -> TokenArrays:
+        """
+        优先从持久化缓存读取分词结果，仅对未命中的文本分词并写回缓存
+        
+        Args:
+            texts: 待分词文本列表
+            remove_stopwords: 是否过滤停用词
+            
+        Returns:
+            token数组
+        """
+        version = f"{self.cache_version}|stopwords={remove_stopwords}"
+        cached = self.cache.get_many("tokens", texts, version)
+        
+        unique_texts = list(dict.fromkeys(texts))
+        missing = [text for text in unique_texts if text not in cached]
+        if missing:
+            computed_arrays = self._tokenize_texts(missing, remove_stopwords)
+            computed = dict(zip(missing, self.vocab.decode_rows(computed_arrays)))
+            self.cache.set_many("tokens", computed, version)
+            cached.update(computed)
+        
+        logger.info(f"分词缓存命中 {len(unique_texts) - len(missing)} 条，新分词 {len(missing)} 条")
+        return self.vocab.encode_rows([cached[text] for text in texts])
+    
+    def _segment_parallel(self, texts: List[str]) -> List[List[str]]:
+        """
+        多进程切分（按分块提交，结果顺序与输入一致）
+        
+        Args:
+            texts: 待分词文本列表
+            
+        Returns:
+            切分结果列表
+        """
+        if self._executor is None:
+            # 先在主进程加载词典，以fork方式启动的进程可直接继承
+            self._ensure_dictionary()
+            logger.info(f"启动 {self.workers} 个分词进程")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.business_dict_path, self.stopwords_path)
+            )
+        
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        results = []
+        for chunk_tokens in self._executor.map(_segment_chunk, chunks):
+            results.extend(chunk_tokens)
+        
+        logger.info(f"多进程分词完成，{len(chunks)} 个分块")
+        return results
+    
+    def close(self) -> None:
+        """关闭分词进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
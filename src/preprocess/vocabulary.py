@@ -0,0 +1,269 @@
+"""词表编码模块（token ↔ int32 id，不等长token序列的扁平数组存储）"""
+import numpy as np
+import pandas as pd
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence
+from ..utils.logger import logger
+
+
+class TokenArrays:
+    """
+    不等长token id序列的扁平存储
+
+    所有行的token id连续存放在 values（int32）中，第 i 行为 values[offsets[i]:offsets[i+1]]，
+    词频统计、停用词过滤、相关性判断等均可在 values 上以数组运算完成。
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        """
+        初始化token数组
+
+        Args:
+            values: 扁平token id数组（int32）
+            offsets: 行偏移数组（int64，长度为行数+1）
+        """
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[np.ndarray]) -> "TokenArrays":
+        """
+        由逐行id数组构建（如DataFrame的token_ids列）
+
+        Args:
+            rows: 每行的token id数组
+
+        Returns:
+            token数组
+        """
+        rows = list(rows)
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        if rows:
+            np.cumsum([len(row) for row in rows], out=offsets[1:])
+            values = np.concatenate(rows).astype(np.int32, copy=False)
+        else:
+            values = np.empty(0, dtype=np.int32)
+        return cls(values, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        """每行token数"""
+        return np.diff(self.offsets)
+
+    def row_index(self) -> np.ndarray:
+        """values中每个位置所属的行号"""
+        return np.repeat(np.arange(len(self)), self.lengths())
+
+    def rows(self) -> List[np.ndarray]:
+        """
+        拆分为逐行id数组（共享values内存的视图，可直接存入DataFrame列）
+
+        Returns:
+            每行的token id数组
+        """
+        values = self.values
+        offsets = self.offsets.tolist()
+        return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def filter(self, keep: np.ndarray) -> "TokenArrays":
+        """
+        按位置过滤token（保持行结构）
+
+        Args:
+            keep: 与values等长的布尔数组
+
+        Returns:
+            过滤后的token数组
+        """
+        kept_per_row = np.bincount(self.row_index()[keep], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(kept_per_row, out=offsets[1:])
+        return TokenArrays(self.values[keep], offsets)
+
+    def take(self, rows: np.ndarray) -> "TokenArrays":
+        """
+        按行选取（只保留选中行）
+
+        Args:
+            rows: 与行数等长的布尔数组
+
+        Returns:
+            选中行组成的token数组
+        """
+        offsets = np.zeros(int(rows.sum()) + 1, dtype=np.int64)
+        np.cumsum(self.lengths()[rows], out=offsets[1:])
+        return TokenArrays(self.values[rows[self.row_index()]], offsets)
+
+    def map(self, id_map: np.ndarray) -> "TokenArrays":
+        """
+        按词表级映射表替换token id
+
+        Args:
+            id_map: 以旧id为下标的新id数组
+
+        Returns:
+            映射后的token数组
+        """
+        return TokenArrays(id_map[self.values].astype(np.int32, copy=False), self.offsets)
+
+    def any_per_row(self, hits: np.ndarray) -> np.ndarray:
+        """
+        判断每行是否至少有一个命中位置
+
+        Args:
+            hits: 与values等长的布尔数组
+
+        Returns:
+            每行是否命中的布尔数组
+        """
+        return np.bincount(self.row_index()[hits], minlength=len(self)) > 0
+
+
+class Vocabulary:
+    """
+    词表（token与int32 id的双向映射）
+
+    id按首次出现顺序分配且只增不减，分批处理时各批次共用同一词表，id保持稳定。
+    词表级派生数组（如停用词过滤标记、维度命中标记）按需为新增词条增量计算并缓存。
+    """
+
+    def __init__(self):
+        """初始化词表"""
+        self.token_to_id: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        self._derived: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _add(self, token: str) -> int:
+        """新增词条并返回其id"""
+        token_id = len(self.tokens)
+        self.token_to_id[token] = token_id
+        self.tokens.append(token)
+        return token_id
+
+    def get_id(self, token: str) -> int:
+        """
+        获取token的id（不存在时新增）
+
+        Args:
+            token: token文本
+
+        Returns:
+            token id
+        """
+        token_id = self.token_to_id.get(token)
+        return self._add(token) if token_id is None else token_id
+
+    def encode_rows(self, rows: Iterable[Sequence[str]]) -> TokenArrays:
+        """
+        编码多行token列表
+
+        Args:
+            rows: 每行的token列表
+
+        Returns:
+            token数组
+        """
+        rows = [row if isinstance(row, (list, tuple)) else [] for row in rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        if rows:
+            np.cumsum([len(row) for row in rows], out=offsets[1:])
+
+        token_to_id = self.token_to_id
+        add = self._add
+        ids = [token_to_id[t] if t in token_to_id else add(t) for t in chain.from_iterable(rows)]
+        return TokenArrays(np.array(ids, dtype=np.int32), offsets)
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """
+        解码token id序列
+
+        Args:
+            ids: token id序列
+
+        Returns:
+            token列表
+        """
+        tokens = self.tokens
+        return [tokens[i] for i in ids]
+
+    def decode_rows(self, arrays: TokenArrays) -> List[List[str]]:
+        """
+        解码为逐行token列表
+
+        Args:
+            arrays: token数组
+
+        Returns:
+            每行的token列表
+        """
+        flat = self.decode(arrays.values.tolist())
+        offsets = arrays.offsets.tolist()
+        return [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def derived(self, key: Hashable, func: Callable[[str], Any], dtype: Any = bool) -> np.ndarray:
+        """
+        获取词表级派生数组（以token id为下标），新增词条时增量计算
+
+        Args:
+            key: 派生数组缓存键（需唯一标识func的计算逻辑及其依赖）
+            func: 对单个token的计算函数（可在计算中向词表新增词条）
+            dtype: 数组类型
+
+        Returns:
+            长度不小于当前词表大小的数组
+        """
+        array = self._derived.get(key)
+        size = len(self.tokens)
+        if array is None:
+            array = np.empty(0, dtype=dtype)
+        if len(array) < size:
+            new_values = [func(token) for token in self.tokens[len(array):size]]
+            array = np.concatenate([array, np.array(new_values, dtype=dtype)])
+            self._derived[key] = array
+        return array
+
+    def arrays_from_frame(self, df: pd.DataFrame, tokens_col: str = 'tokens',
+                          ids_col: str = 'token_ids') -> TokenArrays:
+        """
+        获取语料的token数组（优先使用token id列，否则编码token列表列）
+
+        Args:
+            df: 语料DataFrame
+            tokens_col: token列表列名
+            ids_col: token id列名
+
+        Returns:
+            token数组
+        """
+        if ids_col in df.columns:
+            return TokenArrays.from_rows(df[ids_col])
+        if tokens_col in df.columns:
+            return self.encode_rows(df[tokens_col])
+        logger.warning(f"DataFrame缺少 {ids_col}/{tokens_col} 列，按空token处理")
+        return TokenArrays.from_rows([np.empty(0, dtype=np.int32)] * len(df))
+
+    def token_lists(self, df: pd.DataFrame, tokens_col: str = 'tokens',
+                    ids_col: str = 'token_ids') -> List[List[str]]:
+        """
+        获取逐行token列表（按需从token id列解码）
+
+        Args:
+            df: 语料DataFrame
+            tokens_col: token列表列名
+            ids_col: token id列名
+
+        Returns:
+            每行的token列表
+        """
+        if tokens_col in df.columns:
+            return df[tokens_col].tolist()
+        return self.decode_rows(self.arrays_from_frame(df, tokens_col, ids_col))
+
+
+# 全局词表实例（分词、维度标记与分析共用）
+vocabulary = Vocabulary()
@@ -1,84 +1,286 @@
 """缓存工具模块"""
-import json
 import hashlib
-from pathlib import Path
-from typing import Any, Optional
 import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from .logger import logger
+
+
+# 存储格式版本（表结构或序列化方式变化时递增，使旧缓存失效）
+STORE_VERSION = 1
 
 
 class CacheManager:
-    """缓存管理器"""
-    
-    def __init__(self, cache_dir: str = ".cache"):
+    """
+    持久化结果缓存（分词结果、情感标签等逐文本计算结果）
+
+    按命名空间分片存储于 SQLite 单文件中，写入以事务提交（原子写入，中断不会产生残缺条目），
+    支持批量读写与按总大小上限的LRU淘汰。条目总字节数由触发器在写入/删除的同一事务中
+    累计到 meta 表，判断是否需要淘汰时无需扫描全表。缓存键由命名空间、版本号（如词典/停用词指纹）
+    和文本内容共同决定，词典等变化后旧条目自然失效并逐步被淘汰。
+    """
+
+    # 单条SQL语句的参数数量上限（兼容旧版SQLite的999限制）
+    QUERY_CHUNK = 500
+
+    def __init__(self, cache_dir: str = ".cache", max_size_mb: float = 512,
+                 db_name: str = "results.sqlite3"):
         """
         初始化缓存管理器
-        
+
         Args:
             cache_dir: 缓存目录
+            max_size_mb: 缓存总大小上限（MB），超出时淘汰最久未访问的条目，0表示不限制
+            db_name: 缓存数据库文件名
         """
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
-    
-    def _get_cache_key(self, content: str, dimensions: list) -> str:
+        self.db_path = self.cache_dir / db_name
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 访问时钟（单调递增，用于LRU排序）
+        self._clock = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """延迟打开数据库连接（首次读写时创建目录和表）"""
+        if self._conn is None:
+            self.cache_dir.mkdir(exist_ok=True, parents=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key BLOB NOT NULL, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, accessed INTEGER NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # INSERT OR REPLACE 替换已有条目时同样触发删除触发器
+            conn.execute("PRAGMA recursive_triggers=ON")
+            with conn:
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+                    "UPDATE meta SET value = value + NEW.size WHERE name = 'total_size'; END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+                    "UPDATE meta SET value = value - OLD.size WHERE name = 'total_size'; END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN "
+                    "UPDATE meta SET value = value - OLD.size + NEW.size WHERE name = 'total_size'; END"
+                )
+                # 旧版缓存文件没有累计值时统计一次
+                conn.execute(
+                    "INSERT OR IGNORE INTO meta SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries"
+                )
+
+            row = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != STORE_VERSION:
+                with conn:
+                    conn.execute("DELETE FROM entries")
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (STORE_VERSION,))
+                    conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_size'")
+
+            self._clock = conn.execute("SELECT COALESCE(MAX(accessed), 0) FROM entries").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _make_key(text: str, version: str) -> bytes:
         """
         生成缓存键
-        
+
         Args:
-            content: 内容
-            dimensions: 自定义维度列表
-            
+            text: 文本内容
+            version: 版本号（计算方式或依赖资源的指纹）
+
+        Returns:
+            缓存键（16字节摘要）
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(version.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.digest()
+
+    def _tick(self) -> int:
+        """推进访问时钟"""
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, namespace: str, texts: Iterable[str], version: str = "") -> Dict[str, Any]:
+        """
+        批量获取缓存
+
+        Args:
+            namespace: 命名空间（如 "tokens"、"sentiment"）
+            texts: 文本列表
+            version: 版本号
+
+        Returns:
+            命中的缓存 {文本: 数据}
+        """
+        keys = {self._make_key(text, version): text for text in set(texts)}
+        if not keys:
+            return {}
+
+        results = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                key_list = list(keys)
+                for i in range(0, len(key_list), self.QUERY_CHUNK):
+                    chunk = key_list[i:i + self.QUERY_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, value FROM entries WHERE namespace = ? AND key IN ({placeholders})",
+                        [namespace, *chunk]
+                    ).fetchall()
+                    for key, value in rows:
+                        results[keys[key]] = pickle.loads(value)
+
+                    # 刷新命中条目的访问时间
+                    if rows:
+                        with conn:
+                            conn.executemany(
+                                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                                [(self._tick(), namespace, key) for key, _ in rows]
+                            )
+        except (sqlite3.Error, pickle.UnpicklingError, OSError) as e:
+            logger.warning(f"读取结果缓存失败: {str(e)}")
+            return {}
+
+        return results
+
+    def set_many(self, namespace: str, items: Dict[str, Any], version: str = "") -> None:
+        """
+        批量写入缓存（单个事务提交）
+
+        Args:
+            namespace: 命名空间
+            items: 待写入数据 {文本: 数据}
+            version: 版本号
+        """
+        if not items:
+            return
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                rows = []
+                for text, data in items.items():
+                    value = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+                    rows.append((namespace, self._make_key(text, version), value, len(value), self._tick()))
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows)
+                self._evict(conn)
+        except (sqlite3.Error, pickle.PicklingError, OSError) as e:
+            logger.warning(f"写入结果缓存失败: {str(e)}")
+
+    def total_size(self) -> int:
+        """
+        缓存条目的总字节数（meta表中的累计值）
+
         Returns:
-            缓存键（MD5）
+            总字节数
+        """
+        with self._lock:
+            return self._total_size(self._connect())
+
+    @staticmethod
+    def _total_size(conn: sqlite3.Connection) -> int:
+        """读取累计的条目总字节数"""
+        row = conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()
+        return row[0] if row is not None else 0
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
         """
-        key_str = f"{content}_{','.join(sorted(dimensions))}"
-        return hashlib.md5(key_str.encode('utf-8')).hexdigest()
-    
+        超出大小上限时按最久未访问顺序淘汰条目，直至降到上限的90%
+
+        Args:
+            conn: 数据库连接
+        """
+        if self.max_size_bytes <= 0:
+            return
+
+        total = self._total_size(conn)
+        if total <= self.max_size_bytes:
+            return
+
+        excess = total - int(self.max_size_bytes * 0.9)
+        cutoff = None
+        freed = 0
+        for accessed, size in conn.execute("SELECT accessed, size FROM entries ORDER BY accessed"):
+            freed += size
+            cutoff = accessed
+            if freed >= excess:
+                break
+
+        with conn:
+            removed = conn.execute("DELETE FROM entries WHERE accessed <= ?", (cutoff,)).rowcount
+        logger.info(f"结果缓存超出上限，淘汰 {removed} 条最久未访问的条目")
+
     def get(self, content: str, dimensions: list) -> Optional[Any]:
         """
         获取缓存
-        
+
         Args:
             content: 内容
             dimensions: 自定义维度列表
-            
+
         Returns:
             缓存数据，不存在返回None
         """
-        cache_key = self._get_cache_key(content, dimensions)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception:
-                return None
-        return None
-    
+        return self.get_many("default", [content], ",".join(sorted(dimensions))).get(content)
+
     def set(self, content: str, dimensions: list, data: Any) -> None:
         """
         设置缓存
-        
+
         Args:
             content: 内容
             dimensions: 自定义维度列表
             data: 缓存数据
         """
-        cache_key = self._get_cache_key(content, dimensions)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        
-        try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
-        except Exception:
-            pass
-    
+        self.set_many("default", {content: data}, ",".join(sorted(dimensions)))
+
     def clear(self) -> None:
         """清空所有缓存"""
-        for cache_file in self.cache_dir.glob("*.pkl"):
-            cache_file.unlink()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM entries")
+            conn.execute("VACUUM")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def file_fingerprint(*paths: Optional[str]) -> str:
+    """
+    计算资源文件（词典、停用词等）的内容指纹，用作缓存版本号的一部分
+
+    Args:
+        paths: 文件路径（None或不存在的文件按空内容计）
+
+    Returns:
+        指纹字符串
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        digest.update(b'\x00')
+        if path and Path(path).exists():
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
 
 
 # 全局缓存实例
 cache_manager = CacheManager()
-
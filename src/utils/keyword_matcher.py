@@ -0,0 +1,144 @@
+"""多模式关键词匹配模块（Aho-Corasick自动机）"""
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+from .logger import logger
+
+
+class KeywordMatcher:
+    """
+    多模式子串匹配器（Aho-Corasick自动机）
+
+    每个关键词关联一个分组位掩码，对文本扫描一遍即可得到所有命中关键词所属分组的位掩码，
+    与逐个关键词执行 `kw in text` 的结果一致（含关键词互相重叠、互为子串的情况）。
+    已安装 pyahocorasick 时使用其C实现，否则使用纯Python实现；关键词很少时直接逐个做子串判断
+    （C实现的 `in` 在少量关键词时比逐字符状态转移更快）。
+    """
+
+    # 纯Python实现下，关键词数量不超过该值时改为逐个子串判断
+    DIRECT_SCAN_LIMIT = 20
+
+    def __init__(self, keyword_groups: Iterable[Tuple[str, int]]):
+        """
+        构建匹配器
+
+        Args:
+            keyword_groups: (关键词, 分组位掩码) 序列，同一关键词出现多次时掩码按位或合并
+        """
+        self.masks: Dict[str, int] = {}
+        for keyword, mask in keyword_groups:
+            if keyword:
+                self.masks[keyword] = self.masks.get(keyword, 0) | mask
+
+        try:
+            import ahocorasick
+            self._automaton = ahocorasick.Automaton()
+            for keyword, mask in self.masks.items():
+                self._automaton.add_word(keyword, mask)
+            if self.masks:
+                self._automaton.make_automaton()
+            self._native = True
+        except ImportError:
+            self._native = False
+            self._direct = len(self.masks) <= self.DIRECT_SCAN_LIMIT
+            if self._direct:
+                self._items = list(self.masks.items())
+            else:
+                self._build()
+
+        logger.debug(f"关键词自动机构建完成，共 {len(self.masks)} 个关键词")
+
+    def _build(self) -> None:
+        """构建纯Python自动机（转移表、失败指针，输出掩码沿失败链预先合并）"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[int] = [0]
+
+        for keyword, mask in self.masks.items():
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(0)
+                state = next_state
+            output[state] |= mask
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] |= output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def scan(self, text: str) -> int:
+        """
+        扫描文本，返回所有命中关键词的分组位掩码（按位或）
+
+        Args:
+            text: 待扫描文本
+
+        Returns:
+            位掩码（无命中为0）
+        """
+        if not text or not isinstance(text, str) or not self.masks:
+            return 0
+
+        if self._native:
+            mask = 0
+            for _, value in self._automaton.iter(text):
+                mask |= value
+            return mask
+
+        if self._direct:
+            mask = 0
+            for keyword, value in self._items:
+                if keyword in text:
+                    mask |= value
+            return mask
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        mask = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            mask |= output[state]
+        return mask
+
+    def scan_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        批量扫描文本
+
+        Args:
+            texts: 文本序列
+
+        Returns:
+            每条文本的位掩码
+        """
+        scan = self.scan
+        return [scan(text) for text in texts]
+
+    def contains_any(self, text: str) -> bool:
+        """
+        判断文本是否包含任一关键词
+
+        Args:
+            text: 待扫描文本
+
+        Returns:
+            是否命中
+        """
+        return self.scan(text) != 0
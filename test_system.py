@@ -61,7 +61,6 @@ def test_dependencies():
     
     dependencies = [
         "pandas",
-        "dask",
         "jieba",
         "snownlp",
         "matplotlib",
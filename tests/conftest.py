@@ -0,0 +1,7 @@
+"""测试公共配置：以仓库根目录为导入根，通过 src 包导入各模块"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
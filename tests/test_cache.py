@@ -0,0 +1,58 @@
+"""持久化结果缓存测试"""
+import sqlite3
+
+from src.utils.cache import CacheManager
+
+
+def _sum_sizes(cache):
+    conn = sqlite3.connect(str(cache.db_path))
+    try:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_running_total_tracks_inserts_replacements_and_deletes(tmp_path):
+    cache = CacheManager(cache_dir=str(tmp_path), max_size_mb=0)
+    cache.set_many("tokens", {f"文本{i}": ["词"] * i for i in range(20)}, "v1")
+    assert cache.total_size() == _sum_sizes(cache) > 0
+
+    # 同一键以更大的值覆盖
+    cache.set_many("tokens", {"文本3": ["词"] * 100}, "v1")
+    assert cache.total_size() == _sum_sizes(cache)
+
+    cache.clear()
+    assert cache.total_size() == 0
+    cache.close()
+
+
+def test_evicts_least_recently_used_when_total_exceeds_cap(tmp_path):
+    cache = CacheManager(cache_dir=str(tmp_path), max_size_mb=0.01)
+    cache.set_many("tokens", {f"旧文本{i}": "x" * 100 for i in range(60)}, "v1")
+    assert cache.total_size() <= cache.max_size_bytes
+    # 刷新部分条目的访问时间后继续写入，最久未访问的条目先被淘汰
+    cache.get_many("tokens", ["旧文本59"], "v1")
+    cache.set_many("tokens", {f"新文本{i}": "x" * 100 for i in range(60)}, "v1")
+
+    assert cache.total_size() == _sum_sizes(cache) <= cache.max_size_bytes
+    assert "旧文本59" in cache.get_many("tokens", ["旧文本59"], "v1")
+    assert not cache.get_many("tokens", ["旧文本0"], "v1")
+    assert cache.get_many("tokens", ["新文本59"], "v1")
+    cache.close()
+
+
+def test_total_initialized_for_existing_cache_file(tmp_path):
+    cache = CacheManager(cache_dir=str(tmp_path), max_size_mb=0)
+    cache.set_many("sentiment", {f"文本{i}": "正面" for i in range(10)}, "v1")
+    expected = _sum_sizes(cache)
+    cache.close()
+
+    # 模拟没有累计值的旧版缓存文件
+    conn = sqlite3.connect(str(cache.db_path))
+    with conn:
+        conn.execute("DELETE FROM meta WHERE name = 'total_size'")
+    conn.close()
+
+    reopened = CacheManager(cache_dir=str(tmp_path), max_size_mb=0)
+    assert reopened.total_size() == expected
+    reopened.close()
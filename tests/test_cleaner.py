@@ -0,0 +1,42 @@
+"""文本清洗测试"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocess.cleaner import TextCleaner
+
+TEXTS = [
+    "  老师 想要一个  教学PPT！！ ",
+    "ＡＢＣ１２３　全角　文字，好用。",
+    "符号@#￥%……&*混杂\t\n换行\r\n",
+    "emoji😀😀与_下划线__保留",
+    "数字2024年3月有10页",
+    "\xa0不间断 空格　",
+    "...,,,!!!",
+    "",
+    "   ",
+    "单字",
+]
+
+FLAGS = list(itertools.product([True, False], repeat=4))
+
+
+@pytest.mark.parametrize("remove_chars,normalize_space,convert_numbers,normalize_width", FLAGS)
+def test_clean_series_matches_clean_text(remove_chars, normalize_space, convert_numbers, normalize_width):
+    cleaner = TextCleaner()
+    options = dict(remove_chars=remove_chars, normalize_space=normalize_space,
+                   convert_numbers=convert_numbers, normalize_width=normalize_width)
+
+    expected = [cleaner.clean_text(text, **options) for text in TEXTS]
+    assert cleaner.clean_series(pd.Series(TEXTS, dtype=object), **options).tolist() == expected
+    assert cleaner.clean_series(pd.Series(TEXTS, dtype="string"), **options).tolist() == expected
+
+
+def test_clean_series_treats_non_strings_as_empty():
+    cleaner = TextCleaner()
+    texts = pd.Series(["正常 文本", None, np.nan, 123, "末尾"], dtype=object)
+
+    assert cleaner.clean_series(texts).tolist() == [cleaner.clean_text(text) for text in texts]
+    assert cleaner.clean_series(pd.Series(["有值", None], dtype="string")).tolist() == ["有值", ""]
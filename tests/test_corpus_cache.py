@@ -0,0 +1,52 @@
+"""语料列式缓存测试"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data_io.corpus_cache import CorpusCacheWriter
+from src.data_io.data_loader import DataLoader
+
+
+def _write_mixed_csv(path):
+    """user列前50行为整数、后50行为文本（分块读取时各批次推断出的类型不同）"""
+    rows = [{"content": f"第{i}条语料内容", "type": "请求", "user": i} for i in range(50)]
+    rows += [{"content": f"第{i}条语料内容", "type": "反馈", "user": f"u{i}"} for i in range(50)]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def _load(loader, path):
+    return pd.concat(list(loader.load_large_corpus(path)), ignore_index=True)
+
+
+def test_column_dtype_change_between_batches(tmp_path):
+    path = tmp_path / "mixed.csv"
+    _write_mixed_csv(path)
+    cache_dir = tmp_path / "cache"
+
+    uncached = _load(DataLoader(batch_size=50, extra_columns=["user"]), path)
+    first = _load(DataLoader(batch_size=50, cache_dir=str(cache_dir), extra_columns=["user"]), path)
+    assert len(uncached) == len(first) == 100
+
+    # 第二次加载命中缓存，附加列按字符串读回
+    loader = DataLoader(batch_size=50, cache_dir=str(cache_dir), extra_columns=["user"])
+    assert loader.corpus_cache.lookup(path, loader._cache_params()) is not None
+    cached = _load(loader, path)
+    assert cached["content"].tolist() == uncached["content"].tolist()
+    assert cached["type"].astype(str).tolist() == uncached["type"].astype(str).tolist()
+    assert cached["user"].tolist() == uncached["user"].astype(str).tolist()
+
+
+def test_cache_write_failure_does_not_fail_load(tmp_path, monkeypatch):
+    path = tmp_path / "mixed.csv"
+    _write_mixed_csv(path)
+
+    def fail(self, df):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(CorpusCacheWriter, "write", fail)
+    loader = DataLoader(batch_size=50, cache_dir=str(tmp_path / "cache"), extra_columns=["user"])
+    assert len(_load(loader, path)) == 100
+    # 写入失败时不留下缓存
+    assert loader.corpus_cache.lookup(path, loader._cache_params()) is None
+    assert not list((tmp_path / "cache").glob("*.tmp"))
@@ -0,0 +1,42 @@
+"""数据加载器测试"""
+import pandas as pd
+
+from src.data_io.data_loader import MIN_AUTO_BATCH_SIZE, DataLoader
+
+
+def _write_csv(path, n_rows):
+    pd.DataFrame({
+        "content": [f"第{i}条语料内容" for i in range(n_rows)],
+        "type": ["请求"] * n_rows,
+    }).to_csv(path, index=False)
+
+
+def test_planned_batch_size_does_not_leak_into_later_loads(tmp_path):
+    path = tmp_path / "corpus.csv"
+    _write_csv(path, 2500)
+    # 极小的内存预算使自动规划选择分批加载及最小批次大小
+    loader = DataLoader(batch_size=700, max_memory_gb=1e-6)
+
+    planned = [len(batch) for batch in loader.auto_load(path)]
+    assert planned == [MIN_AUTO_BATCH_SIZE, MIN_AUTO_BATCH_SIZE, 500]
+
+    assert loader.batch_size == 700
+    assert [len(batch) for batch in loader.load_large_corpus(path)] == [700, 700, 700, 400]
+
+
+def test_estimate_counts_only_complete_multiline_records(tmp_path):
+    path = tmp_path / "multiline.csv"
+    n_rows = 400
+    pd.DataFrame({
+        "content": [f"第{i}条反馈\n第二行，含\"引号\"\n第三行" for i in range(n_rows)],
+        "type": ["反馈"] * n_rows,
+    }).to_csv(path, index=False)
+    loader = DataLoader()
+
+    # 采样截断点落在不同位置（含引号字段内部的换行处），估算不报错且与真实行数接近
+    for sample_chars in range(500, 2000, 37):
+        estimate = loader.estimate_corpus(path, sample_chars=sample_chars)
+        assert abs(estimate["estimated_rows"] - n_rows) <= n_rows * 0.1
+
+    plan = loader.plan_load(path)
+    assert plan["estimated_rows"] == n_rows
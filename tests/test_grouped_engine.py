@@ -0,0 +1,113 @@
+"""分组统计引擎测试"""
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer.cooccurrence import AssociationMetrics
+from src.analyzer.feedback_analyzer import FeedbackAnalyzer
+from src.analyzer.grouped_engine import GroupedAnalysisEngine, count_by_group
+from src.analyzer.partial_stats import PartialStats
+from src.analyzer.request_analyzer import RequestAnalyzer
+
+
+def _naive_count(codes, values, weights, member_codes):
+    counts = Counter()
+    for code, value, weight in zip(codes.tolist(), values.tolist(), weights.tolist()):
+        if code in member_codes and value >= 0:
+            counts[value] += weight
+    return list(counts), list(counts.values())
+
+
+def test_count_by_group_matches_naive_counting():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 4, 500)
+    # 值编码稀疏地分布在很大的范围内，计数与词表大小无关
+    values = rng.choice(np.array([-1, 3, 17, 2_000_000, 5_000_000_000]), 500)
+    weights = rng.integers(1, 4, 500)
+    group_codes = [[1, 3], [2, 3], [3]]
+
+    results = count_by_group(codes, values, weights, group_codes)
+
+    for member_codes, (ids, counts) in zip(group_codes, results):
+        assert (ids, counts) == _naive_count(codes, values, weights, member_codes)
+
+
+def test_count_by_group_empty_input():
+    empty = np.zeros(0, dtype=np.int64)
+    assert count_by_group(empty, empty, empty, [[1], [2]]) == [([], []), ([], [])]
+
+
+def _corpus(seed=0, n_rows=60):
+    rng = random.Random(seed)
+    words = ["老师", "教学", "老师们", "课件", "模板", "定制", "学生", "好用", "太慢", "失败", "汇报", "会议"]
+    rows = [[rng.choice(words) for _ in range(rng.randint(0, 8))] for _ in range(n_rows)]
+    return pd.DataFrame({
+        "content": ["".join(tokens) or "空" for tokens in rows],
+        "tokens": rows,
+        "dup_count": [rng.randint(1, 3) for _ in range(n_rows)],
+        "type": [rng.choice(["请求", "反馈", "请求反馈", "其他"]) for _ in range(n_rows)],
+        "is_relevant": [rng.random() < 0.8 for _ in range(n_rows)],
+    })
+
+
+def _naive_associations(df, dim):
+    counts = Counter()
+    for tokens, weight in zip(df["tokens"], df["dup_count"]):
+        if any(dim in token for token in tokens):
+            for token in tokens:
+                if token != dim:
+                    counts[token] += weight
+    return counts
+
+
+def test_collect_matches_per_analyzer_path(tmp_path):
+    dimensions = ["老师", "教学"]
+    analyzers = {
+        "request": RequestAnalyzer(dimensions, output_dir=str(tmp_path)),
+        "feedback": FeedbackAnalyzer(dimensions, output_dir=str(tmp_path)),
+    }
+    df = _corpus()
+    # 分组互相重叠，且存在不属于任何分组的行
+    masks = {
+        "request": df["type"].str.contains("请求").to_numpy(),
+        "feedback": df["type"].str.contains("反馈").to_numpy(),
+    }
+
+    results = GroupedAnalysisEngine(analyzers).collect(df, masks)
+
+    for name, analyzer in analyzers.items():
+        stats = results[name]
+        subset = df[masks[name]].reset_index(drop=True)
+        assert stats.total == analyzer.count_rows(subset)
+        assert stats.relevant == int(subset.loc[subset["is_relevant"], "dup_count"].sum())
+        assert dict(stats.type_counts) == dict(analyzer._weighted_counter(subset["type"], subset["dup_count"]))
+        assert list(stats.frequency.items()) == list(analyzer.calculate_frequency(subset).items())
+        assert list(stats.dim_frequency.items()) == list(analyzer.calculate_dimension_frequency(subset).items())
+
+        associations = analyzer.count_associations(subset)
+        for dim in dimensions:
+            assert list(stats.associations[dim].items()) == list(associations[dim].items())
+            assert list(associations[dim].items()) == list(_naive_associations(subset, dim).items())
+
+        analyzer.analyze_sentiment(subset)
+        assert stats.sentiment_distribution() == analyzer.calculate_sentiment_distribution(subset)
+        masks_by_rule = analyzer.rule_masks(subset)
+        weights = analyzer.row_weights(subset).to_numpy()
+        assert stats.category_counts == analyzer.rule_engine.category_counts(masks_by_rule, weights)
+        assert stats.scene_counts == analyzer.rule_engine.scene_counts(masks_by_rule, weights)
+
+
+def test_merged_batches_match_single_pass(tmp_path):
+    analyzer = RequestAnalyzer(["老师", "教学"], output_dir=str(tmp_path),
+                               association_metrics=AssociationMetrics(min_cooccurrence=1))
+    df = _corpus(seed=1, n_rows=90)
+
+    eager = analyzer.summarize(analyzer.collect_stats(df))
+    merged = PartialStats(analyzer.custom_dimensions)
+    for start in range(0, len(df), 25):
+        merged.merge(analyzer.collect_stats(df.iloc[start:start + 25].reset_index(drop=True)))
+    streaming = analyzer.summarize(merged)
+
+    assert streaming == eager
@@ -0,0 +1,47 @@
+"""多模式关键词匹配测试"""
+import random
+
+import pytest
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+
+def _naive_scan(keyword_groups, text):
+    mask = 0
+    for keyword, value in keyword_groups:
+        if keyword and keyword in text:
+            mask |= value
+    return mask
+
+
+def _random_case(seed, n_keywords):
+    # 小字母表使关键词大量重叠、互为子串
+    rng = random.Random(seed)
+    alphabet = "教学老师课件"
+    keyword_groups = [
+        ("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))), 1 << rng.randrange(6))
+        for _ in range(n_keywords)
+    ]
+    texts = ["".join(rng.choice(alphabet + "的了") for _ in range(rng.randint(0, 30))) for _ in range(200)]
+    return keyword_groups, texts
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("direct_scan_limit", [KeywordMatcher.DIRECT_SCAN_LIMIT, 0])
+def test_scan_matches_substring_search(monkeypatch, seed, direct_scan_limit):
+    # 上限为0时关键词较少也构建自动机，覆盖两种实现
+    monkeypatch.setattr(KeywordMatcher, "DIRECT_SCAN_LIMIT", direct_scan_limit)
+    for n_keywords in (3, 40):
+        keyword_groups, texts = _random_case(seed, n_keywords)
+        matcher = KeywordMatcher(keyword_groups)
+
+        assert matcher.scan_many(texts) == [_naive_scan(keyword_groups, text) for text in texts]
+
+
+def test_scan_handles_empty_inputs():
+    matcher = KeywordMatcher([("", 1), ("模板", 2)])
+
+    assert matcher.scan("") == 0
+    assert matcher.scan(None) == 0
+    assert matcher.scan("定制模板") == 2
+    assert KeywordMatcher([]).scan("任意文本") == 0
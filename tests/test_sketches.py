@@ -0,0 +1,61 @@
+"""近似统计摘要测试"""
+from collections import Counter
+
+import numpy as np
+
+from src.analyzer.sketches import HeavyHitterSketch, HyperLogLog
+
+
+def _batches(rng, n_batches=8, batch_size=2000, vocab_size=5000):
+    # Zipf分布的token流，少数高频词与大量低频词
+    for _ in range(n_batches):
+        ids = np.minimum(rng.zipf(1.3, batch_size), vocab_size) - 1
+        counts = Counter(ids.tolist())
+        yield list(counts), list(counts.values())
+
+
+def test_heavy_hitter_error_bound_holds_after_merges():
+    rng = np.random.default_rng(0)
+    capacity = 50
+    sketch = HeavyHitterSketch(capacity)
+    truth = Counter()
+    for ids, counts in _batches(rng):
+        sketch.merge(HeavyHitterSketch.from_counts(capacity, ids, counts))
+        truth.update(dict(zip(ids, counts)))
+
+    assert sketch.total == sum(truth.values())
+    assert len(sketch) <= capacity
+    assert 0 < sketch.error <= sketch.total / (capacity + 1)
+
+    kept = dict(zip(sketch.ids.tolist(), sketch.counts.tolist()))
+    for token_id, count in truth.items():
+        # 保留的计数是下界，真实频次 ≤ 计数 + error；未保留的token真实频次 ≤ error
+        estimate = kept.get(token_id, 0)
+        assert estimate <= count <= estimate + sketch.error
+
+
+def test_heavy_hitter_is_exact_within_capacity():
+    sketch = HeavyHitterSketch.from_counts(10, [3, 1, 2], [5, 7, 1])
+    sketch.merge(HeavyHitterSketch.from_counts(10, [2, 4], [2, 9]))
+
+    assert sketch.error == 0
+    assert dict(zip(sketch.ids.tolist(), sketch.counts.tolist())) == {3: 5, 1: 7, 2: 3, 4: 9}
+
+
+def test_hyperloglog_merge_equals_single_estimate():
+    rng = np.random.default_rng(1)
+    ids = rng.integers(0, 200_000, 50_000)
+    parts = np.array_split(ids, 5)
+
+    merged = HyperLogLog(12)
+    for part in parts:
+        partial = HyperLogLog(12)
+        partial.add_hashes(HyperLogLog.hash_ids(part))
+        merged.merge(partial)
+    single = HyperLogLog(12)
+    single.add_hashes(HyperLogLog.hash_ids(ids))
+
+    assert np.array_equal(merged.registers, single.registers)
+    assert merged.count() == single.count()
+    distinct = len(np.unique(ids))
+    assert abs(single.count() - distinct) <= 4 * single.relative_error * distinct
@@ -0,0 +1,48 @@
+"""可合并词频统计测试"""
+import random
+from collections import Counter
+
+import numpy as np
+
+from src.analyzer.term_counts import TermCounts
+from src.preprocess.vocabulary import Vocabulary
+
+
+def _corpus(seed=0, n_rows=300):
+    rng = random.Random(seed)
+    words = [f"词{i}" for i in range(60)]
+    rows = [[rng.choice(words[:rng.randint(1, 60)]) for _ in range(rng.randint(0, 12))] for _ in range(n_rows)]
+    weights = np.array([rng.randint(1, 3) for _ in range(n_rows)], dtype=np.int64)
+    return rows, weights
+
+
+def test_merge_of_batches_matches_single_pass():
+    rows, weights = _corpus()
+    vocab = Vocabulary()
+    merged = TermCounts(vocab)
+    # 逐批编码，后续批次的词表更大（与分批流式加载一致）
+    for start in range(0, len(rows), 70):
+        arrays = vocab.encode_rows(rows[start:start + 70])
+        merged.merge(TermCounts.from_arrays(arrays, weights[start:start + 70], vocab=vocab))
+    single = TermCounts.from_arrays(vocab.encode_rows(rows), weights, vocab=vocab)
+
+    assert list(merged.items()) == list(single.items())
+    assert list(merged.document_frequency().items()) == list(single.document_frequency().items())
+    assert merged.top_k(15) == single.top_k(15)
+
+
+def test_counts_match_weighted_counters():
+    rows, weights = _corpus(seed=1)
+    vocab = Vocabulary()
+    counts = TermCounts.from_arrays(vocab.encode_rows(rows), weights, vocab=vocab)
+
+    tf, df = Counter(), Counter()
+    for tokens, weight in zip(rows, weights.tolist()):
+        for token in tokens:
+            tf[token] += weight
+        for token in set(tokens):
+            df[token] += weight
+
+    assert list(counts.items()) == list(tf.items())
+    assert counts.document_frequency() == dict(df)
+    assert counts.top_k(10) == sorted(tf.items(), key=lambda x: x[1], reverse=True)[:10]